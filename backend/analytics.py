@@ -0,0 +1,277 @@
+"""
+Sweep-line analytics over a timeline's bars: overlaps, gaps, successions, milestone clusters.
+
+Everything works on an EventStore and sorts once per pass, so a whole analysis is O(n log n):
+
+- overlaps: tenures in the same role held at the same time by different actors (two CEOs),
+  with the peak number of concurrent holders per role
+- gaps: vacancies - stretches between a role's first and last tenure with nobody in it
+- successions: hand-offs within a role, where the next holder starts within N days of the
+  previous one leaving; flagged when a qualified/original holder is replaced by an
+  unqualified or highlighted one
+- milestone clusters: tenure starts and ends within N days of each milestone
+
+A role is the title in "[Name] - [Title] ([Status])" actor labels, otherwise the roleType.
+analyze() returns plain dicts (the /api/sessions/{id}/analytics payload); footer_text() turns
+them into the chart footer used when the model gave no footer_analysis.
+"""
+
+import heapq
+import re
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from eventstore import DAY, EventStore, format_day
+from models import Event, TimelineData
+
+SUCCESSION_DAYS = 90
+CLUSTER_DAYS = 30
+MIN_GAP_DAYS = 30
+MAX_EXAMPLES = 25  # Per finding list, so huge timelines keep small payloads
+
+_ACTOR_LABEL = re.compile(r"^(?P<name>.+?) - (?P<title>.+?)(?: \((?P<status>[^()]*)\))?$")
+
+
+def parse_actor(label: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """(name, title, status) from "[Name] - [Title] ([Status])"; title/status None if absent"""
+    match = _ACTOR_LABEL.match(label)
+    if not match:
+        return label, None, None
+    return match.group("name"), match.group("title"), match.group("status")
+
+
+def _iso(day: int) -> str:
+    return format_day(day, DAY)
+
+
+class _Bars:
+    """Dated bars of a store, with role keys, sorted by (role, start)"""
+
+    def __init__(self, store: EventStore):
+        rows = np.flatnonzero(store.bar_mask() & store.dated_mask() & ~store.milestone_mask())
+        labels = store.actors.strings
+        parsed = [parse_actor(label) for label in labels]  # Once per distinct actor
+        role_of_actor = [title or "" for _, title, _ in parsed]
+        actor_codes = store.actor[rows].tolist()
+        roles = [role_of_actor[code] or store.roles[int(role)]
+                 for code, role in zip(actor_codes, store.role[rows].tolist())]
+
+        role_names = sorted(set(roles))
+        code_of_role = {name: code for code, name in enumerate(role_names)}
+        role_codes = np.array([code_of_role[r] for r in roles], dtype=np.int64)
+        order = np.lexsort((store.end[rows], store.start[rows], role_codes))
+
+        self.role_names = role_names
+        self.rows = rows[order]
+        self.role = role_codes[order]
+        self.actor = store.actor[self.rows]
+        self.start = store.start[self.rows]
+        self.end = store.end[self.rows]
+        self.labels = labels
+        self.status = [status for _, _, status in parsed]
+
+        highlights = store.visualization_config.actor_highlights if store.visualization_config else []
+        highlighted = {h.name for h in highlights}
+        self.flagged_actor = [label in highlighted or (status or "").lower().startswith("unqualified")
+                              for label, (_, _, status) in zip(labels, parsed)]
+
+    def groups(self):
+        """(role name, slice) per role, each slice sorted by start"""
+        bounds = np.flatnonzero(np.diff(self.role)) + 1
+        edges = [0, *bounds.tolist(), len(self.role)]
+        for lo, hi in zip(edges, edges[1:]):
+            if hi > lo:
+                yield self.role_names[int(self.role[lo])], slice(lo, hi)
+
+
+def find_overlaps(bars: _Bars) -> dict:
+    """Same-role tenures held at once by different actors; a heap of active ends per role"""
+    pairs_total = 0
+    examples, by_role = [], []
+    for role, group in bars.groups():
+        active: List[Tuple[int, int]] = []  # (end, index)
+        active_per_actor: Dict[int, int] = {}
+        pairs = peak = distinct = 0  # distinct: actors with an active tenure
+        for i in range(group.start, group.stop):
+            start, actor = int(bars.start[i]), int(bars.actor[i])
+            while active and active[0][0] < start:
+                _, ended = heapq.heappop(active)
+                ended_actor = int(bars.actor[ended])
+                active_per_actor[ended_actor] -= 1
+                distinct -= active_per_actor[ended_actor] == 0
+            others = len(active) - active_per_actor.get(actor, 0)
+            if others:
+                pairs += others
+                if len(examples) < MAX_EXAMPLES:
+                    for _, j in active:
+                        if int(bars.actor[j]) != actor:
+                            examples.append({
+                                "role": role,
+                                "actors": [bars.labels[bars.actor[j]], bars.labels[actor]],
+                                "start": _iso(start),
+                                "end": _iso(min(int(bars.end[i]), int(bars.end[j]))),
+                            })
+                            break
+            heapq.heappush(active, (int(bars.end[i]), i))
+            distinct += active_per_actor.get(actor, 0) == 0
+            active_per_actor[actor] = active_per_actor.get(actor, 0) + 1
+            peak = max(peak, distinct)
+        if pairs:
+            by_role.append({"role": role, "overlapping_pairs": pairs, "max_concurrent": peak})
+        pairs_total += pairs
+    by_role.sort(key=lambda r: -r["overlapping_pairs"])
+    return {"pairs": pairs_total, "by_role": by_role[:MAX_EXAMPLES], "examples": examples}
+
+
+def find_gaps(bars: _Bars, min_days: int = MIN_GAP_DAYS) -> List[dict]:
+    """Vacancies of at least min_days inside each role's covered span (union sweep), longest first"""
+    gaps = []
+    for role, group in bars.groups():
+        covered_until = None
+        for i in range(group.start, group.stop):
+            start, end = int(bars.start[i]), int(bars.end[i])
+            if covered_until is not None and start - covered_until - 1 >= min_days:
+                gaps.append({"role": role, "start": _iso(covered_until + 1), "end": _iso(start - 1),
+                             "days": start - covered_until - 1, "next_actor": bars.labels[bars.actor[i]]})
+            covered_until = end if covered_until is None else max(covered_until, end)
+    gaps.sort(key=lambda g: -g["days"])
+    return gaps
+
+
+def _next_other_actor(actors: np.ndarray) -> List[int]:
+    """For each position, the first later position held by a different actor (len if none)"""
+    run_starts = np.flatnonzero(actors[1:] != actors[:-1]) + 1
+    ends = np.append(run_starts, len(actors))
+    return ends[np.searchsorted(run_starts, np.arange(len(actors)), side="right")].tolist()
+
+
+def find_successions(bars: _Bars, within_days: int = SUCCESSION_DAYS) -> List[dict]:
+    """
+    Hand-offs: for each tenure, the first other actor in the same role starting within
+    within_days of its end (before or after). Binary search over the role's sorted starts,
+    then one jump past the run of this actor's own tenures, so many tenures of one actor stay
+    O(n log n).
+    """
+    successions = []
+    for role, group in bars.groups():
+        starts = bars.start[group].tolist()
+        actors = bars.actor[group]
+        next_other = _next_other_actor(actors)
+        actors = actors.tolist()
+        for k in range(len(starts)):
+            i = group.start + k
+            end, actor = int(bars.end[i]), actors[k]
+            # Successors start after this tenure did: only later starts of the start-sorted group
+            lo = max(bisect_left(starts, end - within_days), bisect_right(starts, starts[k]))
+            hi = bisect_right(starts, end + within_days)
+            if lo < hi and actors[lo] == actor:
+                lo = next_other[lo]
+            if lo < hi:
+                j = group.start + lo
+                successor = actors[lo]
+                from_flagged, to_flagged = bars.flagged_actor[actor], bars.flagged_actor[successor]
+                successions.append({
+                    "role": role,
+                    "from_actor": bars.labels[actor],
+                    "to_actor": bars.labels[successor],
+                    "from_end": _iso(end),
+                    "to_start": _iso(int(bars.start[j])),
+                    "gap_days": int(bars.start[j]) - end,
+                    "from_status": bars.status[actor],
+                    "to_status": bars.status[successor],
+                    # A qualified/original holder handed over to a flagged one
+                    "flagged": to_flagged and not from_flagged,
+                })
+    successions.sort(key=lambda s: (not s["flagged"], s["to_start"]))
+    return successions
+
+
+def find_milestone_clusters(store: EventStore, bars: _Bars, within_days: int = CLUSTER_DAYS) -> List[dict]:
+    """Tenure starts and ends within within_days of each milestone; busiest first"""
+    milestones = np.flatnonzero(store.point_mask() & store.dated_mask())
+    starts, ends = np.sort(bars.start), np.sort(bars.end)
+    clusters = []
+    for row in milestones[np.argsort(store.start[milestones], kind="stable")].tolist():
+        day = int(store.start[row])
+        began = int(np.searchsorted(starts, day + within_days, "right") - np.searchsorted(starts, day - within_days))
+        ended = int(np.searchsorted(ends, day + within_days, "right") - np.searchsorted(ends, day - within_days))
+        if began or ended:
+            clusters.append({
+                "milestone": store.actions[store.action[row]],
+                "actor": store.actors[store.actor[row]],
+                "date": _iso(day),
+                "tenures_started": began,
+                "tenures_ended": ended,
+                "changes": began + ended,
+            })
+    clusters.sort(key=lambda c: -c["changes"])
+    return clusters
+
+
+def analyze(store: EventStore, succession_days: int = SUCCESSION_DAYS, cluster_days: int = CLUSTER_DAYS,
+            min_gap_days: int = MIN_GAP_DAYS) -> dict:
+    """Every analysis over one timeline; lists are capped at MAX_EXAMPLES, counts are exact"""
+    bars = _Bars(store)
+    overlaps = find_overlaps(bars)
+    gaps = find_gaps(bars, min_gap_days)
+    successions = find_successions(bars, succession_days)
+    clusters = find_milestone_clusters(store, bars, cluster_days)
+    return {
+        "parameters": {"succession_days": succession_days, "cluster_days": cluster_days,
+                       "min_gap_days": min_gap_days},
+        "summary": {
+            "bars": len(bars.rows),
+            "roles": len(bars.role_names),
+            "overlapping_pairs": overlaps["pairs"],
+            "gaps": len(gaps),
+            "successions": len(successions),
+            "flagged_successions": sum(1 for s in successions if s["flagged"]),
+            "milestone_clusters": len(clusters),
+        },
+        "overlaps": overlaps,
+        "gaps": gaps[:MAX_EXAMPLES],
+        "successions": successions[:MAX_EXAMPLES],
+        "milestone_clusters": clusters[:MAX_EXAMPLES],
+    }
+
+
+def footer_text(analysis: dict) -> Optional[str]:
+    """One-line chart footer from analyze() results, None if nothing stands out"""
+    summary, notes = analysis["summary"], []
+    days = analysis["parameters"]["succession_days"]
+    if summary["flagged_successions"]:
+        notes.append(f"⚠ {summary['flagged_successions']:,} qualified holders replaced by flagged appointees "
+                     f"within {days} days")
+    elif summary["successions"]:
+        notes.append(f"{summary['successions']:,} role hand-offs within {days} days")
+    if summary["overlapping_pairs"]:
+        busiest = analysis["overlaps"]["by_role"][0]
+        notes.append(f"{summary['overlapping_pairs']:,} overlapping tenures in the same role "
+                     f"(up to {busiest['max_concurrent']} concurrent {busiest['role']})")
+    if analysis["gaps"]:
+        gap = analysis["gaps"][0]
+        notes.append(f"Longest vacancy: {gap['role']}, {gap['days']} days")
+    if analysis["milestone_clusters"]:
+        cluster = analysis["milestone_clusters"][0]
+        notes.append(f"{cluster['changes']:,} leadership changes within {analysis['parameters']['cluster_days']} days "
+                     f"of {cluster['actor']} {cluster['milestone']} ({cluster['date']})")
+    # Three notes at most - the footer is a single line under the chart
+    return " • ".join(notes[:3]) if notes else None
+
+
+def chart_footer(timeline_data: TimelineData, bar_events: List[Event], milestone_events: List[Event]) -> Optional[str]:
+    """
+    The chart footer: the model's footer_analysis, else footer_text() over the drawn bars
+    (after any focus filter) and milestones, else the first milestones
+    """
+    config = timeline_data.visualization_config
+    if config and config.footer_analysis:
+        return config.footer_analysis
+    drawn = TimelineData(case=timeline_data.case, events=bar_events + [m for m in milestone_events if m.end is None],
+                         visualization_config=config)
+    footer = footer_text(analyze(EventStore.from_timeline(drawn)))
+    if not footer and milestone_events:
+        footer = f"Key milestones: {', '.join([m.action for m in milestone_events[:3]])}"
+    return footer
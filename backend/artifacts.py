@@ -0,0 +1,252 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import FileResponse, JSONResponse, Response
+
+import metrics
+
+try:
+    import brotli
+except ImportError:  # brotli is optional - gzip variants are always produced
+    brotli = None
+
+
+OUTPUT_DIR = "output"
+
+# Only plain names like "timeline.3f9a0c1d2e4b5a69.html" - no separators, no dotfiles
+SAFE_FILENAME = re.compile(r"^[A-Za-z0-9_][A-Za-z0-9._\- ()]{0,254}$")
+
+# Content-hashed artifacts never change, so they can be cached forever
+HASHED_FILENAME = re.compile(r"\.([0-9a-f]{16})\.[A-Za-z0-9]+$")
+
+# Text formats worth precompressing (PNG is already compressed)
+COMPRESSIBLE_EXTENSIONS = {".html", ".js", ".css", ".json", ".svg", ".txt"}
+MIN_COMPRESS_BYTES = 1024
+
+# Served variants in order of preference: (content-encoding, file suffix)
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# path -> (mtime_ns, size, sha256 hex) so digests are only computed once per file version
+_digest_cache: Dict[str, Tuple[int, int, str]] = {}
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file, cached by (mtime, size)"""
+    stat = os.stat(path)
+    cached = _digest_cache.get(path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        metrics.record_cache("artifact_digest", hit=True)
+        return cached[2]
+    metrics.record_cache("artifact_digest", hit=False)
+
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(block)
+    digest = sha.hexdigest()
+
+    _digest_cache[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
+
+
+def precompress(path: str) -> List[str]:
+    """
+    Write .gz (and .br when brotli is installed) siblings next to a text artifact.
+
+    Compression happens once at write time at maximum level, so serving is just a file read.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in COMPRESSIBLE_EXTENSIONS or os.path.getsize(path) < MIN_COMPRESS_BYTES:
+        return []
+
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    written = []
+
+    # mtime=0 keeps the gzip bytes deterministic for identical content
+    gz_path = path + ".gz"
+    with open(gz_path, "wb") as f:
+        f.write(gzip.compress(raw, compresslevel=9, mtime=0))
+    written.append(gz_path)
+
+    if brotli is not None:
+        br_path = path + ".br"
+        with open(br_path, "wb") as f:
+            f.write(brotli.compress(raw, quality=11))
+        written.append(br_path)
+
+    return written
+
+
+def publish(path: str) -> str:
+    """
+    Rename a freshly written artifact to a content-hashed name and precompress it.
+
+    "output/timeline.html" becomes "output/timeline.<hash16>.html". Returns the new filename
+    (without directory), which is what goes into /output/ URLs.
+    """
+    directory, filename = os.path.split(path)
+    stem, ext = os.path.splitext(filename)
+    digest = file_digest(path)
+
+    hashed_name = f"{stem}.{digest[:16]}{ext}"
+    hashed_path = os.path.join(directory, hashed_name)
+    os.replace(path, hashed_path)
+    _digest_cache.pop(path, None)
+
+    precompress(hashed_path)
+    return hashed_name
+
+
+def resolve_artifact_path(filename: str, root: str = OUTPUT_DIR) -> Optional[str]:
+    """Map a requested filename to a file inside root, or None if it is invalid or missing"""
+    if not SAFE_FILENAME.match(filename) or ".." in filename:
+        return None
+
+    root_real = os.path.realpath(root)
+    file_path = os.path.realpath(os.path.join(root_real, filename))
+
+    # Resolved path must sit directly inside the root (catches symlinks pointing elsewhere)
+    if os.path.dirname(file_path) != root_real:
+        return None
+    if not os.path.isfile(file_path):
+        return None
+    return file_path
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Parse Accept-Encoding into {coding: q}"""
+    accepted = {}
+    for part in header.split(","):
+        pieces = part.strip().split(";")
+        coding = pieces[0].strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in pieces[1:]:
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(file_path: str, accept_encoding: str) -> Tuple[str, Optional[str]]:
+    """Pick the best precompressed variant the client accepts: (path to send, content-encoding)"""
+    if not accept_encoding:
+        return file_path, None
+
+    accepted = parse_accept_encoding(accept_encoding)
+    for coding, suffix in ENCODINGS:
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > 0 and os.path.isfile(file_path + suffix):
+            return file_path + suffix, coding
+    return file_path, None
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison as required for If-None-Match (RFC 9110 13.1.2)"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def payload_response(request: Request, digest: str, build: Callable[[], bytes],
+                     media_type: str = "application/json") -> Response:
+    """
+    Conditional, compressed response for a payload computed per request (not a file).
+
+    digest identifies the payload's content (e.g. a hash of what it is built from), so If-None-Match
+    is answered with 304 before build() runs. Otherwise the body is compressed on the fly (brotli
+    when installed and accepted, else gzip) if it is large enough to benefit.
+    """
+    accepted = parse_accept_encoding(request.headers.get("accept-encoding", ""))
+    encoding = None
+    for coding, _ in ENCODINGS:
+        if (coding != "br" or brotli is not None) and accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            encoding = coding
+            break
+
+    # Bodies under MIN_COMPRESS_BYTES go out uncompressed with the identity ETag even when an
+    # encoding is accepted; the body's size is unknown before build(), so either tag validates
+    identity = f'"{digest}"'
+    etag = f'"{digest}-{encoding}"' if encoding else identity
+    headers = {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+
+    if_none_match = request.headers.get("if-none-match")
+    matched = next((tag for tag in (etag, identity) if if_none_match and etag_matches(if_none_match, tag)), None)
+    metrics.record_cache("http_conditional", hit=matched is not None)
+    if matched is not None:
+        headers["ETag"] = matched  # The representation the client holds
+        return Response(status_code=304, headers=headers)
+
+    body = build()
+    if encoding and len(body) >= MIN_COMPRESS_BYTES:
+        # Fast levels: this runs per request, unlike precompress()
+        body = brotli.compress(body, quality=5) if encoding == "br" else gzip.compress(body, compresslevel=6, mtime=0)
+        headers["Content-Encoding"] = encoding
+    elif encoding:
+        headers["ETag"] = identity  # Sent uncompressed: the identity representation
+    return Response(body, headers=headers, media_type=media_type)
+
+
+def artifact_response(request: Request, filename: str, root: str = OUTPUT_DIR,
+                      immutable: Optional[bool] = None) -> Response:
+    """
+    Build the response for GET /output/{filename}.
+
+    - Strong ETag per representation (identity, gzip, br) derived from the content hash
+    - Content-hashed names (or immutable=True) are cached forever; everything else must revalidate
+    - If-None-Match -> 304 without touching the body
+    - Precompressed .br/.gz variants picked by Accept-Encoding
+    """
+    file_path = resolve_artifact_path(filename, root)
+    if file_path is None:
+        return JSONResponse({"error": "File not found"}, status_code=404)
+
+    send_path, encoding = choose_encoding(file_path, request.headers.get("accept-encoding", ""))
+
+    digest = file_digest(file_path)[:32]
+    etag = f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+
+    if immutable is None:
+        immutable = bool(HASHED_FILENAME.search(filename))
+    cache_control = IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+
+    # A 304 is a hit in the client's cache; a full response is a miss
+    if_none_match = request.headers.get("if-none-match")
+    not_modified = bool(if_none_match) and etag_matches(if_none_match, etag)
+    metrics.record_cache("http_conditional", hit=not_modified)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+
+    # media_type comes from the original name so "timeline.html.br" is still text/html
+    media_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+    return FileResponse(send_path, headers=headers, media_type=media_type)
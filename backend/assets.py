@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Shared, locally hosted JavaScript libraries for chart HTML.
+
+Every chart references one versioned copy of each library under /assets/ instead of
+inlining plotly.js (~4.8 MB) or loading d3/html2canvas from public CDNs. Versioned names
+never change content, so they are served as immutable and cached by the browser once.
+
+- plotly.js comes straight from the installed plotly package (always available offline)
+- d3 and html2canvas live in static/vendor/ and are fetched at setup (README "Setup"), once on
+  a networked machine before deploying to offline hosts. There is no CDN fallback: rendering a
+  chart that needs a missing library raises, and warm-up reports it.
+
+    python assets.py fetch    # download the pinned versions
+    python assets.py check    # exit 1 if any is missing (deploy pipelines)
+"""
+
+import os
+import sys
+import urllib.request
+from typing import Dict, List
+
+import artifacts
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "vendor")
+
+# URL prefix the chart HTML uses to reference assets (override when served behind a proxy path)
+ASSET_BASE_URL = os.getenv("HUBBLE_ASSET_BASE_URL", "/assets").rstrip("/")
+
+# Pinned third-party libraries: name -> (version, source URL for `python assets.py fetch`)
+VENDORED_LIBRARIES = {
+    "d3": ("7.9.0", "https://cdn.jsdelivr.net/npm/d3@{version}/dist/d3.min.js"),
+    "html2canvas": ("1.4.1", "https://cdn.jsdelivr.net/npm/html2canvas@{version}/dist/html2canvas.min.js"),
+}
+
+
+def plotly_version() -> str:
+    import plotly.offline
+    return plotly.offline.get_plotlyjs_version()
+
+
+def asset_filename(library: str) -> str:
+    """Versioned filename, e.g. 'd3-7.9.0.min.js'"""
+    if library == "plotly":
+        return f"plotly-{plotly_version()}.min.js"
+    version, _ = VENDORED_LIBRARIES[library]
+    return f"{library}-{version}.min.js"
+
+
+def ensure_plotly_asset() -> str:
+    """Write the installed plotly.js bundle to the asset dir once (and precompress it)"""
+    path = os.path.join(ASSET_DIR, asset_filename("plotly"))
+    if not os.path.exists(path):
+        import plotly.offline
+        os.makedirs(ASSET_DIR, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(plotly.offline.get_plotlyjs())
+        os.replace(tmp_path, path)
+        artifacts.precompress(path)
+        print(f"[SUCCESS] plotly.js {plotly_version()} written to {path}")
+    return path
+
+
+def missing_assets() -> List[str]:
+    """Filenames of pinned libraries not yet fetched into static/vendor/"""
+    return [asset_filename(library) for library in VENDORED_LIBRARIES
+            if not os.path.exists(os.path.join(ASSET_DIR, asset_filename(library)))]
+
+
+def asset_url(library: str) -> str:
+    """URL chart HTML should load a library from; FileNotFoundError if it has not been fetched"""
+    if library == "plotly":
+        ensure_plotly_asset()
+        return f"{ASSET_BASE_URL}/{asset_filename('plotly')}"
+
+    filename = asset_filename(library)
+    if not os.path.exists(os.path.join(ASSET_DIR, filename)):
+        raise FileNotFoundError(f"{filename} is not in {ASSET_DIR} - run `python assets.py fetch`")
+    return f"{ASSET_BASE_URL}/{filename}"
+
+
+def asset_response(request, filename: str):
+    """Response for GET /assets/{filename} - versioned names are always immutable"""
+    if filename == asset_filename("plotly"):
+        ensure_plotly_asset()
+    return artifacts.artifact_response(request, filename, root=ASSET_DIR, immutable=True)
+
+
+def fetch_vendored_assets() -> Dict[str, str]:
+    """Download pinned d3/html2canvas into static/vendor/ (run once, with network access)"""
+    os.makedirs(ASSET_DIR, exist_ok=True)
+    written = {}
+    for library, (version, source_url) in VENDORED_LIBRARIES.items():
+        path = os.path.join(ASSET_DIR, asset_filename(library))
+        url = source_url.format(version=version)
+        with urllib.request.urlopen(url, timeout=30) as response:
+            content = response.read()
+        if not content:
+            raise ValueError(f"Empty download: {url}")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        artifacts.precompress(path)
+        written[library] = path
+        print(f"[SUCCESS] {library} {version} saved to {path}")
+    ensure_plotly_asset()
+    return written
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == "fetch":
+        fetch_vendored_assets()
+    elif command == "check":
+        missing = missing_assets()
+        for filename in missing:
+            print(f"[BACKEND ERROR] {filename} missing from {ASSET_DIR} - run `python assets.py fetch`")
+        sys.exit(1 if missing else 0)
+    else:
+        print("Usage: python assets.py fetch | check")
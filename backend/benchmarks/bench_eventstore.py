@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Columnar event store benchmark: EventStore against lists of pydantic Event objects.
+
+For each size it reports retained memory per event (both built from the same session JSON and
+measured with tracemalloc), the build and round-trip cost, and the time of the filter / sort /
+aggregation operations the renderers need, done with Python loops over Event objects and with
+EventStore's vectorized queries.
+
+The synthetic timelines repeat a handful of action and context strings, which the store's
+interned string tables hold once; real extractions mostly do not. Memory is therefore measured
+twice: on the synthetic text as generated ("repeated text", a best case for the store) and with
+every event's action and context made distinct ("distinct text", closer to real documents).
+The distinct-text ratio is the one to quote.
+
+    python benchmarks/bench_eventstore.py                    # 1k, 10k, 100k events
+    python benchmarks/bench_eventstore.py --sizes 10000 --repeat 20
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from eventstore import EventStore, parse_day
+from models import TimelineData
+from synthetic import generate_timeline
+
+
+def median_ms(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def retained_bytes(build) -> int:
+    """Memory still allocated after build() returns (its result kept alive)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return retained
+
+
+def build_store(text: str) -> EventStore:
+    timeline = TimelineData.model_validate_json(text)
+    store = EventStore.from_timeline(timeline)
+    del timeline  # Only what the store itself keeps counts
+    gc.collect()
+    return store
+
+
+# The same questions answered both ways -------------------------------------------------------
+
+def python_ops(timeline: TimelineData, focus: set):
+    events = timeline.events
+    bars = [e for e in events if e.end is not None and e.actor in focus]
+    actors = list(dict.fromkeys(e.actor for e in bars))
+    ordered = sorted(events, key=lambda e: (parse_day(e.start)[0], parse_day(e.end)[0]))
+    spans = {}
+    for e in events:
+        if e.end is None:
+            continue
+        start, end = parse_day(e.start)[0], parse_day(e.end)[0]
+        first, last = spans.get(e.actor, (start, end))
+        spans[e.actor] = (min(first, start), max(last, end))
+    roles = Counter(e.roleType for e in events)
+    return actors, ordered, spans, roles
+
+
+def store_ops(store: EventStore, focus: set):
+    bars = store.bar_mask() & store.actor_mask(focus)
+    actors = store.actor_order(bars)
+    ordered = store.sort_rows()
+    spans = store.actor_spans()
+    roles = store.role_counts()
+    return actors, ordered, spans, roles
+
+
+def distinct_text(timeline: TimelineData) -> TimelineData:
+    """The timeline with every event's action and context unique, as in a real extraction"""
+    events = [e.model_copy(update={"action": f"{e.action} (filing {i})",
+                                   "context": f"Per exhibit {i}: {e.context}"})
+              for i, e in enumerate(timeline.events)]
+    return timeline.model_copy(update={"events": events})
+
+
+def memory(timeline: TimelineData) -> tuple:
+    """Retained bytes of (pydantic events, EventStore) built from the timeline's JSON"""
+    text = timeline.model_dump_json()
+    return (retained_bytes(lambda: TimelineData.model_validate_json(text)),
+            retained_bytes(lambda: build_store(text)))
+
+
+def bench_size(n_events: int, repeat: int) -> dict:
+    repeated = generate_timeline(n_events)
+    timeline = distinct_text(repeated)
+    store = EventStore.from_timeline(timeline)
+    assert store.to_timeline() == timeline, "round trip is not lossless"
+    focus = set(store.actor_order()[::2])  # Half the actors, like a focus_actors filter
+
+    py_bytes, store_bytes = memory(timeline)
+    repeated_py_bytes, repeated_store_bytes = memory(repeated)
+
+    # Both answer the same questions
+    py_actors, _, py_spans, py_roles = python_ops(timeline, focus)
+    st_actors, _, st_spans, st_roles = store_ops(store, focus)
+    assert py_actors == st_actors and py_spans == st_spans and dict(py_roles) == st_roles
+
+    result = {
+        "events": n_events,
+        "pydantic_bytes_per_event": round(py_bytes / n_events, 1),
+        "store_bytes_per_event": round(store_bytes / n_events, 1),
+        "build_ms": round(median_ms(lambda: EventStore.from_timeline(timeline), repeat), 2),
+        "to_timeline_ms": round(median_ms(store.to_timeline, repeat), 2),
+        "python_ops_ms": round(median_ms(lambda: python_ops(timeline, focus), repeat), 2),
+        "store_ops_ms": round(median_ms(lambda: store_ops(store, focus), repeat), 2),
+    }
+    result["memory_ratio"] = round(py_bytes / store_bytes, 2)
+    result["memory_ratio_repeated_text"] = round(repeated_py_bytes / repeated_store_bytes, 2)
+    result["ops_speedup"] = round(result["python_ops_ms"] / result["store_ops_ms"], 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated event counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=None, help="Also write results JSON here")
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        r = bench_size(size, args.repeat)
+        results.append(r)
+        print(f"{size:>7,} events  memory/event: pydantic {r['pydantic_bytes_per_event']:>7.0f} B  "
+              f"store {r['store_bytes_per_event']:>6.0f} B (x{r['memory_ratio']}, "
+              f"x{r['memory_ratio_repeated_text']} with repeated text)  "
+              f"build {r['build_ms']:>8.1f} ms  to_timeline {r['to_timeline_ms']:>8.1f} ms  "
+              f"filter/sort/aggregate: python {r['python_ops_ms']:>8.1f} ms  store {r['store_ops_ms']:>6.2f} ms "
+              f"(x{r['ops_speedup']})")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+PDF ingestion benchmark: every engine in ingest.ENGINES on synthetic corpora (corpus.py).
+
+For each (engine, page count) it reports pages/second, peak RSS and extraction fidelity
+(word-level precision/recall/F1 against the text drawn on each page). Every case runs in a
+fresh subprocess, so peak RSS belongs to that case alone.
+
+    python benchmarks/bench_ingest.py                          # 10, 100, 1000, 2000 pages
+    python benchmarks/bench_ingest.py --pages 10,100 --engines pdfplumber
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import time
+from collections import Counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from corpus import CORPUS_DIR, ensure_corpus, truth_path
+
+DEFAULT_PAGES = "10,100,1000,2000"
+
+WORD = re.compile(r"\w+")
+
+
+def peak_rss_mb() -> float:
+    # Linux: VmHWM of this address space (ru_maxrss survives exec, so it would include the
+    # parent's peak at fork time)
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_worker(engine: str, pdf_path: str, text_path: str) -> None:
+    """Subprocess entry point: extract once, print timing and peak RSS as JSON"""
+    from ingest import ENGINES
+
+    baseline_rss = peak_rss_mb()
+    started = time.perf_counter()
+    text = ENGINES[engine](pdf_path)
+    seconds = time.perf_counter() - started
+
+    with open(text_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    print(json.dumps({"seconds": seconds, "peak_rss_mb": peak_rss_mb(), "baseline_rss_mb": baseline_rss}))
+
+
+def fidelity(extracted: str, truth: dict) -> dict:
+    """Bag-of-words precision/recall/F1 - insensitive to line order and column layout"""
+    expected = Counter()
+    for page in truth["pages"]:
+        for line in page["header"] + page["body"] + page["footer"]:
+            expected.update(WORD.findall(line))
+    found = Counter(WORD.findall(extracted))
+    matched = sum((expected & found).values())
+    precision = matched / max(1, sum(found.values()))
+    recall = matched / max(1, sum(expected.values()))
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": round(precision, 4), "recall": round(recall, 4), "f1": round(f1, 4)}
+
+
+def bench_case(engine: str, pages: int, args) -> dict:
+    pdf_path = ensure_corpus(pages, args.seed, args.corpus_dir)
+    with open(truth_path(pdf_path), encoding="utf-8") as f:
+        truth = json.load(f)
+
+    text_path = f"{pdf_path}.{engine}.txt"
+    try:
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", engine, pdf_path, text_path],
+            capture_output=True, text=True, timeout=args.timeout
+        )
+        if completed.returncode != 0:
+            return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr else "worker failed"}
+        measured = json.loads(completed.stdout.strip().splitlines()[-1])
+        with open(text_path, encoding="utf-8") as f:
+            extracted = f.read()
+    except subprocess.TimeoutExpired:
+        return {"error": f"timed out after {args.timeout:.0f}s"}
+    finally:
+        if os.path.exists(text_path):
+            os.remove(text_path)
+
+    return {
+        "pages": pages,
+        "seconds": round(measured["seconds"], 3),
+        "pages_per_second": round(pages / measured["seconds"], 1),
+        "peak_rss_mb": round(measured["peak_rss_mb"], 1),
+        "rss_growth_mb": round(measured["peak_rss_mb"] - measured["baseline_rss_mb"], 1),
+        "fidelity": fidelity(extracted, truth),
+    }
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == "--worker":
+        run_worker(*sys.argv[2:])
+        return 0
+
+    from ingest import ENGINES
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default=DEFAULT_PAGES, help="Comma-separated page counts")
+    parser.add_argument("--engines", default=",".join(ENGINES), help=f"Any of: {', '.join(ENGINES)}")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--corpus-dir", default=CORPUS_DIR)
+    parser.add_argument("--budget", type=float, default=300.0,
+                        help="Skip larger page counts once an engine projects past this many seconds")
+    parser.add_argument("--timeout", type=float, default=1800.0, help="Per-case timeout (seconds)")
+    parser.add_argument("--output", default=None, help="Also write results JSON here")
+    args = parser.parse_args()
+
+    page_counts = sorted(int(p) for p in args.pages.split(","))
+    results = {}
+
+    for engine in args.engines.split(","):
+        if engine not in ENGINES:
+            print(f"[WARNING] Unknown engine {engine} - available: {', '.join(ENGINES)}")
+            continue
+        previous = None  # (pages, seconds) of the last case that ran
+        for pages in page_counts:
+            case = f"{engine}/{pages}"
+            if previous and previous[1] * (pages / previous[0]) > args.budget:
+                results[case] = {"skipped": f"projected over {args.budget:.0f}s budget"}
+                print(f"{case:<20} skipped (projected over {args.budget:.0f}s budget)")
+                continue
+
+            result = bench_case(engine, pages, args)
+            results[case] = result
+            if "error" in result:
+                print(f"{case:<20} [BACKEND ERROR] {result['error']}")
+                continue
+            previous = (pages, result["seconds"])
+            fid = result["fidelity"]
+            print(f"{case:<20} {result['pages_per_second']:>8.1f} pages/s  {result['seconds']:>8.2f}s  "
+                  f"peak_rss={result['peak_rss_mb']:>7.1f}MB (+{result['rss_growth_mb']:.1f})  "
+                  f"P={fid['precision']:.3f} R={fid['recall']:.3f} F1={fid['f1']:.3f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "meta": {"python": platform.python_version(), "platform": platform.platform(), "seed": args.seed},
+                "results": results,
+            }, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Cross-document merge benchmark: blocked actor resolution against all-pairs comparison.
+
+Each synthetic matter has a pool of people; every document mentions some of them under the
+label variants real extractions produce ("Dr. Eleanor Park - CSO (Original)", "Eleanor Park",
+"Park, Eleanor - CSO", "E. Park - Chief Scientific Officer", small typos) with jittered dates.
+For each document count it reports:
+
+- distinct actor labels, resolved actors and the true number of people
+- pairwise precision / recall of the resolution against the ground truth
+- comparisons made by blocking vs the all-pairs count, and both wall times (all-pairs is only
+  timed up to --max-baseline-pairs)
+- events in/out of merge_timelines and its total time
+
+    python benchmarks/bench_merge.py                    # 10, 100, 500 documents
+    python benchmarks/bench_merge.py --documents 200 --people 400
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import merge
+from models import CaseMetadata, Event, TimelineData
+from synthetic import FIRST_NAMES, MILESTONE_ACTIONS, MILESTONE_ACTORS, ROLE_TYPES
+
+TITLES = [("CEO", "Chief Executive Officer"), ("CFO", "Chief Financial Officer"),
+          ("CSO", "Chief Scientific Officer"), ("COO", "Chief Operating Officer"),
+          ("GC", "General Counsel"), ("CCO", "Chief Compliance Officer"), ("Controller", "Controller")]
+SYLLABLES = ["ber", "mar", "lin", "ton", "ka", "vel", "dro", "sen", "ho", "wick", "ram", "fel", "stad", "quist"]
+
+
+def make_people(n: int, rng: random.Random) -> list:
+    """n people with distinct names: (first, last, title index, status)"""
+    people, seen = [], set()
+    while len(people) < n:
+        first = rng.choice(FIRST_NAMES)
+        last = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+        if (first, last) in seen:
+            continue
+        seen.add((first, last))
+        people.append((first, last, rng.randrange(len(TITLES)), rng.choice(["Original", "Unqualified", "Replacement"])))
+    return people
+
+
+def variant(person, rng: random.Random) -> str:
+    first, last, title_index, status = person
+    short, long = TITLES[title_index]
+    roll = rng.random()
+    if roll < 0.3:
+        return f"{first} {last} - {short} ({status})"
+    if roll < 0.45:
+        return f"Dr. {first} {last} - {short} ({status})"
+    if roll < 0.6:
+        return f"{last}, {first} - {short}"
+    if roll < 0.7:
+        return f"{first[0]}. {last} - {long}"
+    if roll < 0.8:
+        return f"{first} {last[:-1]} - {short} ({status})"  # Typo in the last name
+    return f"{first} {last}"
+
+
+def make_matter(n_documents: int, n_people: int, mentions: int = 15, seed: int = 42):
+    """(timelines, label -> person index) for one synthetic matter"""
+    rng = random.Random(seed)
+    people = make_people(n_people, rng)
+    tenures = {}
+    for p in range(n_people):
+        start = date(2012, 1, 1) + timedelta(days=rng.randrange(8 * 365))
+        tenures[p] = (start, start + timedelta(days=rng.randint(90, 4 * 365)))
+    milestones = [(rng.choice(MILESTONE_ACTORS), rng.choice(MILESTONE_ACTIONS),
+                   date(2014, 1, 1) + timedelta(days=rng.randrange(8 * 365))) for _ in range(20)]
+
+    truth, timelines = {}, []
+    for d in range(n_documents):
+        events = []
+        for p in rng.sample(range(n_people), min(mentions, n_people)):
+            label = variant(people[p], rng)
+            truth[label] = p
+            start, end = tenures[p]
+            jitter = timedelta(days=rng.randint(-20, 20))
+            events.append(Event(actor=label, action=f"served as {TITLES[people[p][2]][0]}", roleType=rng.choice(ROLE_TYPES),
+                                start=(start + jitter).isoformat(), end=(end + jitter).isoformat(),
+                                context=f"Document {d}"))
+        for actor, action, day in rng.sample(milestones, 3):
+            truth.setdefault(actor, n_people + MILESTONE_ACTORS.index(actor))
+            events.append(Event(actor=actor, action=action, roleType="Regulatory Affairs",
+                                start=(day + timedelta(days=rng.randint(-2, 2))).isoformat(),
+                                context=f"Document {d}", milestone=True))
+        timelines.append(TimelineData(case=CaseMetadata(name="Synthetic Matter"), events=events))
+    return timelines, truth
+
+
+def pair_count(sizes) -> int:
+    return sum(n * (n - 1) // 2 for n in sizes)
+
+
+def score(canonical: dict, truth: dict) -> dict:
+    """Pairwise precision / recall of the resolved clusters against the true people"""
+    by_cluster = Counter(canonical[label] for label in truth)
+    by_person = Counter(truth.values())
+    by_both = Counter((canonical[label], truth[label]) for label in truth)
+    true_positive = pair_count(by_both.values())
+    predicted, actual = pair_count(by_cluster.values()), pair_count(by_person.values())
+    return {
+        "precision": round(true_positive / predicted, 4) if predicted else 1.0,
+        "recall": round(true_positive / actual, 4) if actual else 1.0,
+    }
+
+
+def all_pairs_matches(labels: list) -> int:
+    """The comparison blocking avoids: every label against every other one"""
+    tokens = [merge.name_tokens(label) for label in labels]
+    matches = 0
+    for i in range(len(tokens)):
+        for j in range(i + 1, len(tokens)):
+            matches += merge.same_name(tokens[i], tokens[j])
+    return matches
+
+
+def bench(n_documents: int, n_people: int, max_baseline_pairs: int) -> dict:
+    timelines, truth = make_matter(n_documents, n_people)
+    label_counts = Counter(e.actor for t in timelines for e in t.events)
+
+    started = time.perf_counter()
+    canonical, stats = merge.resolve_actors(label_counts)
+    resolve_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    merged, merge_stats = merge.merge_timelines(timelines)
+    merge_ms = (time.perf_counter() - started) * 1000
+
+    baseline_ms = None
+    if stats["all_pairs"] <= max_baseline_pairs:
+        started = time.perf_counter()
+        all_pairs_matches(list(label_counts))
+        baseline_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    return {
+        "documents": n_documents,
+        "labels": stats["actor_labels"],
+        "actors": stats["actors"],
+        "true_actors": len(set(truth.values())),
+        **score(canonical, truth),
+        "comparisons": stats["comparisons"],
+        "all_pairs": stats["all_pairs"],
+        "largest_block": stats["largest_block"],
+        "resolve_ms": round(resolve_ms, 1),
+        "all_pairs_ms": baseline_ms,
+        "events_in": merge_stats["events_in"],
+        "events_out": merge_stats["events_out"],
+        "merge_ms": round(merge_ms, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", default="10,100,500", help="Comma-separated document counts")
+    parser.add_argument("--people", type=int, default=300, help="People in the matter")
+    parser.add_argument("--max-baseline-pairs", type=int, default=2_000_000)
+    parser.add_argument("--output", default=None, help="Also write results JSON here")
+    args = parser.parse_args()
+
+    results = []
+    for n in (int(d) for d in args.documents.split(",")):
+        r = bench(n, args.people, args.max_baseline_pairs)
+        results.append(r)
+        baseline = f"{r['all_pairs_ms']:>9.1f} ms" if r["all_pairs_ms"] is not None else "  (skipped)"
+        print(f"{n:>4} docs  labels {r['labels']:>5}  actors {r['actors']:>4} (true {r['true_actors']})  "
+              f"precision {r['precision']:.3f}  recall {r['recall']:.3f}  "
+              f"comparisons {r['comparisons']:>7,} of {r['all_pairs']:>10,}  resolve {r['resolve_ms']:>7.1f} ms  "
+              f"all-pairs {baseline}  events {r['events_in']:>6,} -> {r['events_out']:>5,}  "
+              f"merge {r['merge_ms']:>7.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"people": args.people, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Session channel benchmark: bytes per chart edit as JSON Patch diffs vs whole chart specs.
+
+Runs a fixed editing session (highlight an actor, recolor a role, reword an event, change the
+footer, focus on a few actors, clear the focus, remove the highlight) on synthetic timelines,
+the way /api/sessions/{id}/ws does it: chartspec.apply_commands, build_spec, patches.diff against
+the previous spec. For each size and edit it reports patch ops, patch bytes (raw and gzip, the
+permessage-deflate ballpark) against the whole spec, and apply + build + diff time; every patch
+is checked with patches.apply.
+
+    python benchmarks/bench_patches.py                    # 1,000 and 10,000 events
+    python benchmarks/bench_patches.py --sizes 100 --no-tooltips
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import chartspec
+import patches
+import serialization
+from synthetic import generate_timeline
+
+
+def edits(timeline) -> list:
+    """(name, commands) of the editing session"""
+    first = timeline.events[0]
+    actors = list(dict.fromkeys(e.actor for e in timeline.events if e.end))[:5]
+    return [
+        ("highlight", [{"op": "highlight", "actor": first.actor, "color": "#f97316", "reason": "Late filing"}]),
+        ("role_color", [{"op": "role_color", "role": first.roleType, "color": "#2563eb"}]),
+        ("update_event", [{"op": "update_event", "event": 0, "fields": {"context": "Per the amended 10-K"}}]),
+        ("footer", [{"op": "footer", "text": "Three officers resigned within 60 days of the warning letter."}]),
+        ("focus", [{"op": "focus", "actors": actors}]),
+        ("unfocus", [{"op": "focus", "actors": None}]),
+        ("unhighlight", [{"op": "unhighlight", "actor": first.actor}]),
+    ]
+
+
+def size(value) -> tuple:
+    body = serialization.dumps(value).encode("utf-8")
+    return len(body), len(gzip.compress(body, 6))
+
+
+def bench(events: int, tooltips: bool) -> dict:
+    timeline = generate_timeline(events)
+    spec = chartspec.build_spec(timeline, chartspec.color_map(timeline), tooltips)
+    spec_bytes, spec_gzip = size(spec)
+    rows = []
+    for name, commands in edits(timeline):
+        started = time.perf_counter()
+        timeline = chartspec.apply_commands(timeline, commands)
+        new_spec = chartspec.build_spec(timeline, chartspec.color_map(timeline), tooltips)
+        built_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        patch = patches.diff(spec, new_spec)
+        diff_ms = (time.perf_counter() - started) * 1000
+        if patches.apply(spec, patch) != new_spec:
+            raise AssertionError(f"{name}: patch does not reproduce the new spec")
+        patch_bytes, patch_gzip = size(patch)
+        new_bytes, new_gzip = size(new_spec)
+        rows.append({"edit": name, "ops": len(patch), "patch_bytes": patch_bytes, "patch_gzip": patch_gzip,
+                     "spec_bytes": new_bytes, "spec_gzip": new_gzip,
+                     "build_ms": round(built_ms, 1), "diff_ms": round(diff_ms, 1)})
+        spec = new_spec
+    return {"events": events, "tooltips": tooltips, "spec_bytes": spec_bytes, "spec_gzip": spec_gzip,
+            "edits": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000", help="Comma-separated event counts")
+    parser.add_argument("--no-tooltips", action="store_true", help="Specs without tooltip text")
+    parser.add_argument("--output", default=None, help="Also write results JSON here")
+    args = parser.parse_args()
+
+    results = []
+    for events in (int(n) for n in args.sizes.split(",")):
+        r = bench(events, not args.no_tooltips)
+        results.append(r)
+        print(f"{events:>6} events  spec {r['spec_bytes'] / 1024:>8.1f} KB ({r['spec_gzip'] / 1024:.1f} KB gzip)")
+        for e in r["edits"]:
+            print(f"        {e['edit']:<13} {e['ops']:>3} ops  patch {e['patch_bytes']:>7,} B "
+                  f"({e['patch_gzip']:>6,} B gzip) vs spec {e['spec_bytes']:>9,} B  "
+                  f"apply+build {e['build_ms']:>7.1f} ms  diff {e['diff_ms']:>6.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Preview benchmark: what progressive chart previews cost during a streamed extraction.
+
+Streams synthetic model responses (fake_llm.response_text_for: <thinking> lines, then the JSON
+block) through previews.PreviewBuilder in the model's chunk size, as extract_events does. For
+each size it reports:
+
+- preview updates and their total bytes against the final chart spec (chartspec.build_spec)
+- scan time over the whole response, polling on every chunk (interval 0, the worst case) and
+  at the default interval's share of chunks (--polls per response)
+- a rescan baseline: pulling the complete events out of the accumulated text from the start
+  at every poll, as a non-incremental preview would
+
+    python benchmarks/bench_previews.py                   # 100 and 1,000 events
+    python benchmarks/bench_previews.py --sizes 5000 --polls 40
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import chartspec
+import previews
+import serialization
+from fake_llm import response_text_for, split_into_chunks
+from synthetic import generate_timeline
+
+
+def stream(chunks: list, poll_every: int) -> tuple:
+    """(updates, scan seconds) of one response polled every poll_every chunks"""
+    builder = previews.PreviewBuilder(interval=0)
+    text, updates, spent = "", [], 0.0
+    for i, chunk in enumerate(chunks, start=1):
+        text += chunk
+        if i % poll_every == 0 or i == len(chunks):
+            started = time.perf_counter()
+            update = builder.poll(text)
+            spent += time.perf_counter() - started
+            if update:
+                updates.append(update)
+    return updates, spent
+
+
+def rescan(chunks: list, poll_every: int) -> float:
+    """Seconds spent when every poll scans the accumulated text from the start"""
+    text, spent = "", 0.0
+    for i, chunk in enumerate(chunks, start=1):
+        text += chunk
+        if i % poll_every == 0 or i == len(chunks):
+            started = time.perf_counter()
+            previews.EventScanner().feed(text)
+            spent += time.perf_counter() - started
+    return spent
+
+
+def bench(events: int, polls: int) -> dict:
+    timeline = generate_timeline(events)
+    chunks = split_into_chunks(response_text_for(timeline))
+    every_chunk, every_chunk_s = stream(chunks, 1)
+    poll_every = max(1, len(chunks) // polls)
+    throttled, throttled_s = stream(chunks, poll_every)
+    spec = chartspec.build_spec(timeline, chartspec.color_map(timeline), tooltips=False)
+    return {
+        "events": events,
+        "chunks": len(chunks),
+        "updates": len(throttled),
+        "update_bytes": sum(len(serialization.dumps(u)) for u in throttled),
+        "spec_bytes": len(serialization.dumps(spec)),
+        "scan_ms_every_chunk": round(every_chunk_s * 1000, 1),
+        "scan_ms_throttled": round(throttled_s * 1000, 1),
+        "rescan_ms_throttled": round(rescan(chunks, poll_every) * 1000, 1),
+        "events_previewed": sum(len(u["bars"]["event"]) + len(u["milestones"]["event"]) for u in every_chunk),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000", help="Comma-separated event counts")
+    parser.add_argument("--polls", type=int, default=20, help="Throttled polls per response")
+    parser.add_argument("--output", default=None, help="Also write results JSON here")
+    args = parser.parse_args()
+
+    results = []
+    for events in (int(n) for n in args.sizes.split(",")):
+        r = bench(events, args.polls)
+        results.append(r)
+        print(f"{events:>6} events  {r['chunks']:>7,} chunks  {r['updates']:>3} updates "
+              f"{r['update_bytes'] / 1024:>7.1f} KB (final spec {r['spec_bytes'] / 1024:>7.1f} KB without tooltips)  "
+              f"scan {r['scan_ms_throttled']:>6.1f} ms throttled, {r['scan_ms_every_chunk']:>7.1f} ms every chunk  "
+              f"rescan baseline {r['rescan_ms_throttled']:>7.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"polls": args.polls, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Revision benchmark: how much of a revised document incremental re-extraction sends to the model.
+
+Takes the synthetic corpus's page text (benchmarks/corpus.py, from its truth files, so no PDF
+engine time) as version 1, and builds version 2 the way revised filings differ: a few lines
+reworded and a new paragraph inserted, with the body reflowed so every later page starts on a
+different line (running headers, Bates numbers and "Page x of y" regenerated). For each page count
+it reports:
+
+- fingerprinting time for a version, and the state-backend lookup (SQLite) among --known other
+  documents' fingerprints (random chunk hashes)
+- shared share of chunks, pages re-extracted vs pages in the document, and the characters sent
+  to the model vs a full compacted extraction
+- whether every edited page was flagged
+
+    python benchmarks/bench_revisions.py                  # 100 and 1,000 pages
+    python benchmarks/bench_revisions.py --pages 500 --edits 10 --known 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import compaction
+import revisions
+from corpus import ensure_corpus, truth_path
+from extractor import MAX_DOCUMENT_CHARS
+from state import SQLiteStateBackend
+
+LINES_PER_PAGE = 50
+OTHER_CHUNKS = 1500  # Chunk hashes per other known document (~100 pages)
+INSERTED = ["On June 14, 2022 the Company received a second warning letter concerning its manufacturing",
+            "controls. The Chief Scientific Officer resigned the same week, effective immediately."]
+
+
+def paginate(lines: list) -> list:
+    """Page texts with a header and a footer, LINES_PER_PAGE body lines each"""
+    total = -(-len(lines) // LINES_PER_PAGE)
+    return ["\n".join(["CASE NO. 2022-CV-1042", "CONFIDENTIAL - ATTORNEY WORK PRODUCT",
+                       *lines[i:i + LINES_PER_PAGE], f"HUB{n:07d}", f"Page {n} of {total}"])
+            for n, i in enumerate(range(0, len(lines), LINES_PER_PAGE), start=1)]
+
+
+def make_versions(pages: int, edits: int, seed: int = 7):
+    """(version 1 pages, version 2 pages, version 2 page numbers holding an edit)"""
+    with open(truth_path(ensure_corpus(pages))) as f:
+        lines = [line for page in json.load(f)["pages"] for line in page["body"]]
+    rng = random.Random(seed)
+    revised = list(lines)
+    edited_lines = sorted(rng.sample(range(len(lines)), edits))
+    for i in edited_lines:
+        revised[i] = f"As amended on March {rng.randint(1, 28)}, 2021: {revised[i]}"
+    insert_at = rng.randrange(len(lines) // 4, len(lines) // 2)
+    revised[insert_at:insert_at] = ["", *INSERTED, ""]
+    shifted = [i if i < insert_at else i + len(INSERTED) + 2 for i in edited_lines]
+    edited_pages = {i // LINES_PER_PAGE + 1 for i in shifted + [insert_at + 1]}
+    return paginate(lines), paginate(revised), edited_pages
+
+
+def bench(pages: int, edits: int, known: int) -> dict:
+    v1, v2, edited_pages = make_versions(pages, edits)
+    rng = random.Random(pages)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        state = SQLiteStateBackend(tmp)
+        started = time.perf_counter()
+        first = revisions.fingerprint_pages(lambda: iter(v1))
+        fingerprint_ms = (time.perf_counter() - started) * 1000
+        state.save_session("v1", "{}")
+        state.save_fingerprints("v1", revisions.chunk_hashes(first), revisions.fingerprint_record(first, "v1", "v1.pdf"))
+        for d in range(known):
+            hashes = [rng.getrandbits(63) for _ in range(OTHER_CHUNKS)]
+            state.save_fingerprints(f"other{d}", hashes, "{}")
+
+        second = revisions.fingerprint_pages(lambda: iter(v2))
+        started = time.perf_counter()
+        revision = revisions.find_revision(state, second)
+        lookup_ms = (time.perf_counter() - started) * 1000
+
+    full_chars = compaction.compact_pages(lambda: iter(v2), MAX_DOCUMENT_CHARS)[1]["chars_after"]
+    changed = revision["changed_pages"] if revision else list(range(1, len(v2) + 1))
+    sent, _ = revisions.changed_text(lambda: iter(v2), changed, 10 ** 9)
+    return {
+        "pages": len(v2),
+        "chunks": len(second["chunks"]),
+        "known_documents": known + 1,
+        "fingerprint_ms": round(fingerprint_ms, 1),
+        "lookup_ms": round(lookup_ms, 1),
+        "matched": revision is not None,
+        "shared": revision["shared"] if revision else 0.0,
+        "pages_changed": len(changed),
+        "edited_pages": len(edited_pages),
+        "edited_pages_flagged": len(edited_pages & set(changed)),
+        "chars_sent": len(sent),
+        "full_chars": full_chars,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="100,1000", help="Comma-separated corpus page counts")
+    parser.add_argument("--edits", type=int, default=5, help="Lines reworded in version 2")
+    parser.add_argument("--known", type=int, default=200, help="Other documents in the fingerprint index")
+    parser.add_argument("--output", default=None, help="Also write results JSON here")
+    args = parser.parse_args()
+
+    results = []
+    for pages in (int(p) for p in args.pages.split(",")):
+        r = bench(pages, args.edits, args.known)
+        results.append(r)
+        print(f"{r['pages']:>5} pages  {r['chunks']:>6,} chunks  fingerprint {r['fingerprint_ms']:>7.1f} ms  "
+              f"lookup {r['lookup_ms']:>6.1f} ms among {r['known_documents']:,} documents  "
+              f"shared {r['shared']:.1%}  re-extract {r['pages_changed']:>4} pages "
+              f"({r['edited_pages_flagged']}/{r['edited_pages']} edited pages flagged)  "
+              f"sent {r['chars_sent'] / 1024:>7.1f} KB of {r['full_chars'] / 1024:>8.1f} KB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"edits": args.edits, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
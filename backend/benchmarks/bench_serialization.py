@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Serialization microbenchmark: the old json.dumps/.dict() paths against serialization.py.
+
+Cases, on a synthetic timeline (default 10,000 events):
+- session save:  json.dumps(timeline.dict())          vs  timeline.model_dump_json()
+- session load:  TimelineData(**json.loads(text))     vs  TimelineData.model_validate_json(text)
+- chart data:    json.dumps(data, indent=2)           vs  serialization.dumps(data) (stdlib / orjson)
+- SSE frames:    json.dumps per progress frame        vs  serialization.sse_frame
+
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --events 1000 --repeat 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import warnings
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import serialization
+from models import TimelineData
+from synthetic import generate_timeline
+
+SSE_FRAMES = 1000
+
+
+def median_ms(fn, repeat: int) -> float:
+    """Median wall time of fn() in milliseconds"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def utf8_len(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+def stdlib_compact(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", default=None, help="Also write results JSON here")
+    args = parser.parse_args()
+
+    timeline = generate_timeline(args.events)
+    # .dict() is deprecated in pydantic v2 - that is part of what is being replaced
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+    legacy_text = json.dumps(timeline.dict())
+    compact_text = timeline.model_dump_json()
+    chart_data = timeline.model_dump()
+    frame = {"type": "progress", "message": "✓ Extracted 2,312 words from 7 pages (pdfium: 7)",
+             "elapsed_ms": 47.4, "data": {"ingestion": {"page_count": 7, "engines": {"pdfium": 7}}}}
+
+    cases = {
+        "session_save": {
+            "legacy": (lambda: json.dumps(timeline.dict()), utf8_len(legacy_text)),
+            "model_dump_json": (timeline.model_dump_json, utf8_len(compact_text)),
+        },
+        "session_load": {
+            "legacy": (lambda: TimelineData(**json.loads(legacy_text)), None),
+            "model_validate_json": (lambda: serialization.load_timeline(compact_text), None),
+        },
+        "chart_data": {
+            "legacy": (lambda: json.dumps(chart_data, indent=2), utf8_len(json.dumps(chart_data, indent=2))),
+            "json_compact": (lambda: stdlib_compact(chart_data), utf8_len(stdlib_compact(chart_data))),
+        },
+        "sse_frames": {
+            "legacy": (lambda: [f"data: {json.dumps(frame)}\n\n" for _ in range(SSE_FRAMES)],
+                       utf8_len(f"data: {json.dumps(frame)}\n\n")),
+            f"sse_frame ({serialization.BACKEND})": (lambda: [serialization.sse_frame(frame) for _ in range(SSE_FRAMES)],
+                                                      utf8_len(serialization.sse_frame(frame))),
+        },
+    }
+    if serialization.orjson is not None:
+        cases["chart_data"]["orjson"] = (lambda: serialization.dumps(chart_data),
+                                         utf8_len(serialization.dumps(chart_data)))
+
+    print(f"{args.events:,} events, median of {args.repeat} runs (SSE: {SSE_FRAMES} frames per run), "
+          f"dict backend: {serialization.BACKEND}")
+    results = {}
+    for case, variants in cases.items():
+        baseline = None
+        results[case] = {}
+        for name, (fn, size) in variants.items():
+            ms = median_ms(fn, args.repeat)
+            baseline = baseline or ms
+            results[case][name] = {"ms": round(ms, 3), "bytes": size, "speedup": round(baseline / ms, 2)}
+            size_label = f"{size:>11,} B" if size is not None else " " * 13
+            print(f"  {case:<14} {name:<22} {ms:>9.2f} ms  {size_label}  x{baseline / ms:.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"events": args.events, "backend": serialization.BACKEND, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
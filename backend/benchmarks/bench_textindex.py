@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Full-text index benchmark: build cost, size on disk, query latency and event linking.
+
+Runs on the synthetic corpus (benchmarks/corpus.py, generated on first use) using the page text
+recorded in its truth files, so no PDF engine time is included. For each page count it reports:
+
+- build time, index size against the raw page text and against an uncompressed positional
+  index (text + 12 bytes per token occurrence)
+- median / p95 latency of term, phrase and multi-part queries on an opened index
+- linking the events of a synthetic timeline (same actor generator as the corpus tables) to
+  their source passages: time and share of events linked
+
+    python benchmarks/bench_textindex.py                  # 100 and 1,000 pages
+    python benchmarks/bench_textindex.py --pages 2000 --repeat 50
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import textindex
+from corpus import ensure_corpus, truth_path
+from synthetic import generate_timeline
+
+QUERIES = ["resigned", "the", "fda", '"chief financial officer"', '"general counsel" resigned',
+           'board "warning letter" 2021', "nonexistentterm"]
+
+
+def truth_pages(pages: int) -> list:
+    with open(truth_path(ensure_corpus(pages))) as f:
+        truth = json.load(f)
+    return ["\n".join(page["header"] + page["body"] + page["footer"]) for page in truth["pages"]]
+
+
+def percentile(times: list, q: float) -> float:
+    ordered = sorted(times)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def bench(pages: int, repeat: int, events: int) -> dict:
+    texts = truth_pages(pages)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.idx")
+        started = time.perf_counter()
+        stats = textindex.build_index(texts, path)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        index = textindex.TextIndex(path)
+        open_ms = (time.perf_counter() - started) * 1000
+
+        query_ms = {}
+        for query in QUERIES:
+            parts = textindex.parse_query(query)
+            times = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                index.search(parts, 20)
+                times.append((time.perf_counter() - started) * 1000)
+            query_ms[query] = {"p50": round(statistics.median(times), 3), "p95": round(percentile(times, 0.95), 3)}
+
+        timeline = generate_timeline(events)
+        started = time.perf_counter()
+        links = textindex.link_events(index, timeline.events)
+        link_ms = (time.perf_counter() - started) * 1000
+
+    uncompressed = stats["text_bytes"] + 12 * stats["tokens"]
+    return {
+        "pages": pages,
+        "tokens": stats["tokens"],
+        "terms": stats["terms"],
+        "text_bytes": stats["text_bytes"],
+        "index_bytes": stats["index_bytes"],
+        "uncompressed_bytes": uncompressed,
+        "compression": round(uncompressed / stats["index_bytes"], 2),
+        "build_ms": round(build_ms, 1),
+        "open_ms": round(open_ms, 2),
+        "query_ms": query_ms,
+        "link_events": events,
+        "link_ms": round(link_ms, 1),
+        "linked_share": round(sum(1 for l in links if l) / len(links), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="100,1000", help="Comma-separated corpus page counts")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--events", type=int, default=200, help="Events to link per corpus")
+    parser.add_argument("--output", default=None, help="Also write results JSON here")
+    args = parser.parse_args()
+
+    results = []
+    for pages in (int(p) for p in args.pages.split(",")):
+        r = bench(pages, args.repeat, args.events)
+        results.append(r)
+        print(f"{pages:>5} pages  {r['tokens']:>9,} tokens  {r['terms']:>6,} terms  "
+              f"text {r['text_bytes'] / 1024:>8.0f} KB  index {r['index_bytes'] / 1024:>8.0f} KB  "
+              f"(x{r['compression']} vs uncompressed positional)  build {r['build_ms']:>8.1f} ms  "
+              f"open {r['open_ms']:>6.2f} ms  link {r['link_events']} events {r['link_ms']:>7.1f} ms "
+              f"({r['linked_share']:.0%} linked)")
+        for query, ms in r["query_ms"].items():
+            print(f"        {query:<32} p50 {ms['p50']:>7.3f} ms  p95 {ms['p95']:>7.3f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Visualization benchmark: GanttVisualizer (Plotly), D3GanttVisualizer and the JSON chart spec
+(chartspec.py, what /api/sessions/{id}/chart sends for client-side rendering) on synthetic timelines.
+
+Times every renderer stage (build_figure / build_chart_data / build_spec, render_html, render_png),
+tracks peak Python memory (tracemalloc) and output size, and compares against a stored
+baseline - any regression beyond the tolerance makes the run exit non-zero.
+
+    python benchmarks/bench_viz.py                      # compare against the baseline
+    python benchmarks/bench_viz.py --update-baseline    # record a new baseline
+    python benchmarks/bench_viz.py --sizes 10,100 --renderers d3
+"""
+
+import argparse
+import gzip
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from io import StringIO
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import assets
+import chartspec
+import metrics
+import serialization
+from synthetic import SIZES, generate_timeline
+from visualizer import GanttVisualizer
+from visualizer_d3 import D3GanttVisualizer
+from extractor import EventExtractor
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baselines", "viz.json")
+
+# Ignore differences smaller than this - sub-millisecond stages are mostly noise
+MIN_ABS_REGRESSION_MS = 5.0
+
+
+class SpecRenderer:
+    """The compact chart spec written as JSON (its size is reported as html_bytes)"""
+
+    def generate_gantt(self, timeline, color_map, output_path, timer):
+        with timer.stage("build_spec"):
+            body = serialization.dumps(chartspec.build_spec(timeline, color_map))
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(body)
+
+
+def make_renderer(name: str, export_png: bool):
+    if name == "plotly":
+        return GanttVisualizer(export_png=export_png), "timeline.png"
+    if name == "d3":
+        return D3GanttVisualizer(), "timeline.html"
+    if name == "spec":
+        return SpecRenderer(), "timeline.json"
+    raise ValueError(f"Unknown renderer: {name}")
+
+
+def run_once(renderer, filename: str, timeline, color_map, out_dir: str) -> metrics.RequestTimer:
+    timer = metrics.RequestTimer()
+    # Renderers print a [SUCCESS] line per file - keep the benchmark output readable
+    with redirect_stdout(StringIO()):
+        renderer.generate_gantt(timeline, color_map, os.path.join(out_dir, filename), timer=timer)
+    return timer
+
+
+def bench_case(renderer_name: str, size: int, args) -> dict:
+    timeline = generate_timeline(size, seed=args.seed, actor_ratio=args.actor_ratio,
+                                 milestone_ratio=args.milestone_ratio, highlight_ratio=args.highlight_ratio)
+    # Palette generation is a constant-time lookup table - shared by both renderers
+    color_map = EventExtractor(api_key="unused").generate_color_palette(timeline.events)
+    renderer, filename = make_renderer(renderer_name, args.png)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        runs = [run_once(renderer, filename, timeline, color_map, out_dir) for _ in range(args.repeat)]
+
+        # Separate run for memory - tracemalloc slows everything down, so it isn't timed
+        tracemalloc.start()
+        run_once(renderer, filename, timeline, color_map, out_dir)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        html_path = os.path.join(out_dir, filename.replace(".png", ".html"))  # The spec's .json as is
+        with open(html_path, "rb") as f:
+            html = f.read()
+
+    stage_names = sorted({stage for run in runs for stage in run.stages})
+    return {
+        "stages_ms": {
+            stage: round(statistics.median(run.stages.get(stage, 0.0) for run in runs) * 1000, 2)
+            for stage in stage_names
+        },
+        "total_ms": round(statistics.median(sum(run.stages.values()) for run in runs) * 1000, 2),
+        "peak_mb": round(peak / (1024 * 1024), 2),
+        "html_bytes": len(html),
+        "html_gzip_bytes": len(gzip.compress(html, compresslevel=9, mtime=0)),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Return human-readable regressions (empty list = pass)"""
+    regressions = []
+
+    def check(case: str, metric: str, current: float, base: float, min_abs: float):
+        if current > base * (1 + tolerance) and current - base > min_abs:
+            regressions.append(f"{case} {metric}: {current} vs baseline {base} (+{(current / base - 1) * 100:.0f}%)"
+                               if base else f"{case} {metric}: {current} vs baseline {base}")
+
+    for case, current in results.items():
+        base = baseline.get(case)
+        if not base or "skipped" in current or "skipped" in base:
+            continue
+        check(case, "total_ms", current["total_ms"], base["total_ms"], MIN_ABS_REGRESSION_MS)
+        for stage, ms in current["stages_ms"].items():
+            if stage in base["stages_ms"]:
+                check(case, f"{stage}_ms", ms, base["stages_ms"][stage], MIN_ABS_REGRESSION_MS)
+        check(case, "peak_mb", current["peak_mb"], base["peak_mb"], 1.0)
+        check(case, "html_bytes", current["html_bytes"], base["html_bytes"], 1024)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(str(s) for s in SIZES), help="Comma-separated event counts")
+    parser.add_argument("--renderers", default="plotly,d3,spec")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case (median is reported)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--actor-ratio", type=float, default=0.3)
+    parser.add_argument("--milestone-ratio", type=float, default=0.05)
+    parser.add_argument("--highlight-ratio", type=float, default=0.1)
+    parser.add_argument("--png", action="store_true", help="Include Kaleido PNG export (needs Chrome)")
+    parser.add_argument("--budget", type=float, default=30.0,
+                        help="Skip larger sizes once a case projects past this many seconds per run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", default=None, help="Also write results JSON here")
+    args = parser.parse_args()
+
+    sizes = sorted(int(s) for s in args.sizes.split(","))
+    results = {}
+
+    missing = assets.missing_assets()
+    for renderer_name in args.renderers.split(","):
+        previous = None  # (size, seconds) of the last case that ran
+        for size in sizes:
+            case = f"{renderer_name}/{size}"
+            if renderer_name == "d3" and missing:  # The D3 page needs the vendored libraries
+                results[case] = {"skipped": f"not vendored: {', '.join(missing)} (python assets.py fetch)"}
+                print(f"{case:<14} skipped ({results[case]['skipped']})")
+                continue
+            # Renderers are at least linear in events: project from the previous size
+            if previous and previous[1] * (size / previous[0]) > args.budget:
+                results[case] = {"skipped": f"projected over {args.budget:.0f}s budget"}
+                print(f"{case:<14} skipped (projected over {args.budget:.0f}s budget)")
+                continue
+
+            started = time.perf_counter()
+            result = bench_case(renderer_name, size, args)
+            results[case] = result
+            previous = (size, (time.perf_counter() - started) / (args.repeat + 1))
+
+            stages = "  ".join(f"{k}={v:.1f}" for k, v in result["stages_ms"].items())
+            print(f"{case:<14} total={result['total_ms']:>10.1f}ms  peak={result['peak_mb']:>7.1f}MB  "
+                  f"html={result['html_bytes']:>10,}B  {stages}")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "png": args.png,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        if os.path.exists(args.baseline):  # Keep recorded numbers of cases this run skipped or left out
+            with open(args.baseline) as f:
+                previous = json.load(f)["results"]
+            for case, result in results.items():
+                if "skipped" in result and "skipped" not in previous.get(case, {"skipped": True}):
+                    results[case] = previous[case]
+            report["results"] = {**previous, **results}
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[SUCCESS] Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"[WARNING] No baseline at {args.baseline} - run with --update-baseline")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = compare(results, baseline["results"], args.tolerance)
+    if regressions:
+        print(f"\n[FAIL] {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+
+    print(f"\n[SUCCESS] No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Synthetic legal-document corpus for ingestion benchmarks.
+
+Builds PDFs with an exact page count (10 to 2,000+) from the repository's test_case_*.txt
+templates. Every page has a running header (case caption + confidentiality legend) and a footer
+(Bates number + page x of y), and every few pages carries a chronology table. Next to each PDF
+a <name>.truth.json file records the text drawn on every page, for fidelity scoring.
+
+    python benchmarks/corpus.py --pages 10,100,1000     # writes benchmarks/corpus/*.pdf
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import sys
+from typing import List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from synthetic import generate_timeline
+
+REPO_ROOT = os.path.dirname(os.path.dirname(BENCH_DIR))
+DEFAULT_TEMPLATES = os.path.join(REPO_ROOT, "test_case_*.txt")
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792  # US letter, points
+MARGIN = 72
+FONT, FONT_SIZE, LEADING = "Helvetica", 10, 13
+TABLE_ROWS = 8
+
+
+def load_paragraphs(pattern: str = DEFAULT_TEMPLATES) -> List[str]:
+    """Paragraphs from the text templates, without the ===== rule lines"""
+    paragraphs = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, encoding="utf-8") as f:
+            content = f.read()
+        for para in content.split("\n\n"):
+            cleaned = " ".join(line.strip() for line in para.splitlines() if not re.fullmatch(r"=+", line.strip()))
+            if cleaned:
+                paragraphs.append(cleaned)
+    if not paragraphs:
+        raise FileNotFoundError(f"No templates match {pattern}")
+    return paragraphs
+
+
+def corpus_path(pages: int, seed: int = 42, corpus_dir: str = CORPUS_DIR) -> str:
+    return os.path.join(corpus_dir, f"corpus_{pages}p_seed{seed}.pdf")
+
+
+def truth_path(pdf_path: str) -> str:
+    return os.path.splitext(pdf_path)[0] + ".truth.json"
+
+
+def generate_corpus_pdf(output_path: str, pages: int, seed: int = 42, templates: str = DEFAULT_TEMPLATES,
+                        table_every: int = 5) -> str:
+    """Write a `pages`-page PDF plus its truth file; returns output_path"""
+    from reportlab.lib import colors
+    from reportlab.lib.utils import simpleSplit
+    from reportlab.pdfgen import canvas
+    from reportlab.platypus import Table, TableStyle
+
+    rng = random.Random(seed)
+    paragraphs = load_paragraphs(templates)
+    cursor = rng.randrange(len(paragraphs))
+    # Table rows come from the synthetic timeline generator (names, roles, dates)
+    events = [e for e in generate_timeline(max(TABLE_ROWS, pages // table_every * TABLE_ROWS + TABLE_ROWS), seed=seed).events
+              if not e.milestone]
+
+    text_width = PAGE_WIDTH - 2 * MARGIN
+    body_top, body_bottom = PAGE_HEIGHT - MARGIN, MARGIN
+    caption = f"CASE NO. {2020 + seed % 5}-CV-{1000 + seed:04d}"
+    legend = "CONFIDENTIAL - ATTORNEY WORK PRODUCT"
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    c = canvas.Canvas(output_path, pagesize=(PAGE_WIDTH, PAGE_HEIGHT), pageCompression=1)
+    truth = {"pages": [], "seed": seed, "templates": os.path.basename(templates)}
+    pending: List[str] = []  # wrapped lines not yet placed
+    event_index = 0
+
+    for page_number in range(1, pages + 1):
+        header = [caption, legend]
+        footer = [f"HUB{page_number:07d}", f"Page {page_number} of {pages}"]
+        c.setFont(FONT, 8)
+        c.drawString(MARGIN, PAGE_HEIGHT - 40, header[0])
+        c.drawRightString(PAGE_WIDTH - MARGIN, PAGE_HEIGHT - 40, header[1])
+        c.drawString(MARGIN, 40, footer[0])
+        c.drawCentredString(PAGE_WIDTH / 2, 40, footer[1])
+
+        body: List[str] = []
+        y = body_top
+
+        if table_every and page_number % table_every == 0:
+            rows = [["Name", "Role", "Start", "End"]]
+            for event in events[event_index:event_index + TABLE_ROWS]:
+                rows.append([event.actor.split(" - ")[0], event.roleType, event.start, event.end or ""])
+            event_index += TABLE_ROWS
+            table = Table(rows, colWidths=[150, 150, 84, 84])
+            table.setStyle(TableStyle([
+                ("FONT", (0, 0), (-1, -1), FONT, 9),
+                ("FONT", (0, 0), (-1, 0), "Helvetica-Bold", 9),
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ]))
+            _, table_height = table.wrapOn(c, text_width, body_top - body_bottom)
+            table.drawOn(c, MARGIN, y - table_height)
+            y -= table_height + LEADING
+            body.extend(cell for row in rows for cell in row if cell)
+
+        c.setFont(FONT, FONT_SIZE)
+        while y - LEADING >= body_bottom:
+            if not pending:
+                pending = simpleSplit(paragraphs[cursor % len(paragraphs)], FONT, FONT_SIZE, text_width) + [""]
+                cursor += 1
+            line = pending.pop(0)
+            y -= LEADING
+            if line:
+                c.drawString(MARGIN, y, line)
+                body.append(line)
+
+        truth["pages"].append({"header": header, "body": body, "footer": footer})
+        c.showPage()
+
+    c.save()
+    with open(truth_path(output_path), "w", encoding="utf-8") as f:
+        json.dump(truth, f)
+    return output_path
+
+
+def ensure_corpus(pages: int, seed: int = 42, corpus_dir: str = CORPUS_DIR) -> str:
+    """Path to the corpus PDF for (pages, seed), generating it on first use"""
+    path = corpus_path(pages, seed, corpus_dir)
+    if not (os.path.exists(path) and os.path.exists(truth_path(path))):
+        generate_corpus_pdf(path, pages, seed)
+        print(f"[SUCCESS] Generated {pages}-page corpus PDF: {path}")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="10,100,1000", help="Comma-separated page counts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output-dir", default=CORPUS_DIR)
+    args = parser.parse_args()
+
+    for pages in (int(p) for p in args.pages.split(",")):
+        ensure_corpus(pages, args.seed, args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
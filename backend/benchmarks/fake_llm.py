@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Anthropic messages streaming API.
+
+Point the backend at it with ANTHROPIC_BASE_URL=http://127.0.0.1:<port> (the anthropic client
+reads that variable) and any non-empty ANTHROPIC_API_KEY. Responses are replayed from recording
+files, or synthesized from benchmarks/synthetic.py when no recording is given:
+
+    python benchmarks/fake_llm.py --port 8100 --tokens-per-second 80 --stall-probability 0.05
+
+Recording format (JSON):
+
+    {
+      "model": "claude-3-opus-20240229",
+      "usage": {"input_tokens": 12000, "output_tokens": 2400},
+      "chunks": [{"delay": 0.84, "text": "<thinking>\\n1. The user wants"}, ...]
+    }
+
+"delay" is seconds since the previous chunk (the first one is time to first token).
+"""
+
+import argparse
+import asyncio
+import glob
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import uuid
+from typing import List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from synthetic import generate_timeline
+
+# Rough English average used for token-rate pacing and usage numbers
+CHARS_PER_TOKEN = 4
+
+
+class FakeLLMConfig:
+    def __init__(self, recordings: Optional[List[str]] = None, tokens_per_second: Optional[float] = None,
+                 speed: float = 1.0, first_token_delay: Optional[float] = None,
+                 stall_probability: float = 0.0, stall_seconds: float = 5.0,
+                 error_rate: float = 0.0, midstream_error_rate: float = 0.0,
+                 synthetic_events: int = 12, seed: int = 42):
+        self.recordings = [load_recording(path) for path in (recordings or [])]
+        self.tokens_per_second = tokens_per_second  # None = replay recorded delays
+        self.speed = speed  # >1 replays recorded delays faster
+        self.first_token_delay = first_token_delay
+        self.stall_probability = stall_probability  # Per chunk
+        self.stall_seconds = stall_seconds
+        self.error_rate = error_rate  # 529 overloaded before streaming starts
+        self.midstream_error_rate = midstream_error_rate  # error event part-way through
+        self.rng = random.Random(seed)
+        self._round_robin = itertools.cycle(range(len(self.recordings))) if self.recordings else None
+        self._synthetic = synthetic_recording(synthetic_events, seed) if not self.recordings else None
+
+    def next_recording(self) -> dict:
+        if self._round_robin is None:
+            return self._synthetic
+        return self.recordings[next(self._round_robin)]
+
+
+def load_recording(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def split_into_chunks(text: str, chars_per_chunk: int = 12) -> List[str]:
+    """Split on word boundaries so tags like <thinking> are never cut in half"""
+    words = re.findall(r"\S+\s*|\s+", text)
+    chunks, current = [], ""
+    for word in words:
+        current += word
+        if len(current) >= chars_per_chunk:
+            chunks.append(current)
+            current = ""
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def response_text_for(timeline_data) -> str:
+    """A response shaped like the real model output: <thinking> lines, then a ```json block"""
+    actors = sorted({e.actor for e in timeline_data.events if not e.milestone})
+    milestones = [e.action for e in timeline_data.events if e.milestone]
+    thinking = [
+        "1. The user wants a stakeholder timeline with people on the Y-axis.",
+        f"2. This is a {timeline_data.case.type or 'legal'} document about {timeline_data.case.name}.",
+        f"3. I extracted {len(actors)} units for the Y-axis: {', '.join(actors[:5])}.",
+        f"4. Key milestones: {', '.join(milestones[:5]) or 'none'}.",
+        "5. Highlighted actors are flagged in red with a legal reason.",
+        "6. Showing all units since the request is general.",
+        "7. Footer summarizes the replacement pattern.",
+    ]
+    body = json.dumps(timeline_data.model_dump(), indent=2)
+    return "<thinking>\n" + "\n".join(thinking) + "\n</thinking>\n\n```json\n" + body + "\n```"
+
+
+def synthetic_recording(n_events: int, seed: int, tokens_per_second: float = 60.0) -> dict:
+    text = response_text_for(generate_timeline(n_events, seed=seed))
+    chunks = split_into_chunks(text)
+    return {
+        "model": "synthetic",
+        "usage": {"input_tokens": 12000, "output_tokens": len(text) // CHARS_PER_TOKEN},
+        "chunks": [
+            {"delay": 0.8 if i == 0 else len(chunk) / CHARS_PER_TOKEN / tokens_per_second, "text": chunk}
+            for i, chunk in enumerate(chunks)
+        ],
+    }
+
+
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def create_app(config: FakeLLMConfig) -> FastAPI:
+    app = FastAPI(title="Fake messages API")
+
+    @app.post("/v1/messages")
+    async def messages(request: Request):
+        body = await request.json()
+
+        if config.rng.random() < config.error_rate:
+            return JSONResponse(
+                {"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}},
+                status_code=529
+            )
+
+        recording = config.next_recording()
+        model = body.get("model", recording.get("model", "fake"))
+        usage = recording.get("usage", {})
+        fail_at = None
+        if config.rng.random() < config.midstream_error_rate:
+            fail_at = config.rng.randrange(max(1, len(recording["chunks"])))
+
+        if not body.get("stream"):
+            text = "".join(chunk["text"] for chunk in recording["chunks"])
+            return {
+                "id": f"msg_{uuid.uuid4().hex[:24]}", "type": "message", "role": "assistant", "model": model,
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn", "stop_sequence": None,
+                "usage": {"input_tokens": usage.get("input_tokens", 0), "output_tokens": usage.get("output_tokens", 0)},
+            }
+
+        async def stream():
+            yield sse("message_start", {"type": "message_start", "message": {
+                "id": f"msg_{uuid.uuid4().hex[:24]}", "type": "message", "role": "assistant", "model": model,
+                "content": [], "stop_reason": None, "stop_sequence": None,
+                "usage": {"input_tokens": usage.get("input_tokens", 0), "output_tokens": 1},
+            }})
+            yield sse("content_block_start", {"type": "content_block_start", "index": 0,
+                                              "content_block": {"type": "text", "text": ""}})
+
+            for i, chunk in enumerate(recording["chunks"]):
+                if i == 0 and config.first_token_delay is not None:
+                    delay = config.first_token_delay
+                elif config.tokens_per_second:
+                    delay = len(chunk["text"]) / CHARS_PER_TOKEN / config.tokens_per_second
+                else:
+                    delay = chunk["delay"] / config.speed
+                if config.rng.random() < config.stall_probability:
+                    delay += config.stall_seconds
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                if fail_at is not None and i == fail_at:
+                    yield sse("error", {"type": "error", "error": {"type": "api_error", "message": "Injected failure"}})
+                    return
+
+                yield sse("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                                  "delta": {"type": "text_delta", "text": chunk["text"]}})
+
+            yield sse("content_block_stop", {"type": "content_block_stop", "index": 0})
+            yield sse("message_delta", {"type": "message_delta",
+                                        "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                        "usage": {"output_tokens": usage.get("output_tokens", 0)}})
+            yield sse("message_stop", {"type": "message_stop"})
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--recordings", default=None, help="Glob of recording JSON files (default: synthetic)")
+    parser.add_argument("--tokens-per-second", type=float, default=None,
+                        help="Re-pace output at this rate instead of the recorded delays")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay recorded delays N times faster")
+    parser.add_argument("--first-token-delay", type=float, default=None)
+    parser.add_argument("--stall-probability", type=float, default=0.0, help="Chance per chunk of a stall")
+    parser.add_argument("--stall-seconds", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Chance of a 529 before streaming")
+    parser.add_argument("--midstream-error-rate", type=float, default=0.0,
+                        help="Chance of an error event part-way through the stream")
+    parser.add_argument("--synthetic-events", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    config = FakeLLMConfig(
+        recordings=sorted(glob.glob(args.recordings)) if args.recordings else None,
+        tokens_per_second=args.tokens_per_second,
+        speed=args.speed,
+        first_token_delay=args.first_token_delay,
+        stall_probability=args.stall_probability,
+        stall_seconds=args.stall_seconds,
+        error_rate=args.error_rate,
+        midstream_error_rate=args.midstream_error_rate,
+        synthetic_events=args.synthetic_events,
+        seed=args.seed,
+    )
+
+    import uvicorn
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+End-to-end load harness: the real app against a local fake messages API (fake_llm.py).
+
+Starts the fake API and the backend (unless --app-url is given), fires N uploads of the
+repository's test PDFs with bounded concurrency and reports p50/p95/p99 for
+
+- first_event:    upload sent -> first SSE frame
+- first_thinking: upload sent -> first streamed "💭" reasoning line
+- total:          upload sent -> complete (or error) frame
+
+    python benchmarks/load_test.py --requests 20 --concurrency 5
+    python benchmarks/load_test.py --requests 50 --concurrency 10 --tokens-per-second 40 \\
+        --stall-probability 0.02 --error-rate 0.05
+    python benchmarks/load_test.py --app-url http://127.0.0.1:8000   # already-running app
+    python benchmarks/load_test.py --replay --speed 10   # recorded responses, no fake API
+    python benchmarks/load_test.py --record --requests 2 --concurrency 1 --tokens-per-second 2000
+
+--record runs against the fake API with HUBBLE_LLM_MODE=record, writing one recording per
+document to --recordings-dir (use it after changing the test PDFs or the text pipeline, which
+change the recording keys). benchmarks/recordings/ holds synthetic recordings for the
+repository's test_case_*.pdf, so --replay works out of the box.
+
+The started app runs with revision detection off (HUBBLE_REVISIONS=0, see revisions.py): the
+harness uploads the same few PDFs over and over, and each repeat would otherwise be served
+from the first upload's session instead of being extracted. --revisions keeps it on to
+measure that path; the summary records which one ran.
+"""
+
+import argparse
+import glob
+import http.client
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+REPO_ROOT = os.path.dirname(BACKEND_DIR)
+
+DEFAULT_DOCUMENTS = os.path.join(REPO_ROOT, "test_case_*.pdf")
+DEFAULT_RECORDINGS_DIR = os.path.join(BENCH_DIR, "recordings")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(url: str, timeout: float, path: str = "/health") -> None:
+    """Poll until the server answers 200 on path"""
+    parsed = urlparse(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=2)
+            conn.request("GET", path)
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"{url}{path} not ready after {timeout:.0f}s")
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile (no interpolation - every reported value was observed)"""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def multipart_body(file_path: str, user_request: str = None):
+    boundary = uuid.uuid4().hex
+    with open(file_path, "rb") as f:
+        content = f.read()
+    parts = [
+        f"--{boundary}\r\n".encode(),
+        f'Content-Disposition: form-data; name="file"; filename="{os.path.basename(file_path)}"\r\n'.encode(),
+        b"Content-Type: application/pdf\r\n\r\n",
+        content,
+        b"\r\n",
+    ]
+    if user_request:
+        parts += [
+            f"--{boundary}\r\n".encode(),
+            b'Content-Disposition: form-data; name="request"\r\n\r\n',
+            user_request.encode(),
+            b"\r\n",
+        ]
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def run_upload(app_url: str, file_path: str, user_request: str, timeout: float) -> dict:
+    """One upload; reads the SSE stream line by line and timestamps the interesting frames"""
+    parsed = urlparse(app_url)
+    body, content_type = multipart_body(file_path, user_request)
+    result = {"document": os.path.basename(file_path), "first_event": None, "first_thinking": None,
+              "total": None, "outcome": "incomplete", "events": 0}
+
+    started = time.perf_counter()
+    try:
+        conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=timeout)
+        conn.request("POST", "/api/process", body=body, headers={"Content-Type": content_type})
+        response = conn.getresponse()
+        if response.status != 200:
+            result["outcome"] = f"http_{response.status}"
+            return result
+
+        while True:
+            line = response.fp.readline()
+            if not line:
+                break
+            if not line.startswith(b"data: "):
+                continue
+            now = time.perf_counter() - started
+            event = json.loads(line[6:])
+            result["events"] += 1
+            if result["first_event"] is None:
+                result["first_event"] = now
+            if result["first_thinking"] is None and event.get("message", "").startswith("💭"):
+                result["first_thinking"] = now
+            if event["type"] in ("complete", "error"):
+                result["total"] = now
+                result["outcome"] = event["type"]
+                if event["type"] == "error":
+                    result["error"] = event["message"]
+                break
+        conn.close()
+    except (OSError, http.client.HTTPException) as e:
+        result["outcome"] = f"client_error: {e}"
+    return result
+
+
+def start_servers(args, log_dir: str):
+    """
+    Fake messages API + backend as subprocesses; returns (app_url, processes).
+
+    With --replay the app serves recordings itself (HUBBLE_LLM_MODE=replay) and no fake API runs;
+    with --record it saves the fake API's responses as recordings (HUBBLE_LLM_MODE=record).
+    """
+    fake_port, app_port = free_port(), free_port()
+    fake_cmd = [sys.executable, os.path.join(BENCH_DIR, "fake_llm.py"), "--port", str(fake_port),
+                "--speed", str(args.speed), "--stall-probability", str(args.stall_probability),
+                "--stall-seconds", str(args.stall_seconds), "--error-rate", str(args.error_rate),
+                "--midstream-error-rate", str(args.midstream_error_rate),
+                "--synthetic-events", str(args.synthetic_events)]
+    if args.tokens_per_second:
+        fake_cmd += ["--tokens-per-second", str(args.tokens_per_second)]
+    if args.first_token_delay is not None:
+        fake_cmd += ["--first-token-delay", str(args.first_token_delay)]
+    if args.recordings:
+        fake_cmd += ["--recordings", args.recordings]
+
+    env = dict(os.environ)
+    env.update({
+        "HUBBLE_STATE_DIR": os.path.join(log_dir, "state"),
+        "HUBBLE_EXPORT_PNG": "1" if args.png else "0",
+        "HUBBLE_REVISIONS": "1" if args.revisions else "0",
+    })
+    if args.replay:
+        env.update({
+            "HUBBLE_LLM_MODE": "replay",
+            "HUBBLE_RECORDINGS_DIR": os.path.abspath(args.recordings_dir),
+            "HUBBLE_REPLAY_SPEED": str(args.speed),
+        })
+    else:
+        env.update({
+            "HUBBLE_LLM_MODE": "record" if args.record else "live",
+            "HUBBLE_RECORDINGS_DIR": os.path.abspath(args.recordings_dir),
+            "ANTHROPIC_BASE_URL": f"http://127.0.0.1:{fake_port}",
+            "ANTHROPIC_API_KEY": "fake-key",
+        })
+    app_cmd = [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", BACKEND_DIR,
+               "--host", "127.0.0.1", "--port", str(app_port), "--workers", str(args.workers),
+               "--log-level", "warning"]
+
+    servers = [("app", app_cmd)] if args.replay else [("fake_llm", fake_cmd), ("app", app_cmd)]
+    processes = []
+    for name, cmd in servers:
+        log = open(os.path.join(log_dir, f"{name}.log"), "w")
+        # The app writes output/ relative to its working directory - keep it in the temp dir
+        processes.append(subprocess.Popen(cmd, env=env, cwd=log_dir, stdout=log, stderr=subprocess.STDOUT))
+
+    if not args.replay:
+        wait_for(f"http://127.0.0.1:{fake_port}", args.startup_timeout, path="/docs")
+    app_url = f"http://127.0.0.1:{app_port}"
+    wait_for(app_url, args.startup_timeout, path="/ready")
+    return app_url, processes
+
+
+def summarize(results: list, wall_seconds: float) -> dict:
+    summary = {"requests": len(results), "wall_seconds": round(wall_seconds, 2), "outcomes": {}, "latency_ms": {}}
+    for r in results:
+        summary["outcomes"][r["outcome"]] = summary["outcomes"].get(r["outcome"], 0) + 1
+    for metric in ("first_event", "first_thinking", "total"):
+        values = [r[metric] for r in results if r[metric] is not None]
+        summary["latency_ms"][metric] = {
+            "n": len(values),
+            **{f"p{p}": round(percentile(values, p) * 1000, 1) for p in (50, 95, 99)},
+            "max": round(max(values) * 1000, 1) if values else float("nan"),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20, help="Total uploads")
+    parser.add_argument("--concurrency", type=int, default=5, help="Uploads in flight at once")
+    parser.add_argument("--documents", default=DEFAULT_DOCUMENTS, help="Glob of PDFs to upload (round-robin)")
+    parser.add_argument("--user-request", default=None)
+    parser.add_argument("--app-url", default=None, help="Target a running app instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the started app")
+    parser.add_argument("--png", action="store_true", help="Keep PNG export on (needs Chrome)")
+    parser.add_argument("--revisions", action="store_true",
+                        help="Keep revision detection on: repeated uploads reuse the first one's session")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-request timeout (seconds)")
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--output", default=None, help="Also write per-request results + summary JSON here")
+    parser.add_argument("--replay", action="store_true",
+                        help="Serve recorded responses from the app itself (HUBBLE_LLM_MODE=replay)")
+    parser.add_argument("--record", action="store_true",
+                        help="Save the fake API's responses to --recordings-dir (HUBBLE_LLM_MODE=record)")
+    parser.add_argument("--recordings-dir", default=DEFAULT_RECORDINGS_DIR, help="Recordings for --replay / --record")
+    # Passed through to fake_llm.py (--speed also sets HUBBLE_REPLAY_SPEED with --replay)
+    parser.add_argument("--recordings", default=None)
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--first-token-delay", type=float, default=None)
+    parser.add_argument("--stall-probability", type=float, default=0.0)
+    parser.add_argument("--stall-seconds", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--midstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--synthetic-events", type=int, default=12)
+    args = parser.parse_args()
+    if args.record and args.replay:
+        parser.error("--record and --replay are exclusive")
+
+    documents = sorted(glob.glob(args.documents))
+    if not documents:
+        print(f"[BACKEND ERROR] No documents match {args.documents}")
+        return 1
+
+    processes = []
+    with tempfile.TemporaryDirectory(prefix="hubble-load-") as work_dir:
+        try:
+            app_url = args.app_url
+            if app_url is None:
+                app_url, processes = start_servers(args, work_dir)
+                print(f"[SUCCESS] App on {app_url} (logs in {work_dir})")
+
+            print(f"Firing {args.requests} uploads, {args.concurrency} at a time, "
+                  f"across {len(documents)} document(s)...")
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                futures = [
+                    pool.submit(run_upload, app_url, documents[i % len(documents)], args.user_request, args.timeout)
+                    for i in range(args.requests)
+                ]
+                results = [f.result() for f in futures]
+            summary = summarize(results, time.perf_counter() - started)
+            # With --app-url the running app's own HUBBLE_REVISIONS applies
+            summary["revisions"] = args.revisions if args.app_url is None else None
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    revisions = {True: "on (repeats reuse sessions)", False: "off", None: "app's setting"}[summary["revisions"]]
+    print(f"\nOutcomes: {summary['outcomes']}  wall={summary['wall_seconds']}s  revisions={revisions}")
+    print(f"{'metric':<16}{'n':>5}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}   (ms)")
+    for metric, stats in summary["latency_ms"].items():
+        print(f"{metric:<16}{stats['n']:>5}{stats['p50']:>10.1f}{stats['p95']:>10.1f}"
+              f"{stats['p99']:>10.1f}{stats['max']:>10.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"summary": summary, "results": results}, f, indent=2)
+
+    return 0 if summary["outcomes"].get("complete") == args.requests else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Seeded generator of synthetic TimelineData for benchmarks"""
+
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import ActorHighlight, CaseMetadata, Event, TimelineData, VisualizationConfig
+
+FIRST_NAMES = ["Eleanor", "Marcus", "Sophia", "Michael", "Timothy", "Gregory", "Rebecca", "James",
+               "Amanda", "Catherine", "David", "Jennifer", "Robert", "Sarah", "Daniel", "Priya"]
+LAST_NAMES = ["Park", "Hale", "Martinez", "Brandenburg", "Brooks", "Patterson", "Stone", "Whitmore",
+              "Chen", "Morris", "Tran", "Kowalski", "Pemberton", "Ramirez", "Okafor", "Lindqvist"]
+TITLES = ["CEO", "CFO", "CSO", "CTO", "General Counsel", "VP Clinical Operations",
+          "VP Regulatory Affairs", "Controller", "Board Member", "Chief Compliance Officer"]
+ROLE_TYPES = ["Executive Leadership", "Scientific Leadership", "Legal Compliance", "Clinical Operations",
+              "Regulatory Affairs", "Finance", "Board/Advisory", "Operations", "HR/Admin", "Other"]
+MILESTONE_ACTORS = ["SEC", "FDA", "DOJ", "Whistleblower", "Board of Directors", "Auditor"]
+MILESTONE_ACTIONS = ["initiated formal investigation", "issued warning letter", "filed formal complaint",
+                     "announced restatement", "issued subpoena", "announced recall"]
+
+# Benchmark sizes (total events)
+SIZES = [10, 100, 1000, 10000]
+
+
+def _format_date(day: date, rng: random.Random) -> str:
+    """Mostly YYYY-MM-DD, with some YYYY-MM and YYYY like real extractions"""
+    roll = rng.random()
+    if roll < 0.8:
+        return day.isoformat()
+    if roll < 0.95:
+        return day.strftime("%Y-%m")
+    return day.strftime("%Y")
+
+
+def generate_timeline(n_events: int, seed: int = 42, actor_ratio: float = 0.3,
+                      milestone_ratio: float = 0.05, highlight_ratio: float = 0.1,
+                      start_year: int = 2010, span_years: int = 15) -> TimelineData:
+    """
+    Build a reproducible TimelineData with n_events events.
+
+    Args:
+        n_events: Total events (bars + milestones)
+        seed: RNG seed - same arguments always give the same timeline
+        actor_ratio: Distinct actors per bar event (0.3 -> ~3 bars per actor row)
+        milestone_ratio: Fraction of events that are milestones
+        highlight_ratio: Fraction of actors flagged in actor_highlights
+    """
+    rng = random.Random(seed)
+    n_milestones = min(n_events - 1, max(1, int(n_events * milestone_ratio))) if n_events > 1 else 0
+    n_bars = n_events - n_milestones
+    n_actors = max(1, min(n_bars, int(round(n_bars * actor_ratio))))
+
+    span_start = date(start_year, 1, 1)
+    span_days = span_years * 365
+
+    actors = []
+    seen = set()
+    while len(actors) < n_actors:
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        label = f"{name} - {rng.choice(TITLES)} (Original)"
+        if label in seen:
+            label = f"{name} {len(actors)} - {rng.choice(TITLES)} (Original)"
+        seen.add(label)
+        actors.append((label, rng.choice(ROLE_TYPES)))
+
+    events = []
+    for i in range(n_bars):
+        # Every actor gets at least one bar, the rest are spread randomly
+        actor, role_type = actors[i] if i < n_actors else rng.choice(actors)
+        start = span_start + timedelta(days=rng.randrange(span_days - 30))
+        end = start + timedelta(days=rng.randint(30, 6 * 365))
+        events.append(Event(
+            actor=actor,
+            action=f"served as {actor.split(' - ')[1].split(' (')[0]}",
+            target="Synthetic Holdings Inc.",
+            roleType=role_type,
+            start=_format_date(start, rng),
+            end=end.isoformat(),
+            context="Synthetic tenure generated for benchmarking. Terminated after raising concerns."
+            if rng.random() < 0.2 else "Synthetic tenure generated for benchmarking.",
+            milestone=False
+        ))
+
+    for _ in range(n_milestones):
+        day = span_start + timedelta(days=rng.randrange(span_days))
+        events.append(Event(
+            actor=rng.choice(MILESTONE_ACTORS),
+            action=rng.choice(MILESTONE_ACTIONS),
+            target="Synthetic Holdings Inc.",
+            roleType="Regulatory Agency",
+            start=day.isoformat(),
+            end=None,
+            context="Synthetic milestone generated for benchmarking.",
+            milestone=True
+        ))
+
+    rng.shuffle(events)
+
+    highlighted = rng.sample(actors, int(n_actors * highlight_ratio))
+    viz_config = VisualizationConfig(
+        actor_highlights=[
+            ActorHighlight(name=actor, color="#ef4444", reason="Synthetic highlight")
+            for actor, _ in highlighted
+        ],
+        footer_analysis=f"Synthetic timeline with {n_bars} tenures and {n_milestones} milestones",
+        document_type="fraud_investigation"
+    )
+
+    return TimelineData(
+        case=CaseMetadata(
+            name=f"Synthetic Matter ({n_events} events)",
+            id=f"SYN-{seed}-{n_events}",
+            type="Securities Fraud Investigation",
+            start=span_start.isoformat(),
+            end=(span_start + timedelta(days=span_days)).isoformat()
+        ),
+        events=events,
+        visualization_config=viz_config
+    )
+
+
+if __name__ == "__main__":
+    for size in SIZES:
+        timeline = generate_timeline(size)
+        actors = len({e.actor for e in timeline.events if not e.milestone})
+        milestones = sum(1 for e in timeline.events if e.milestone)
+        print(f"{size:>6} events: {actors} actors, {milestones} milestones, "
+              f"{len(timeline.visualization_config.actor_highlights)} highlights")
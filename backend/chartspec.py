@@ -0,0 +1,184 @@
+"""
+Compact JSON chart spec, for clients that draw the timeline themselves.
+
+The server-rendered charts ship a whole HTML page (or a PNG) per timeline. The React app can
+draw the chart from the model those pages are built from - D3GanttVisualizer.build_chart_data -
+so this module turns that model into a compact spec:
+
+- rows: actor labels top to bottom; bars and highlights reference them by index
+- legend: role entries first, so a bar's "role" is also its legend index
+- highlights: per row; a highlighted row's bars take the highlight color, every other bar its
+  role's legend color (the same rule as the rendered charts), so bars carry no colors
+- bars and milestones are columns (one array per field, like EventStore) rather than one
+  object per bar, so field names are not repeated for every bar
+- tooltip columns (action, target, context; milestone actor) are nullable and can be left out
+  entirely (tooltips=False) when the client loads that text on demand
+- footer: the model's footer_analysis or the sweep-line analytics fallback, as in the Plotly chart
+
+The spec is a pure function of the stored session (role colors included: color_map), so its ETag
+is derived from the session text. apply_commands edits a session's timeline with the structured
+commands of the session channel (see main.session_channel).
+"""
+
+import hashlib
+import re
+from typing import Dict, List, Optional
+
+import analytics
+from extractor import EventExtractor
+from models import ActorHighlight, Event, TimelineData, VisualizationConfig
+from visualizer_d3 import D3GanttVisualizer
+
+SPEC_VERSION = 1
+
+MAX_COMMANDS = 50  # Per channel message
+
+_TOOLTIP_FIELDS = ("action", "target", "context")
+_COLOR = re.compile(r"^#(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{6})$")
+_EVENT_FIELDS = set(Event.model_fields)
+
+
+def _compact(item: dict) -> dict:
+    return {key: value for key, value in item.items() if value not in (None, "")}
+
+
+def _columns(items: List[dict], fields: Dict[str, str]) -> Dict[str, list]:
+    """{spec column: [item[source field] for each item]}"""
+    return {column: [item[field] for item in items] for column, field in fields.items()}
+
+
+def spec_digest(session_data: str, tooltips: bool = True) -> str:
+    """Content digest of the spec built from a stored session's text (the response ETag)"""
+    sha = hashlib.sha256(f"v{SPEC_VERSION}:{int(tooltips)}:".encode())
+    sha.update(session_data.encode("utf-8"))
+    return sha.hexdigest()[:32]
+
+
+def color_map(timeline_data: TimelineData) -> Dict[str, str]:
+    """Role colors of a timeline: the palette (no API client needed) with the user's overrides"""
+    colors = EventExtractor.generate_color_palette(timeline_data.events)
+    if timeline_data.visualization_config:
+        colors.update(timeline_data.visualization_config.role_colors)
+    return colors
+
+
+def build_spec(timeline_data: TimelineData, color_map: Dict[str, str], tooltips: bool = True) -> dict:
+    """The compact chart spec of a timeline (see the module docstring for the layout)"""
+    chart = D3GanttVisualizer().build_chart_data(timeline_data, color_map)
+
+    rows = chart["actors"][::-1]  # chart_data lists them bottom to top
+    row_of = {actor: i for i, actor in enumerate(rows)}
+    legend = [{"label": label, "color": color} for label, color in chart["legend_items"].items()]
+    role_of = {entry["label"]: i for i, entry in enumerate(legend)}
+
+    bar_events, milestone_events = chart["bar_events"], chart["milestone_events"]
+    bars = {
+        "row": [row_of[bar["actor"]] for bar in bar_events],
+        "role": [role_of[bar["roleType"]] for bar in bar_events],
+        **_columns(bar_events, {"start": "start", "end": "end", "duration": "duration_label", "event": "event"}),
+    }
+    milestones = _columns(milestone_events, {"start": "start", "action": "action", "event": "event"})
+    if tooltips:
+        bars.update(_columns(bar_events, {field: field for field in _TOOLTIP_FIELDS}))
+        milestones.update(_columns(milestone_events, {"actor": "actor", "target": "target", "context": "context"}))
+
+    events = timeline_data.events
+    footer: Optional[str] = analytics.chart_footer(
+        timeline_data, [events[i] for i in bars["event"]], [events[i] for i in milestones["event"]]
+    )
+    return {
+        "version": SPEC_VERSION,
+        "case": _compact(chart["case"]),
+        "rows": rows,
+        "legend": legend,
+        "highlights": [{"row": row_of[actor], **_compact(h)} for actor, h in chart["actor_highlights"].items()],
+        "bars": bars,
+        "milestones": milestones,
+        "footer": footer,
+        "stats": _compact(chart["stats"]),
+    }
+
+
+def _color(command: dict) -> str:
+    color = command.get("color")
+    if not isinstance(color, str) or not _COLOR.match(color):
+        raise ValueError(f"color must be a hex color like #ef4444, got {color!r}")
+    return color
+
+
+def _text(command: dict, field: str) -> str:
+    value = command.get(field)
+    if not isinstance(value, str):
+        raise ValueError(f"{command['op']} needs a {field} string")
+    return value
+
+
+def apply_commands(timeline_data: TimelineData, commands: List[dict]) -> TimelineData:
+    """
+    A copy of a timeline with chart commands applied, in order. ValueError on the first invalid
+    one (nothing is applied). Commands ({"op": ..., ...}):
+
+    - highlight {actor, color, reason}: add or replace the actor's highlight
+    - unhighlight {actor}
+    - focus {actors: [...] or null}: show only these actors' bars (null: every actor)
+    - footer {text}
+    - role_color {role, color}: override a role's palette color
+    - update_event {event: index, fields: {actor, action, target, roleType, start, end, context, milestone}}
+    """
+    if not isinstance(commands, list) or not commands:
+        raise ValueError("commands must be a non-empty list")
+    if len(commands) > MAX_COMMANDS:
+        raise ValueError(f"At most {MAX_COMMANDS} commands per message")
+
+    events = list(timeline_data.events)
+    actors = {e.actor for e in events}
+    roles = {e.roleType for e in events}
+    config = (timeline_data.visualization_config or VisualizationConfig()).model_copy(deep=True)
+
+    def known_actor(command: dict) -> str:
+        actor = _text(command, "actor")
+        if actor not in actors:
+            raise ValueError(f"Unknown actor: {actor!r}")
+        return actor
+
+    for command in commands:
+        op = command.get("op") if isinstance(command, dict) else None
+        if op == "highlight":
+            actor = known_actor(command)
+            highlight = ActorHighlight(name=actor, color=_color(command), reason=command.get("reason") or "")
+            config.actor_highlights = [h for h in config.actor_highlights if h.name != actor] + [highlight]
+        elif op == "unhighlight":
+            actor = known_actor(command)
+            config.actor_highlights = [h for h in config.actor_highlights if h.name != actor]
+        elif op == "focus":
+            focus = command.get("actors")
+            if focus is not None:
+                if not isinstance(focus, list) or not focus or not all(isinstance(a, str) for a in focus):
+                    raise ValueError("focus needs actors: a non-empty list of names, or null")
+                unknown = [a for a in focus if a not in actors]
+                if unknown:
+                    raise ValueError(f"Unknown actors: {unknown}")
+            config.focus_actors = focus
+        elif op == "footer":
+            config.footer_analysis = _text(command, "text")
+        elif op == "role_color":
+            role = _text(command, "role")
+            if role not in roles:
+                raise ValueError(f"Unknown role: {role!r}")
+            config.role_colors = {**config.role_colors, role: _color(command)}
+        elif op == "update_event":
+            index, fields = command.get("event"), command.get("fields")
+            if not isinstance(index, int) or not 0 <= index < len(events):
+                raise ValueError(f"event must be an index 0-{len(events) - 1}")
+            if not isinstance(fields, dict) or not fields or not set(fields) <= _EVENT_FIELDS:
+                raise ValueError(f"fields must set some of {sorted(_EVENT_FIELDS)}")
+            try:
+                events[index] = Event.model_validate({**events[index].model_dump(), **fields})
+            except ValueError as e:  # pydantic's ValidationError
+                raise ValueError(f"Invalid event fields: {e.errors()[0]['msg'] if hasattr(e, 'errors') else e}")
+            actors.add(events[index].actor)
+            roles.add(events[index].roleType)
+        else:
+            raise ValueError(f"Unknown command: {op!r}")
+
+    return timeline_data.model_copy(update={"events": events, "visualization_config": config})
@@ -0,0 +1,129 @@
+"""
+Prompt compaction: strip page boilerplate and wasted whitespace before text goes to the model.
+
+Court filings repeat the caption, Bates numbers, running headers/footers and confidentiality
+legends on every page. Those lines are found by counting, per page, the normalized lines in
+each page's top and bottom few lines (digits masked, so "Page 3 of 90" and "HUB0000003" match
+their siblings); any that recur on enough pages are removed everywhere. Whitespace is then
+normalized, decorative rule lines dropped and end-of-line hyphenation joined, so more real
+content fits in extractor.MAX_DOCUMENT_CHARS.
+"""
+
+import math
+import os
+import re
+from collections import Counter
+from typing import Callable, Iterable, Iterator, List, Set, Tuple
+
+import metrics
+
+COMPACTION_ENABLED = os.getenv("HUBBLE_COMPACT_PROMPT", "1") == "1"
+
+# Rough English average, good enough for before/after comparisons
+CHARS_PER_TOKEN = 4
+
+EDGE_LINES = 4  # Lines at the top and bottom of a page that may be header/footer
+MIN_REPEAT_PAGES = 3
+MIN_REPEAT_RATIO = 0.3  # Share of pages a line must appear on to count as boilerplate
+MAX_BOILERPLATE_CHARS = 200
+
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"[ \t\f\v\u00a0]+")
+_RULE = re.compile(r"^[=_*~]{2,}$|^[=\-_*~#.\s]{5,}$")  # Decorative rules, incl. wrapped tails like "=="
+_HYPHENATED = re.compile(r"(\w)-\n([a-z])")
+_BLANK_RUNS = re.compile(r"\n{3,}")
+
+
+def estimate_tokens(text_or_chars) -> int:
+    chars = text_or_chars if isinstance(text_or_chars, int) else len(text_or_chars)
+    return math.ceil(chars / CHARS_PER_TOKEN)
+
+
+def _signature(line: str) -> str:
+    return _DIGITS.sub("#", _SPACES.sub(" ", line).strip()).lower()
+
+
+def _edge_signatures(page: str) -> Set[str]:
+    lines = [line for line in page.split("\n") if line.strip()]
+    edges = lines[:EDGE_LINES] + lines[-EDGE_LINES:]
+    return {_signature(line) for line in edges if len(line) <= MAX_BOILERPLATE_CHARS}
+
+
+def find_boilerplate(pages: Iterable[str]) -> Tuple[Set[str], int]:
+    """Signatures of header/footer lines repeated across pages, and the page count"""
+    counts: Counter = Counter()
+    page_count = 0
+    for page in pages:
+        counts.update(_edge_signatures(page))
+        page_count += 1
+    threshold = max(MIN_REPEAT_PAGES, math.ceil(MIN_REPEAT_RATIO * page_count))
+    if page_count < MIN_REPEAT_PAGES:
+        return set(), page_count
+    return {signature for signature, count in counts.items() if count >= threshold}, page_count
+
+
+def is_boilerplate(line: str, boilerplate: Set[str]) -> bool:
+    """A line clean_page drops: a detected header/footer line or a decorative rule (line whitespace-normalized)"""
+    return bool(line) and (_signature(line) in boilerplate or bool(_RULE.match(line)))
+
+
+def clean_page(page: str, boilerplate: Set[str]) -> Tuple[str, int]:
+    """One page without boilerplate, rule lines and redundant whitespace; returns (text, lines removed)"""
+    kept: List[str] = []
+    removed = 0
+    for line in page.split("\n"):
+        line = _SPACES.sub(" ", line).strip()
+        if is_boilerplate(line, boilerplate):
+            removed += 1
+            continue
+        kept.append(line)
+    text = "\n".join(kept)
+    text = _HYPHENATED.sub(r"\1\2", text)
+    return _BLANK_RUNS.sub("\n\n", text).strip("\n"), removed
+
+
+def clean_pages(iter_pages: Callable[[], Iterable[str]]) -> Iterator[str]:
+    """Each page with the document's boilerplate removed (detects it first, like compact_pages)"""
+    boilerplate, _ = find_boilerplate(iter_pages())
+    for page in iter_pages():
+        yield clean_page(page, boilerplate)[0]
+
+
+def compact_pages(iter_pages: Callable[[], Iterable[str]], max_chars: int = None) -> Tuple[str, dict]:
+    """
+    Compact a document given a callable that iterates its pages (called twice: detect, then clean).
+
+    Returns the compacted text - only its first max_chars characters if given, so a long
+    document is never held in memory - and stats for the whole document.
+    """
+    boilerplate, page_count = find_boilerplate(iter_pages())
+
+    parts: List[str] = []
+    kept_chars = 0  # Characters in parts
+    chars_before = chars_after = lines_removed = 0
+    for page in iter_pages():
+        text, removed = clean_page(page, boilerplate)
+        chars_before += len(page) + 1
+        chars_after += len(text) + 1
+        lines_removed += removed
+        if max_chars is None or kept_chars < max_chars:
+            part = text + "\n"
+            if max_chars is not None:
+                part = part[:max_chars - kept_chars]
+            parts.append(part)
+            kept_chars += len(part)
+
+    stats = {
+        "pages": page_count,
+        "boilerplate_patterns": len(boilerplate),
+        "lines_removed": lines_removed,
+        "chars_before": chars_before,
+        "chars_after": chars_after,
+        "tokens_before": estimate_tokens(chars_before),
+        "tokens_after": estimate_tokens(chars_after),
+    }
+    metrics.PROMPT_TOKENS_ESTIMATED.inc(stats["tokens_before"], phase="before")
+    metrics.PROMPT_TOKENS_ESTIMATED.inc(stats["tokens_after"], phase="after")
+    if chars_before:
+        metrics.PROMPT_COMPACTION_RATIO.observe(chars_after / chars_before)
+    return "".join(parts), stats
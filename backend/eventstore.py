@@ -0,0 +1,262 @@
+"""
+Columnar in-memory representation of a timeline's events.
+
+TimelineData.events is a list of pydantic Event objects: every filter, sort or aggregation
+walks the list with Python attribute access, and each event carries its own copies of the
+actor, roleType and date strings. EventStore keeps the same events as numpy columns:
+
+- actor, roleType, action, target and context as int32 codes into interned string tables
+- start/end as int32 days since 1970-01-01, plus a precision code per date (day, month or
+  year - "2019-03" and "2019-03-01" start on the same day but are not the same string)
+- one uint8 flag byte per event: FLAG_MILESTONE, FLAG_HAS_END
+
+Filtering, sorting and per-actor/per-role aggregation are vectorized. to_timeline() rebuilds
+an equal TimelineData: strings that do not round-trip through the date columns (free-form or
+unparseable dates) are kept verbatim on the side.
+"""
+
+import sys
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from models import Event, TimelineData
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Day value for a missing (end=None) or unparseable date
+NO_DAY = np.iinfo(np.int32).min
+
+# Date precision codes
+DAY, MONTH, YEAR, NONE, UNPARSED = 0, 1, 2, 3, 4
+
+FLAG_MILESTONE = 1
+FLAG_HAS_END = 2
+
+NO_STRING = -1  # Code for target=None
+
+
+class StringTable:
+    """Interned strings <-> dense int codes"""
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.strings)
+            self.strings.append(sys.intern(value))
+        return code
+
+    def lookup(self, value: str) -> int:
+        """Code of an existing string, NO_STRING if it never occurs"""
+        return self._codes.get(value, NO_STRING)
+
+    def __getitem__(self, code: int) -> Optional[str]:
+        return None if code == NO_STRING else self.strings[code]
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def nbytes(self) -> int:
+        return sum(sys.getsizeof(s) for s in self.strings) + sys.getsizeof(self.strings) + sys.getsizeof(self._codes)
+
+
+def parse_day(value: Optional[str]) -> Tuple[int, int]:
+    """(days since epoch, precision) for YYYY-MM-DD, YYYY-MM or YYYY; NO_DAY if missing or unparseable"""
+    if value is None:
+        return NO_DAY, NONE
+    text = value.strip()
+    try:
+        if len(text) == 4:
+            return date(int(text), 1, 1).toordinal() - EPOCH_ORDINAL, YEAR
+        if len(text) == 7:
+            return date(int(text[:4]), int(text[5:7]), 1).toordinal() - EPOCH_ORDINAL, MONTH
+        return date.fromisoformat(text).toordinal() - EPOCH_ORDINAL, DAY
+    except ValueError:
+        return NO_DAY, UNPARSED
+
+
+def format_day(day: int, precision: int) -> Optional[str]:
+    """Inverse of parse_day for the canonical forms"""
+    if precision == NONE:
+        return None
+    value = date.fromordinal(int(day) + EPOCH_ORDINAL)
+    if precision == YEAR:
+        return f"{value.year:04d}"
+    if precision == MONTH:
+        return f"{value.year:04d}-{value.month:02d}"
+    return value.isoformat()
+
+
+class EventStore:
+    """Columnar events of one timeline; see the module docstring"""
+
+    def __init__(self, timeline: TimelineData = None):
+        self.actors = StringTable()
+        self.roles = StringTable()
+        self.actions = StringTable()
+        self.targets = StringTable()
+        self.contexts = StringTable()
+        self.case = timeline.case if timeline else None
+        self.visualization_config = timeline.visualization_config if timeline else None
+        # Original date strings that format_day would not reproduce exactly: (row, "start"|"end") -> text
+        self.raw_dates: Dict[Tuple[int, str], str] = {}
+
+        events = timeline.events if timeline else []
+        n = len(events)
+        self.actor = np.empty(n, dtype=np.int32)
+        self.role = np.empty(n, dtype=np.int32)
+        self.action = np.empty(n, dtype=np.int32)
+        self.target = np.empty(n, dtype=np.int32)
+        self.context = np.empty(n, dtype=np.int32)
+        self.start = np.empty(n, dtype=np.int32)
+        self.end = np.empty(n, dtype=np.int32)
+        self.start_precision = np.empty(n, dtype=np.uint8)
+        self.end_precision = np.empty(n, dtype=np.uint8)
+        self.flags = np.zeros(n, dtype=np.uint8)
+
+        parsed: Dict[Optional[str], Tuple[int, int, bool]] = {}  # Date strings repeat a lot
+        for row, event in enumerate(events):
+            self.actor[row] = self.actors.code(event.actor)
+            self.role[row] = self.roles.code(event.roleType)
+            self.action[row] = self.actions.code(event.action)
+            self.target[row] = self.targets.code(event.target)
+            self.context[row] = self.contexts.code(event.context)
+            for field, days, precisions in (("start", self.start, self.start_precision),
+                                            ("end", self.end, self.end_precision)):
+                value = getattr(event, field)
+                entry = parsed.get(value)
+                if entry is None:
+                    day, precision = parse_day(value)
+                    exact = precision != UNPARSED and format_day(day, precision) == value
+                    entry = parsed[value] = (day, precision, exact)
+                days[row], precisions[row], exact = entry
+                if not exact and value is not None:
+                    self.raw_dates[(row, field)] = value
+            self.flags[row] = (FLAG_MILESTONE if event.milestone else 0) | (FLAG_HAS_END if event.end is not None else 0)
+
+    @classmethod
+    def from_timeline(cls, timeline: TimelineData) -> "EventStore":
+        return cls(timeline)
+
+    def __len__(self) -> int:
+        return len(self.actor)
+
+    # -- conversion back -------------------------------------------------------------------
+
+    def _date(self, row: int, field: str) -> Optional[str]:
+        raw = self.raw_dates.get((row, field))
+        if raw is not None:
+            return raw
+        if field == "start":
+            return format_day(self.start[row], self.start_precision[row])
+        return format_day(self.end[row], self.end_precision[row])
+
+    def event(self, row: int) -> Event:
+        return self.events([row])[0]
+
+    def events(self, rows: Iterable[int] = None) -> List[Event]:
+        """Event objects for all rows or the given rows, in that order"""
+        rows = np.arange(len(self)) if rows is None else np.asarray(list(rows), dtype=np.int64)
+        # Plain lists first: per-element numpy indexing is slower than attribute access
+        columns = zip(rows.tolist(), self.actor[rows].tolist(), self.action[rows].tolist(),
+                      self.target[rows].tolist(), self.role[rows].tolist(), self.context[rows].tolist(),
+                      (self.flags[rows] & FLAG_MILESTONE).tolist())
+        actors, actions, targets = self.actors.strings, self.actions.strings, self.targets.strings
+        roles, contexts = self.roles.strings, self.contexts.strings
+        return [
+            Event(
+                actor=actors[actor],
+                action=actions[action],
+                target=None if target == NO_STRING else targets[target],
+                roleType=roles[role],
+                start=self._date(row, "start"),
+                end=self._date(row, "end"),
+                context=contexts[context],
+                milestone=bool(milestone),
+            )
+            for row, actor, action, target, role, context, milestone in columns
+        ]
+
+    def to_timeline(self, rows: Iterable[int] = None) -> TimelineData:
+        """TimelineData for all rows (equal to the source timeline) or the given rows, in that order"""
+        return TimelineData(case=self.case, events=self.events(rows), visualization_config=self.visualization_config)
+
+    # -- vectorized queries ------------------------------------------------------------------
+
+    def milestone_mask(self) -> np.ndarray:
+        return (self.flags & FLAG_MILESTONE) != 0
+
+    def bar_mask(self) -> np.ndarray:
+        """Events drawn as bars: an end date (milestones and end=None events are point events)"""
+        return (self.flags & FLAG_HAS_END) != 0
+
+    def point_mask(self) -> np.ndarray:
+        """Events drawn as milestone markers (what the visualizers treat as milestones)"""
+        return self.milestone_mask() | ~self.bar_mask()
+
+    def dated_mask(self) -> np.ndarray:
+        """
+        Events whose start (and end, if any) parsed to a day, with the end not before the start.
+        Inverted bars (unvalidated model output, or an edit) have no extent to place on a time axis.
+        """
+        return (self.start != NO_DAY) & (((self.end != NO_DAY) & (self.end >= self.start)) | ~self.bar_mask())
+
+    def actor_mask(self, names: Iterable[str]) -> np.ndarray:
+        codes = [self.actors.lookup(name) for name in names]
+        return np.isin(self.actor, [code for code in codes if code != NO_STRING])
+
+    def role_mask(self, role_types: Iterable[str]) -> np.ndarray:
+        codes = [self.roles.lookup(role) for role in role_types]
+        return np.isin(self.role, [code for code in codes if code != NO_STRING])
+
+    def overlap_mask(self, start_day: int, end_day: int) -> np.ndarray:
+        """Events intersecting [start_day, end_day] (point events: their start inside it)"""
+        end = np.where(self.bar_mask(), self.end, self.start)
+        return self.dated_mask() & (self.start <= end_day) & (end >= start_day)
+
+    def sort_rows(self, mask: np.ndarray = None, by: str = "start") -> np.ndarray:
+        """Row indices (optionally only where mask is True) ordered by start then end, or by actor then start"""
+        rows = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        if by == "start":
+            order = np.lexsort((self.end[rows], self.start[rows]))
+        elif by == "actor":
+            order = np.lexsort((self.start[rows], self.actor[rows]))
+        else:
+            raise ValueError(f"Unknown sort key: {by} (expected start or actor)")
+        return rows[order]
+
+    def actor_order(self, mask: np.ndarray = None) -> List[str]:
+        """Distinct actors in order of first appearance among the masked rows"""
+        rows = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        codes, first = np.unique(self.actor[rows], return_index=True)
+        return [self.actors[int(code)] for code in codes[np.argsort(first, kind="stable")]]
+
+    def actor_spans(self, mask: np.ndarray = None) -> Dict[str, Tuple[int, int]]:
+        """Earliest start and latest end day per actor over dated bar events"""
+        mask = self.bar_mask() & self.dated_mask() if mask is None else mask & self.bar_mask() & self.dated_mask()
+        actor, start, end = self.actor[mask], self.start[mask], self.end[mask]
+        first = np.full(len(self.actors), np.iinfo(np.int32).max, dtype=np.int32)
+        last = np.full(len(self.actors), NO_DAY, dtype=np.int32)
+        np.minimum.at(first, actor, start)
+        np.maximum.at(last, actor, end)
+        present = np.unique(actor)
+        return {self.actors[int(code)]: (int(first[code]), int(last[code])) for code in present}
+
+    def role_counts(self, mask: np.ndarray = None) -> Dict[str, int]:
+        counts = np.bincount(self.role if mask is None else self.role[mask], minlength=len(self.roles))
+        return {self.roles[code]: int(count) for code, count in enumerate(counts) if count}
+
+    def nbytes(self) -> int:
+        """Approximate memory of the columns, string tables and side tables"""
+        arrays = (self.actor, self.role, self.action, self.target, self.context, self.start, self.end,
+                  self.start_precision, self.end_precision, self.flags)
+        tables = (self.actors, self.roles, self.actions, self.targets, self.contexts)
+        return (sum(a.nbytes for a in arrays) + sum(table.nbytes() for table in tables)
+                + sys.getsizeof(self.raw_dates))
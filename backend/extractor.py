@@ -1,21 +1,86 @@
-import anthropic
-import json
 import os
 import asyncio
+import time
 from typing import List, Dict
 from models import Event, CaseMetadata, TimelineData
+import metrics
+import recording
+
+MODEL = "claude-3-opus-20240229"
+
+# Document characters sent to the model
+MAX_DOCUMENT_CHARS = 50000
+
+# Prepended to the document text in focused mode (see passages.py)
+FOCUSED_NOTE = """NOTE: This document is longer than the analysis budget. Below are only the passages that mention
+dates, in document order, each prefixed with its page reference like [p. 12]. Text between passages
+is omitted; do not assume nothing happened there.
+
+"""
 
 class EventExtractor:
     def __init__(self, api_key: str):
-        self.client = anthropic.Anthropic(api_key=api_key)
+        self.api_key = api_key
+        self._client = None
+
+    @property
+    def client(self):
+        """Async Anthropic client, created on first use (importing anthropic takes ~1s)"""
+        if self._client is None:
+            import anthropic
+            self._client = anthropic.AsyncAnthropic(api_key=self.api_key)
+        return self._client
+
+    async def _text_stream(self, prompt: str, key: str, user_request: str = None):
+        """
+        Raw text chunks for a prompt: live from the API, or from a recording (see recording.py).
 
-    async def extract_events(self, text: str, user_request: str = None) -> TimelineData:
+        Recording and replay sit underneath the chunk handling in extract_events, so replayed
+        runs exercise exactly the same parsing code as live ones.
+        """
+        if recording.LLM_MODE == "replay":
+            saved = recording.load_recording(key)
+            print(f"[DEBUG] Replaying recorded response {key} ({len(saved['chunks'])} chunks)")
+            async for text_chunk in recording.replay_chunks(saved):
+                yield text_chunk
+            return
+
+        recorder = recording.StreamRecorder(key, MODEL, user_request) if recording.LLM_MODE == "record" else None
+
+        # Async client: waiting on the network never blocks other requests on the event loop
+        async with self.client.messages.stream(
+            model=MODEL,
+            max_tokens=4096,  # Claude Opus maximum
+            temperature=0,
+            messages=[{
+                "role": "user",
+                "content": prompt
+            }]
+        ) as stream:
+            async for text_chunk in stream.text_stream:
+                if recorder:
+                    recorder.add(text_chunk)
+                yield text_chunk
+
+            usage = (await stream.get_final_message()).usage
+            metrics.LLM_TOKENS.inc(usage.input_tokens, direction="input")
+            metrics.LLM_TOKENS.inc(usage.output_tokens, direction="output")
+
+        if recorder:
+            recorder.save({"input_tokens": usage.input_tokens, "output_tokens": usage.output_tokens})
+
+    async def extract_events(self, text: str, user_request: str = None, timer: "metrics.RequestTimer" = None,
+                             focused: bool = False, preview=None) -> TimelineData:
         """
         Extract structured events from legal document text using Claude.
 
         Args:
             text: Raw text from legal document
             user_request: Optional specific request like "analyze executives" or "show stakeholder timeline"
+            timer: Optional per-request timer that receives llm_first_token/llm_total/json_parse
+            focused: text is ranked date passages with page references, not the whole document
+            preview: Optional previews.PreviewBuilder, polled with the partial response; its
+                updates are yielded as {"type": "preview", "content": update}
 
         Returns:
             TimelineData with metadata and structured events
@@ -23,6 +88,7 @@ class EventExtractor:
 
         # Build user context
         user_context = f"\n\n**User Request**: {user_request}" if user_request else "\n\n**User Request**: General stakeholder timeline analysis"
+        document_note = FOCUSED_NOTE if focused else ""
 
         prompt = f"""You are an expert timeline analyst. Your goal: Read this document like a human analyst, understand what the user wants to visualize, then create a Gantt chart that tells the story.
 
@@ -181,7 +247,7 @@ Show your reasoning in a <thinking> section before JSON output.
 DOCUMENT TEXT
 ================================================================================
 
-{text[:50000]}"""
+{document_note}{text[:MAX_DOCUMENT_CHARS]}"""
 
         # Use Claude 3 Opus with STREAMING for real-time thinking
         print(f"[DEBUG] Using Claude 3 Opus with streaming for extraction...")
@@ -189,73 +255,79 @@ DOCUMENT TEXT
         accumulated_text = ""
         thinking_buffer = ""
         in_thinking_block = False
-
-        # Stream response from Claude in REAL-TIME (use synchronous streaming with async yields)
-        with self.client.messages.stream(
-            model="claude-3-opus-20240229",
-            max_tokens=4096,  # Claude Opus maximum
-            temperature=0,
-            messages=[{
-                "role": "user",
-                "content": prompt
-            }]
-        ) as stream:
-            for text_chunk in stream.text_stream:
-                accumulated_text += text_chunk
-
-                # Yield control to event loop
-                await asyncio.sleep(0)
-
-                # Check if we're entering or exiting thinking block
-                if "<thinking>" in text_chunk and not in_thinking_block:
-                    in_thinking_block = True
+        timer = timer or metrics.RequestTimer()
+        llm_started = time.perf_counter()
+        first_token_seen = False
+
+        # Stream response from Claude in REAL-TIME (live, recorded or replayed - see _text_stream)
+        key = recording.recording_key(document_note + text, user_request)
+        async for text_chunk in self._text_stream(prompt, key, user_request):
+            if not first_token_seen:
+                first_token_seen = True
+                timer.record("llm_first_token", time.perf_counter() - llm_started)
+            accumulated_text += text_chunk
+
+            # Yield control to event loop
+            await asyncio.sleep(0)
+
+            # Events completed so far, as a throttled preview (see previews.py)
+            if preview is not None and not in_thinking_block:
+                update = preview.poll(accumulated_text)
+                if update:
+                    yield {"type": "preview", "content": update}
+
+            # Check if we're entering or exiting thinking block
+            if "<thinking>" in text_chunk and not in_thinking_block:
+                in_thinking_block = True
+                thinking_buffer = ""
+                continue
+
+            if "</thinking>" in text_chunk and in_thinking_block:
+                in_thinking_block = False
+                # Flush any remaining thinking
+                if thinking_buffer:
+                    yield {"type": "thinking", "content": thinking_buffer.strip()}
                     thinking_buffer = ""
-                    continue
+                continue
 
-                if "</thinking>" in text_chunk and in_thinking_block:
-                    in_thinking_block = False
-                    # Flush any remaining thinking
-                    if thinking_buffer:
-                        yield {"type": "thinking", "content": thinking_buffer.strip()}
-                        thinking_buffer = ""
-                    continue
+            # If we're in thinking block, buffer and yield line by line
+            if in_thinking_block:
+                thinking_buffer += text_chunk
 
-                # If we're in thinking block, buffer and yield line by line
-                if in_thinking_block:
-                    thinking_buffer += text_chunk
+                # Yield complete lines as they come
+                while "\n" in thinking_buffer:
+                    line, thinking_buffer = thinking_buffer.split("\n", 1)
+                    if line.strip():
+                        yield {"type": "thinking", "content": line.strip()}
+                        await asyncio.sleep(0)  # Yield control after each line
 
-                    # Yield complete lines as they come
-                    while "\n" in thinking_buffer:
-                        line, thinking_buffer = thinking_buffer.split("\n", 1)
-                        if line.strip():
-                            yield {"type": "thinking", "content": line.strip()}
-                            await asyncio.sleep(0)  # Yield control after each line
-
-        print(f"[SUCCESS] Claude API streaming completed")
+        timer.record("llm_total", time.perf_counter() - llm_started)
+        print(f"[SUCCESS] Claude API streaming completed ({recording.LLM_MODE})")
 
         # Parse final accumulated response
         response_text = accumulated_text
 
-        # Extract JSON from response (handle markdown code blocks)
-        if "```json" in response_text:
-            json_str = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            json_str = response_text.split("```")[1].split("```")[0].strip()
-        else:
-            json_str = response_text.strip()
-
-        data = json.loads(json_str)
-
-        # Validate and yield final structured data
-        timeline_data = TimelineData(**data)
+        with timer.stage("json_parse"):
+            # Extract JSON from response (handle markdown code blocks)
+            if "```json" in response_text:
+                json_str = response_text.split("```json")[1].split("```")[0].strip()
+            elif "```" in response_text:
+                json_str = response_text.split("```")[1].split("```")[0].strip()
+            else:
+                json_str = response_text.strip()
+
+            # Parse and validate in one step (pydantic's JSON parser, no intermediate dict)
+            timeline_data = TimelineData.model_validate_json(json_str)
         yield {"type": "complete", "data": timeline_data}
 
-    def generate_color_palette(self, events: List[Event]) -> Dict[str, str]:
+    @staticmethod
+    def generate_color_palette(events: List[Event]) -> Dict[str, str]:
         """
         Generate color palette based on extracted role types.
         Using neutral, muted colors similar to NexVira reference for better readability.
         """
-        unique_roles = list(set(event.roleType for event in events))
+        # First-appearance order, so every worker (and the chart spec) gives a role the same color
+        unique_roles = list(dict.fromkeys(event.roleType for event in events))
 
         # Neutral, muted color palette (like NexVira) - easier on eyes, professional
         colors = [
@@ -0,0 +1,239 @@
+"""
+PDF text extraction for document ingestion.
+
+Engines take a PDF path and return the document text (pages joined with newlines).
+ENGINES lists every engine by name so benchmarks/bench_ingest.py can compare them.
+
+The default ("auto") reads PDFium's native text layer, which is ~50-100x faster than
+pdfplumber's character-level layout analysis, and re-extracts with pdfplumber only the pages
+where the fast path comes back empty or garbled. HUBBLE_PDF_ENGINE selects the engine.
+
+Documents are processed one page at a time (iter_pages) and process_document spools the text
+to disk (TextSpool), so thousand-page productions do not hold every page's parser state, or
+the whole text, in memory at once.
+"""
+
+import os
+import re
+from typing import Callable, Dict, Iterator, List, Tuple
+
+PDF_ENGINE = os.getenv("HUBBLE_PDF_ENGINE", "auto").lower()
+
+# Control characters (other than tab/newline), U+FFFD and private-use glyphs: what a text layer
+# without a usable ToUnicode map tends to produce
+_GARBAGE = re.compile("[\\x00-\\x08\\x0b\\x0c\\x0e-\\x1f\\ufffd\\ue000-\\uf8ff]")
+_WORD_CHAR = re.compile(r"\w")
+_WHITESPACE = re.compile(r"\s+")
+
+MAX_GARBAGE_RATIO = 0.05
+MIN_WORD_CHAR_RATIO = 0.5
+
+
+def looks_garbled(text: str) -> bool:
+    """True if a page's text is empty or unlikely to be readable"""
+    compact = _WHITESPACE.sub("", text)
+    if not compact:
+        return True
+    _, garbage = _GARBAGE.subn("", compact)
+    if garbage / len(compact) > MAX_GARBAGE_RATIO:
+        return True
+    _, word_chars = _WORD_CHAR.subn("", compact)
+    return word_chars / len(compact) < MIN_WORD_CHAR_RATIO
+
+
+def _clean_pdfium_text(text: str) -> str:
+    # PDFium uses CRLF line ends and writes line-break hyphens as \x02 (U+FFFE in some builds)
+    return text.replace("\r\n", "\n").replace("\r", "\n").replace("\x02", "-").replace("\ufffe", "-")
+
+
+def _pdfium_page_text(pdf, index: int) -> str:
+    page = pdf[index]
+    textpage = page.get_textpage()
+    try:
+        return _clean_pdfium_text(textpage.get_text_range())
+    finally:
+        textpage.close()
+        page.close()
+
+
+def _pdfplumber_page_text(page) -> str:
+    try:
+        return page.extract_text() or ""
+    finally:
+        # Drop the page's character/object caches now, not when the document closes
+        page.close()
+
+
+def iter_pages(file_path: str, engine: str = None) -> Iterator[Tuple[str, dict]]:
+    """
+    Yield (text, report) one page at a time, e.g. report = {"page": 1, "engine": "pdfium", "chars": 2481}.
+
+    engine: "auto" (PDFium with per-page pdfplumber fallback), "pdfium" or "pdfplumber".
+    Each page's parser state is released before the next page is read, so memory stays flat
+    however long the document is.
+    """
+    engine = engine or PDF_ENGINE
+
+    if engine == "pdfplumber":
+        import pdfplumber
+
+        with pdfplumber.open(file_path) as pdf:
+            for page in pdf.pages:
+                text = _pdfplumber_page_text(page)
+                yield text, {"page": page.page_number, "engine": "pdfplumber", "chars": len(text)}
+
+    elif engine in ("auto", "pdfium"):
+        import pypdfium2
+
+        pdf = pypdfium2.PdfDocument(file_path)
+        fallback_pdf = None  # pdfplumber handle, opened only if a page needs it
+        try:
+            for index in range(len(pdf)):
+                text, used = _pdfium_page_text(pdf, index), "pdfium"
+                if engine == "auto" and looks_garbled(text):
+                    if fallback_pdf is None:
+                        import pdfplumber
+                        fallback_pdf = pdfplumber.open(file_path)
+                    text, used = _pdfplumber_page_text(fallback_pdf.pages[index]), "pdfplumber"
+                yield text, {"page": index + 1, "engine": used, "chars": len(text)}
+        finally:
+            pdf.close()
+            if fallback_pdf is not None:
+                fallback_pdf.close()
+
+    else:
+        raise ValueError(f"Unknown PDF engine: {engine} (expected auto, pdfium or pdfplumber)")
+
+
+def extract_pages(file_path: str, engine: str = None) -> Tuple[List[str], List[dict]]:
+    """Per-page text plus the per-page engine report (see iter_pages)"""
+    texts, report = [], []
+    for text, page in iter_pages(file_path, engine):
+        texts.append(text)
+        report.append(page)
+    return texts, report
+
+
+class TextSpool:
+    """
+    Document text kept on disk instead of in one big string.
+
+    Pages are appended as they are extracted (UTF-8, each followed by a newline - the same
+    layout extract_document returns), with byte offsets per page so any page or a bounded
+    prefix can be read back without loading the rest.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.pages: List[dict] = []  # Per-page engine report
+        self.word_count = 0
+        self.char_count = 0
+        self._offsets: List[Tuple[int, int]] = []  # (byte offset, byte length) per page
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "w+b")
+
+    def append(self, text: str, report: dict) -> None:
+        data = (text + "\n").encode("utf-8")
+        self._offsets.append((self._file.tell(), len(data)))
+        self._file.write(data)
+        self.pages.append(report)
+        self.word_count += len(text.split())
+        self.char_count += len(text) + 1
+
+    def _read_bytes(self, offset: int, length: int) -> str:
+        self._file.flush()
+        self._file.seek(offset)
+        data = self._file.read(length)
+        self._file.seek(0, os.SEEK_END)
+        return data.decode("utf-8")
+
+    def page_text(self, page_number: int) -> str:
+        """Text of one page (1-based), without the trailing newline"""
+        return self._read_bytes(*self._offsets[page_number - 1])[:-1]
+
+    def iter_pages(self) -> Iterator[str]:
+        for page_number in range(1, len(self._offsets) + 1):
+            yield self.page_text(page_number)
+
+    def read(self, max_chars: int = None) -> str:
+        """The document text, or only its first max_chars characters"""
+        if not self._offsets:
+            return ""
+        if max_chars is None:
+            return self._read_bytes(0, sum(length for _, length in self._offsets))
+        parts, remaining = [], max_chars
+        for page_number in range(1, len(self._offsets) + 1):
+            if remaining <= 0:
+                break
+            text = self._read_bytes(*self._offsets[page_number - 1])
+            parts.append(text[:remaining])
+            remaining -= len(text)
+        return "".join(parts)
+
+    def close(self, remove: bool = True) -> None:
+        self._file.close()
+        if remove and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def spool_document(file_path: str, spool_path: str, engine: str = None) -> TextSpool:
+    """Extract page by page straight into an on-disk spool; memory use is independent of page count"""
+    spool = TextSpool(spool_path)
+    try:
+        for text, report in iter_pages(file_path, engine):
+            spool.append(text, report)
+    except Exception:
+        spool.close()
+        raise
+    return spool
+
+
+def summarize_pages(report: List[dict]) -> dict:
+    """Compact per-page engine report for payloads: counts plus the pages that fell back"""
+    counts: Dict[str, int] = {}
+    for page in report:
+        counts[page["engine"]] = counts.get(page["engine"], 0) + 1
+    # Pages read by pdfplumber in a PDFium run are the fallbacks
+    fallback_pages = []
+    if "pdfium" in counts:
+        fallback_pages = [page["page"] for page in report if page["engine"] == "pdfplumber"]
+    return {"page_count": len(report), "engines": counts, "fallback_pages": fallback_pages}
+
+
+def extract_document(file_path: str, engine: str = None) -> Tuple[str, List[dict]]:
+    """Full document text (pages joined with newlines) and the per-page engine report"""
+    texts, report = extract_pages(file_path, engine)
+    return "".join(text + "\n" for text in texts), report
+
+
+def _spooled_text(file_path: str) -> str:
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as spool_dir:
+        spool = spool_document(file_path, os.path.join(spool_dir, "spool.txt"))
+        try:
+            return spool.read()
+        finally:
+            spool.close()
+
+
+def extract_text_from_pdf(file_path: str) -> str:
+    """Extract text from PDF using pdfplumber"""
+    import pdfplumber
+
+    text = ""
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages:
+            text += page.extract_text() + "\n"
+    return text
+
+
+ENGINES: Dict[str, Callable[[str], str]] = {
+    "pdfplumber": extract_text_from_pdf,
+    "pdfium": lambda path: extract_document(path, "pdfium")[0],
+    "auto": lambda path: extract_document(path, "auto")[0],
+    # Page-at-a-time pdfplumber with per-page cache release
+    "pdfplumber-paged": lambda path: extract_document(path, "pdfplumber")[0],
+    # What process_document does: default engine into an on-disk spool
+    "spool": _spooled_text,
+}
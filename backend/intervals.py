@@ -0,0 +1,221 @@
+"""
+Interval index over a stored timeline, for time-window queries.
+
+Zooming a large chart to a date range should not mean re-rendering or re-sending every event.
+IntervalIndex is built once per session from its EventStore and answers "which events overlap
+[start, end]" in O(log n + k) for k results:
+
+    overlaps [a, b]  <=>  a <= start <= b   (binary search on the sorted start array)
+                      or  start < a <= end   (stabbing query at a on a centered interval tree)
+
+The two sets are disjoint, so no result is visited twice. Milestones (and other point events)
+are intervals of length zero.
+
+window() groups the overlapping bars by chart row (actor, in the order the Gantt chart draws
+them) and pages over those rows, so a frontend can lazily load a very large timeline one
+window and a few hundred rows at a time.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+import metrics
+from eventstore import EPOCH_ORDINAL, MONTH, NO_DAY, YEAR, EventStore, parse_day
+
+# Sessions whose index stays cached per worker
+CACHE_SESSIONS = int(os.getenv("HUBBLE_WINDOW_CACHE_SESSIONS", "32"))
+
+class _Node:
+    __slots__ = ("center", "left", "right", "by_start", "starts", "by_end", "neg_ends")
+
+    def __init__(self, center, left, right, by_start, starts, by_end, neg_ends):
+        self.center = center
+        self.left = left
+        self.right = right
+        self.by_start = by_start  # Rows crossing center, by ascending start
+        self.starts = starts
+        self.by_end = by_end  # Rows crossing center, by descending end
+        self.neg_ends = neg_ends  # -end, ascending, for searchsorted
+
+
+def _build_tree(rows: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> Optional[_Node]:
+    """Centered interval tree: each node keeps the intervals that contain its center"""
+    if len(rows) == 0:
+        return None
+    center = int(np.median(np.concatenate((starts, ends))))
+    is_left, is_right = ends < center, starts > center
+    here = ~(is_left | is_right)
+    left = _build_tree(rows[is_left], starts[is_left], ends[is_left])
+    right = _build_tree(rows[is_right], starts[is_right], ends[is_right])
+    node_rows, node_starts, node_ends = rows[here], starts[here], ends[here]
+    by_start = np.argsort(node_starts, kind="stable")
+    by_end = np.argsort(-node_ends, kind="stable")
+    return _Node(center, left, right, node_rows[by_start], node_starts[by_start],
+                 node_rows[by_end], -node_ends[by_end])
+
+
+class IntervalIndex:
+    """Overlap queries over one EventStore's dated events (see module docstring)"""
+
+    def __init__(self, store: EventStore):
+        self.store = store
+        dated = np.flatnonzero(store.dated_mask())
+        starts = store.start[dated]
+        # Point events (milestones, end=None) are zero-length intervals
+        ends = np.where(store.bar_mask()[dated], store.end[dated], starts)
+
+        order = np.argsort(starts, kind="stable")
+        self._rows_by_start = dated[order]
+        self._sorted_starts = starts[order]
+        self._root = _build_tree(dated, starts, ends)
+
+        self.rows = chart_rows(store)  # Actor names, top row first
+        self._row_of_actor = np.full(len(store.actors), -1, dtype=np.int64)
+        for position, actor in enumerate(self.rows):
+            self._row_of_actor[store.actors.lookup(actor)] = position
+
+    def _stab(self, day: int) -> List[np.ndarray]:
+        """Rows of every interval with start <= day <= end"""
+        found, node = [], self._root
+        while node is not None:
+            if day < node.center:
+                found.append(node.by_start[:np.searchsorted(node.starts, day, side="right")])
+                node = node.left
+            elif day > node.center:
+                found.append(node.by_end[:np.searchsorted(node.neg_ends, -day, side="right")])
+                node = node.right
+            else:
+                found.append(node.by_start)
+                break
+        return found
+
+    def overlapping(self, start_day: int, end_day: int) -> np.ndarray:
+        """Rows (EventStore indices) of events overlapping [start_day, end_day], in no particular order"""
+        lo = np.searchsorted(self._sorted_starts, start_day, side="left")
+        hi = np.searchsorted(self._sorted_starts, end_day, side="right")
+        parts = [self._rows_by_start[lo:hi]]
+        # Intervals that began before the window and are still running at its start
+        for rows in self._stab(start_day):
+            parts.append(rows[self.store.start[rows] < start_day])
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def window(self, start_day: int, end_day: int, row_offset: int = 0, row_limit: int = 50) -> dict:
+        """
+        Bars overlapping the window grouped into chart rows, one page of rows at a time, plus
+        every milestone in the window (milestones span all rows, so each page carries them).
+        """
+        store = self.store
+        rows = self.overlapping(start_day, end_day)
+        points = store.point_mask()[rows]
+        milestones, bars = rows[points], rows[~points]
+
+        # Bars of actors that are not chart rows (filtered out by focus_actors) are not drawn
+        bar_rows = self._row_of_actor[store.actor[bars]]
+        drawn = bar_rows >= 0
+        bars, bar_rows = bars[drawn], bar_rows[drawn]
+        visible_rows = np.unique(bar_rows)  # Sorted = top-to-bottom chart order
+        page_rows = visible_rows[row_offset:row_offset + row_limit]
+
+        on_page = np.isin(bar_rows, page_rows)
+        bars, bar_rows = bars[on_page], bar_rows[on_page]
+        order = np.lexsort((store.start[bars], bar_rows))
+        bars, bar_rows = bars[order], bar_rows[order]
+        milestones = milestones[np.argsort(store.start[milestones], kind="stable")]
+
+        # "event" is the event's position in the session (its EventStore row)
+        events = store.events(bars)
+        grouped: Dict[int, List[dict]] = {}
+        for row, bar, event in zip(bar_rows.tolist(), bars.tolist(), events):
+            grouped.setdefault(row, []).append({"event": bar, **event.model_dump()})
+
+        next_offset = row_offset + len(page_rows)
+        return {
+            "rows": [{"row": row, "actor": self.rows[row], "events": grouped[row]} for row in page_rows.tolist()],
+            "milestones": [{"event": row, **event.model_dump()}
+                           for row, event in zip(milestones.tolist(), store.events(milestones))],
+            "total_rows": len(visible_rows),
+            "row_offset": row_offset,
+            "row_limit": row_limit,
+            "next_row_offset": next_offset if next_offset < len(visible_rows) else None,
+            "bar_count": len(bars),
+        }
+
+
+def chart_rows(store: EventStore) -> List[str]:
+    """Actor rows top to bottom, as the Gantt renderers order them"""
+    bars = store.bar_mask()
+    config = store.visualization_config
+    if config and config.focus_actors:
+        bars &= store.actor_mask(config.focus_actors)
+    actors = store.actor_order(bars)
+    # Highlighted (suspicious) actors are grouped at the bottom
+    if config and config.actor_highlights:
+        highlighted = {h.name for h in config.actor_highlights}
+        actors = [a for a in actors if a not in highlighted] + [a for a in actors if a in highlighted]
+    return actors
+
+
+def parse_window_bound(value: str, end: bool = False) -> int:
+    """
+    Day number for a YYYY-MM-DD, YYYY-MM or YYYY query bound. An end bound covers its whole
+    period ("2020" ends on 2020-12-31). Raises ValueError if unparseable.
+    """
+    day, precision = parse_day(value)
+    if day == NO_DAY:
+        raise ValueError(f"Invalid date: {value!r} (expected YYYY-MM-DD, YYYY-MM or YYYY)")
+    if end and precision in (MONTH, YEAR):
+        first = date.fromordinal(day + EPOCH_ORDINAL)
+        if precision == YEAR:
+            following = date(first.year + 1, 1, 1)
+        else:
+            following = date(first.year + first.month // 12, first.month % 12 + 1, 1)
+        day = following.toordinal() - EPOCH_ORDINAL - 1
+    return day
+
+
+class IndexCache:
+    """
+    Per-worker LRU of IntervalIndex by session id.
+
+    Entries carry the session version they were built from (state.get_session_version), and a
+    lookup with another version rebuilds: sessions edited through another worker never serve a
+    stale index. invalidate() only frees this worker's entry early.
+    """
+
+    def __init__(self, max_sessions: int = CACHE_SESSIONS):
+        self.max_sessions = max_sessions
+        self._indexes: "OrderedDict[str, tuple[int, IntervalIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, version: int,
+            load: Callable[[], Optional[EventStore]]) -> Optional[IntervalIndex]:
+        with self._lock:
+            entry = self._indexes.get(session_id)
+            index = entry[1] if entry is not None and entry[0] == version else None
+            if index is not None:
+                self._indexes.move_to_end(session_id)
+        metrics.record_cache("window_index", hit=index is not None)
+        if index is not None:
+            return index
+
+        store = load()
+        if store is None:
+            return None
+        index = IntervalIndex(store)
+        with self._lock:
+            current = self._indexes.get(session_id)
+            if current is None or current[0] <= version:  # A concurrent load may have built a newer one
+                self._indexes[session_id] = (version, index)
+                self._indexes.move_to_end(session_id)
+            while len(self._indexes) > self.max_sessions:
+                self._indexes.popitem(last=False)
+        return index
+
+    def invalidate(self, session_id: str) -> None:
+        with self._lock:
+            self._indexes.pop(session_id, None)
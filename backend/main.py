@@ -1,21 +1,154 @@
-from fastapi import FastAPI, UploadFile, File, Form
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi import FastAPI, UploadFile, File, Form, Header, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse, JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-import json
 import asyncio
 import os
-from typing import AsyncGenerator
-import pdfplumber
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Dict, List, Optional
 from dotenv import load_dotenv
 
-from extractor import EventExtractor
+from extractor import EventExtractor, MAX_DOCUMENT_CHARS
 from visualizer import GanttVisualizer
+from eventstore import EventStore
 from models import ProgressUpdate, TimelineData
+import analytics
+import artifacts
+import assets
+import chartspec
+import compaction
+import intervals
+import ingest
+import merge
+import metrics
+import passages
+import patches
+import previews
+import profiling
+import recording
+import revisions
+import serialization
+import textindex
+from state import create_state_backend
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="Hubble Legal Timeline API")
+# Initialize components (heavy modules - anthropic, plotly, pdfplumber - load on first use)
+ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+# Replay mode serves recorded LLM responses (see recording.py) and needs no key
+EXTRACTION_ENABLED = bool(ANTHROPIC_API_KEY) or recording.LLM_MODE == "replay"
+if not EXTRACTION_ENABLED:
+    # Render-only / cached-only workers run without a key; extraction requests report an error
+    print("[WARNING] ANTHROPIC_API_KEY not set - document extraction is disabled on this worker")
+
+# Threads that run chart rendering/export off the event loop
+RENDER_THREADS = int(os.getenv("HUBBLE_RENDER_THREADS", "2"))
+
+# Upload copy buffer
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+# Documents of one /api/merge request extracted at the same time, and the most one request may upload
+MERGE_CONCURRENCY = int(os.getenv("HUBBLE_MERGE_CONCURRENCY", "4"))
+MAX_MERGE_DOCUMENTS = int(os.getenv("HUBBLE_MERGE_MAX_DOCUMENTS", "500"))
+
+# PNG export needs Chrome (Kaleido); HTML-only deployments and load tests can turn it off
+EXPORT_PNG = os.getenv("HUBBLE_EXPORT_PNG", "1") == "1"
+
+_extractor = None
+_visualizer = None
+_render_pool = None
+
+# Per-process readiness, flipped by the warm-up hook
+readiness = {"ready": False, "error": None}
+
+
+def get_extractor() -> EventExtractor:
+    global _extractor
+    if _extractor is None:
+        if not EXTRACTION_ENABLED:
+            raise ValueError("ANTHROPIC_API_KEY environment variable is required for document extraction")
+        _extractor = EventExtractor(ANTHROPIC_API_KEY)
+    return _extractor
+
+
+def get_visualizer() -> GanttVisualizer:
+    global _visualizer
+    if _visualizer is None:
+        _visualizer = GanttVisualizer(export_png=EXPORT_PNG)
+    return _visualizer
+
+
+def get_render_pool() -> ThreadPoolExecutor:
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ThreadPoolExecutor(max_workers=RENDER_THREADS, thread_name_prefix="render")
+    return _render_pool
+
+
+def warm_up():
+    """
+    Preload renderers and the export pool so the first real request pays no startup cost.
+
+    Runs in a background thread at startup; /ready reports 503 until it finishes.
+    """
+    import plotly.graph_objects as go
+    go.Figure()
+    get_visualizer()
+    assets.ensure_plotly_asset()
+    for filename in assets.missing_assets():  # The Plotly charts do not need them; D3 charts fail
+        print(f"[BACKEND ERROR] {filename} not vendored - D3 charts cannot render until `python assets.py fetch`")
+
+    # Spin up every render thread
+    pool = get_render_pool()
+    for future in [pool.submit(lambda: None) for _ in range(RENDER_THREADS)]:
+        future.result()
+
+    # Persistent headless browser for PNG export (otherwise each export launches Chrome)
+    if EXPORT_PNG:
+        try:
+            import kaleido
+            kaleido.start_sync_server(silence_warnings=True)
+        except Exception as e:
+            print(f"[WARNING] PNG export server not started: {e}")
+
+    if ANTHROPIC_API_KEY and recording.LLM_MODE != "replay":
+        get_extractor().client
+
+    print("[SUCCESS] Warm-up complete")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async def run_warm_up():
+        try:
+            await asyncio.to_thread(warm_up)
+            readiness["ready"] = True
+        except Exception as e:
+            readiness["error"] = str(e)
+            print(f"[BACKEND ERROR] Warm-up failed: {e}")
+
+    app.state.loop_lag_task = asyncio.create_task(metrics.monitor_event_loop_lag())
+
+    if os.getenv("HUBBLE_WARMUP", "1") == "1":
+        app.state.warm_up_task = asyncio.create_task(run_warm_up())
+    else:
+        readiness["ready"] = True
+
+    yield
+
+    app.state.loop_lag_task.cancel()
+    if _render_pool is not None:
+        _render_pool.shutdown(wait=False)
+    try:
+        import kaleido
+        kaleido.stop_sync_server(silence_warnings=True)
+    except Exception:
+        pass
+
+
+app = FastAPI(title="Hubble Legal Timeline API", lifespan=lifespan)
 
 # CORS middleware for React frontend
 app.add_middleware(
@@ -26,157 +159,524 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize components
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-if not ANTHROPIC_API_KEY:
-    raise ValueError("ANTHROPIC_API_KEY environment variable is required")
-
-extractor = EventExtractor(ANTHROPIC_API_KEY)
-visualizer = GanttVisualizer()
-
 # Ensure output directory exists
 os.makedirs("output", exist_ok=True)
 
-# In-memory conversation store (for MVP - use Redis/database in production)
-conversation_store = {}
+# Sessions, job status and artifact metadata - shared by every worker (see state.py)
+state = create_state_backend()
+
+# Interval indexes of stored sessions, built on a worker's first window query (see intervals.py)
+window_indexes = intervals.IndexCache()
+MAX_WINDOW_ROWS = 500
+
+# Open per-document search indexes (see textindex.py)
+text_indexes = textindex.IndexCache()
+MAX_SEARCH_HITS = 100
+
+# Open session channels on this worker: session_id -> {"lock": asyncio.Lock, "sockets": {websocket: view}},
+# a view being what that client was last sent: {"tooltips", "version", "spec"} (see session_channel)
+session_channels: Dict[str, dict] = {}
+
+
+def sse_event(event_type: str, message: str, timer: metrics.RequestTimer, **extra) -> str:
+    """One SSE frame; every frame carries the real elapsed time since the request started"""
+    payload = {"type": event_type, "message": message, "elapsed_ms": timer.elapsed_ms(), **extra}
+    return serialization.sse_frame(payload)
+
+
+async def extract_document(file_path: str, user_request: str, job_id: str,
+                           timer: metrics.RequestTimer, preview: bool = False) -> AsyncGenerator[dict, None]:
+    """
+    Ingest one document and extract its timeline: spool, compaction, passage focus, LLM.
+
+    Yields {"type": "progress"|"thinking", "message": ..., "data": {...}?} as stages finish
+    (with preview=True also throttled "preview" updates of the events extracted so far, see
+    previews.py; not for revisions, whose model output is only the changed pages) and
+    ends with {"type": "timeline", "timeline": TimelineData, "ingestion": {...}, "text_index": name or None,
+    "fingerprints": dict or None} (the document's search index in textindex.INDEX_DIR, and its
+    revisions.py fingerprints). A revision of a known document only sends its changed pages to the
+    model (ingestion["revision"]). Raises on failure.
+    """
+    extractor = get_extractor()
+    spool = None
+    try:
+        # Step 2: Extracting text
+        yield {"type": "thinking", "message": "Extracting text from document..."}
+        with timer.stage("pdf_extraction"):
+            # Off the event loop, one page at a time into an on-disk spool (flat memory for any page count)
+            spool = await asyncio.to_thread(ingest.spool_document, file_path, f"output/spool_{job_id}.txt")
+        ingestion = ingest.summarize_pages(spool.pages)
+        await asyncio.to_thread(state.update_job, job_id, "running", stage="pdf_extraction", ingestion=ingestion,
+                                pages=spool.pages)
+        word_count = spool.word_count
+        engines = ", ".join(f"{name}: {count}" for name, count in ingestion["engines"].items())
+        yield {"type": "progress", "message": f"✓ Extracted {word_count:,} words from {ingestion['page_count']} pages "
+               f"({engines})", "data": {"ingestion": ingestion}}
+
+        # Page-level full-text index for search and event provenance (raw pages, so offsets match them)
+        index_name = None
+        if textindex.INDEX_ENABLED:
+            with timer.stage("text_index"):
+                index_stats = await asyncio.to_thread(textindex.build_index, spool.iter_pages(),
+                                                      textindex.index_path(job_id))
+            index_name = job_id
+            ingestion["text_index"] = index_stats
+            yield {"type": "progress", "message": f"✓ Indexed {index_stats['terms']:,} terms on "
+                   f"{index_stats['pages']} pages for search", "data": {"text_index": index_stats}}
+
+        # A revision of a known document: only its changed pages go to the model (see revisions.py)
+        fingerprints = revision = carried = None
+        if revisions.REVISIONS_ENABLED:
+            with timer.stage("fingerprint"):
+                fingerprints = await asyncio.to_thread(revisions.fingerprint_pages, spool.iter_pages)
+                revision = await asyncio.to_thread(revisions.find_revision, state, fingerprints,
+                                                     user_request)
+            metrics.record_cache("revision", hit=revision is not None)
+
+        if revision is not None:
+            previous = serialization.load_timeline(await asyncio.to_thread(state.get_session, revision["session_id"]))
+            previous_sources = textindex.load_sources(revision["session_id"])
+            carried, dropped = revisions.carry_over(previous, previous_sources["events"] if previous_sources else None,
+                                                    revision["removed"])
+            ingestion["revision"] = {**revisions.revision_stats(revision), "events_carried": len(carried.events),
+                                     "events_dropped": dropped}
+            yield {"type": "progress", "message": f"♻ Revision of {revision['name']}: {revision['shared']:.0%} of the "
+                   f"text unchanged, {len(revision['changed_pages'])} of {revision['pages']} pages to re-extract, "
+                   f"{len(carried.events)} events carried over", "data": {"revision": ingestion["revision"]}}
+            text, focused = "", True
+            if revision["changed_pages"]:
+                text, changed_stats = await asyncio.to_thread(
+                    revisions.changed_text, spool.iter_pages, revision["changed_pages"], MAX_DOCUMENT_CHARS
+                )
+                ingestion["revision"].update(changed_stats)
+        else:
+            # Strip repeated headers/footers, rules and whitespace so more content fits the prompt budget
+            if compaction.COMPACTION_ENABLED:
+                with timer.stage("compaction"):
+                    text, compaction_stats = await asyncio.to_thread(
+                        compaction.compact_pages, spool.iter_pages, MAX_DOCUMENT_CHARS
+                    )
+                ingestion["compaction"] = compaction_stats
+                saved = compaction_stats["tokens_before"] - compaction_stats["tokens_after"]
+                yield {"type": "progress", "message": f"✓ Removed {compaction_stats['lines_removed']:,} boilerplate lines "
+                       f"(~{saved:,} tokens)", "data": {"compaction": compaction_stats}}
+            else:
+                text = spool.read(MAX_DOCUMENT_CHARS)
+
+            # Over budget: send the ranked date-bearing passages (with page refs) instead of a blind prefix
+            focused = False
+            document_chars = compaction_stats["chars_after"] if compaction.COMPACTION_ENABLED else spool.char_count
+            if passages.should_focus(document_chars, MAX_DOCUMENT_CHARS):
+                page_source = (lambda: compaction.clean_pages(spool.iter_pages)) if compaction.COMPACTION_ENABLED \
+                    else spool.iter_pages
+                with timer.stage("passage_index"):
+                    focused_text, focus_stats = await asyncio.to_thread(
+                        passages.focused_text, page_source, MAX_DOCUMENT_CHARS, user_request
+                    )
+                if focus_stats["passages_sent"]:
+                    text, focused = focused_text, True
+                    ingestion["focus"] = focus_stats
+                    yield {"type": "progress", "message": f"✓ Focused on {focus_stats['passages_sent']} of "
+                           f"{focus_stats['passages_indexed']} dated passages from {len(focus_stats['pages_sent'])} pages",
+                           "data": {"focus": focus_stats}}
+
+        # Step 3: AI analysis with TRUE live streaming (nothing to analyze for an unchanged revision)
+        timeline_data = None
+        if text or revision is None:
+            yield {"type": "thinking", "message": "🧠 Claude AI is analyzing the document..."}
+
+            # Call Claude API with TRUE streaming - get chunks as they happen
+            await asyncio.to_thread(state.update_job, job_id, "running", stage="llm")
+            builder = previews.PreviewBuilder() if preview and revision is None and previews.PREVIEW_SECONDS > 0 else None
+            async for chunk in extractor.extract_events(text, user_request, timer=timer, focused=focused,
+                                                        preview=builder):
+                if chunk["type"] == "thinking":
+                    # Stream thinking line by line AS IT HAPPENS (no fake delays)
+                    yield {"type": "thinking", "message": f"💭 {chunk['content']}"}
+                    await asyncio.sleep(0)  # Yield control to event loop
+                elif chunk["type"] == "preview":
+                    update = chunk["content"]
+                    yield {"type": "preview", "message": f"👀 Preview: {update['events']} events so far",
+                           "data": {"preview": update}}
+                elif chunk["type"] == "complete":
+                    # Got final data
+                    timeline_data = chunk["data"]
+
+            if not timeline_data:
+                raise ValueError("No timeline data received from Claude")
+
+        if revision is not None:
+            with timer.stage("merge"):
+                timeline_data, merge_stats = revisions.apply_revision(carried, timeline_data, revision)
+            ingestion["revision"]["merge"] = merge_stats
+        yield {"type": "timeline", "timeline": timeline_data, "ingestion": ingestion, "text_index": index_name,
+               "fingerprints": fingerprints}
+
+    finally:
+        if spool is not None:
+            spool.close()
+
+
+async def save_event_sources(session_id: str, timeline_data: TimelineData, documents: List[dict],
+                             timer: metrics.RequestTimer) -> Optional[dict]:
+    """
+    Link a session's events to their best source passages and save them with the session's
+    document list ({"name", "index"}); None when no document has a search index.
+    """
+    paths = [textindex.index_path(d["index"]) if d["index"] else None for d in documents]
+    if not any(paths):
+        return None
+    with timer.stage("provenance"):
+        links = await asyncio.to_thread(textindex.link_documents, paths, timeline_data.events)
+        await asyncio.to_thread(textindex.save_sources, session_id, documents, links)
+    return {"events": len(links), "events_linked": sum(1 for sources in links if sources)}
+
+
+async def render_chart(timeline_data: TimelineData, job_id: str, timer: metrics.RequestTimer):
+    """Render and publish a timeline's chart; returns (chart_url, download_url or None)"""
+    # Generate color map (palette plus the user's role color overrides)
+    color_map = chartspec.color_map(timeline_data)
+
+    # Generate chart - Plotly returns tuple (html_path, png_path)
+    html_path, png_path = await asyncio.get_running_loop().run_in_executor(
+        get_render_pool(), get_visualizer().generate_gantt,
+        timeline_data, color_map, f"output/timeline_{job_id}.png", timer
+    )
 
+    # Content-hash the artifacts (immutable URLs) and precompress the HTML once
+    html_name = artifacts.publish(html_path)
+    png_name = artifacts.publish(png_path) if png_path else None
+    for name, kind in ((html_name, "chart_html"), (png_name, "chart_png")):
+        if name:
+            await asyncio.to_thread(state.put_artifact, name,
+                                    {"job_id": job_id, "kind": kind, "size": os.path.getsize(f"output/{name}")})
 
-def extract_text_from_pdf(file_path: str) -> str:
-    """Extract text from PDF using pdfplumber"""
-    text = ""
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text() + "\n"
-    return text
+    # Set URLs for viewing and downloading (no download URL when PNG export is off)
+    return f"/output/{html_name}", (f"/output/{png_name}" if png_name else None)
 
 
-async def process_document(file_path: str, user_request: str = None) -> AsyncGenerator[str, None]:
+async def process_document(file_path: str, user_request: str = None, job_id: str = None,
+                           timer: metrics.RequestTimer = None, profile: bool = False,
+                           document_name: str = None) -> AsyncGenerator[str, None]:
     """
     Process document with real-time progress updates via Server-Sent Events.
 
+    The job ID doubles as the session ID and namespaces every file the job writes,
+    so concurrent jobs on different workers never overwrite each other's output.
+
     Yields JSON progress updates in format:
-    {"type": "progress"|"thinking"|"complete"|"error", "message": "...", "data": {...}}
+    {"type": "progress"|"thinking"|"preview"|"complete"|"error", "message": "...", "elapsed_ms": 123.4, "data": {...}}
+
+    "preview" frames (data.preview, see previews.py) add the events extracted so far to a
+    provisional chart while the model is still writing; the complete payload's chart replaces it.
+    Events are sent as soon as each stage finishes - any pacing for readability is up to
+    the client. The complete payload carries a per-stage timing breakdown, plus profile
+    links when profile=True (admin only, see profiling.py).
     """
 
+    job_id = job_id or uuid.uuid4().hex
+    timer = timer or metrics.RequestTimer()
+    await asyncio.to_thread(state.update_job, job_id, "running", stage="upload")
+    metrics.JOBS_IN_FLIGHT.inc()
+    profiler = profiling.RequestProfiler.try_start(job_id, timer) if profile else None
+
+    async def finish_profile() -> dict:
+        nonlocal profiler
+        if profiler is None:
+            return {}
+        links, profiler = profiler.finish(), None
+        for url in links.values():
+            name = url.rsplit("/", 1)[-1]
+            await asyncio.to_thread(state.put_artifact, name, {"job_id": job_id, "kind": "profile",
+                                                               "size": os.path.getsize(f"output/{name}")})
+        return links
+
     try:
         # Step 1: Document loaded
-        yield f"data: {json.dumps({'type': 'progress', 'message': '📄 Document loaded successfully'})}\n\n"
-        await asyncio.sleep(0.5)
-
-        # Step 2: Extracting text
-        yield f"data: {json.dumps({'type': 'thinking', 'message': 'Extracting text from document...'})}\n\n"
-        text = extract_text_from_pdf(file_path)
-        word_count = len(text.split())
-        yield f"data: {json.dumps({'type': 'progress', 'message': f'✓ Extracted {word_count:,} words from document'})}\n\n"
-        await asyncio.sleep(0.5)
-
-        # Step 3: AI analysis with TRUE live streaming
-        yield f"data: {json.dumps({'type': 'thinking', 'message': '🧠 Claude AI is analyzing the document...'})}\n\n"
-        await asyncio.sleep(0.5)
-
-        # Call Claude API with TRUE streaming - get chunks as they happen
-        timeline_data = None
-        async for chunk in extractor.extract_events(text, user_request):
-            if chunk["type"] == "thinking":
-                # Stream thinking line by line AS IT HAPPENS (no fake delays)
-                thinking_msg = f"💭 {chunk['content']}"
-                yield f"data: {json.dumps({'type': 'thinking', 'message': thinking_msg})}\n\n"
-                await asyncio.sleep(0)  # Yield control to event loop
-            elif chunk["type"] == "complete":
-                # Got final data
-                timeline_data = chunk["data"]
-
-        if not timeline_data:
-            raise ValueError("No timeline data received from Claude")
+        yield sse_event("progress", "📄 Document loaded successfully", timer)
+
+        # Steps 2-3: text extraction and AI analysis
+        timeline_data = ingestion = index_name = fingerprints = None
+        async for update in extract_document(file_path, user_request, job_id, timer, preview=True):
+            if update["type"] == "timeline":
+                timeline_data, ingestion, index_name = update["timeline"], update["ingestion"], update["text_index"]
+                fingerprints = update["fingerprints"]
+            else:
+                yield sse_event(update["type"], update["message"], timer,
+                                **({"data": update["data"]} if "data" in update else {}))
 
         event_count = len(timeline_data.events)
         actor_count = len(set(e.actor for e in timeline_data.events))
         milestone_count = sum(1 for e in timeline_data.events if e.milestone)
 
-        yield f"data: {json.dumps({'type': 'progress', 'message': f'✓ Extracted {event_count} events involving {actor_count} actors'})}\n\n"
-        yield f"data: {json.dumps({'type': 'progress', 'message': f'✓ Identified {milestone_count} key milestones'})}\n\n"
-        await asyncio.sleep(0.5)
+        yield sse_event("progress", f"✓ Extracted {event_count} events involving {actor_count} actors", timer)
+        yield sse_event("progress", f"✓ Identified {milestone_count} key milestones", timer)
 
-        # Step 4: Generate visualization
-        yield f"data: {json.dumps({'type': 'thinking', 'message': '📊 Generating Gantt chart visualization...'})}\n\n"
-        await asyncio.sleep(1)
-
-        yield f"data: {json.dumps({'type': 'thinking', 'message': '🎨 Applying color palette based on role types...'})}\n\n"
+        # Source passages per event, for jumping from a bar to its page
+        session_id = job_id
+        document = {"name": document_name or os.path.basename(file_path), "index": index_name}
+        sources = await save_event_sources(session_id, timeline_data, [document], timer)
+        if sources:
+            yield sse_event("progress", f"✓ Linked {sources['events_linked']} of {sources['events']} events "
+                            f"to source passages", timer, data={"sources": sources})
 
-        # Generate color map
-        color_map = extractor.generate_color_palette(timeline_data.events)
-
-        # Generate chart - Plotly returns tuple (html_path, png_path)
-        html_path, png_path = visualizer.generate_gantt(timeline_data, color_map, "output/timeline.png")
+        # Step 4: Generate visualization
+        await asyncio.to_thread(state.update_job, job_id, "running", stage="render")
+        yield sse_event("thinking", "📊 Generating Gantt chart visualization...", timer)
+        yield sse_event("thinking", "🎨 Applying color palette based on role types...", timer)
 
-        # Set URLs for viewing and downloading
-        chart_url = "/output/timeline.html"
-        download_url = "/output/timeline.png"
+        chart_url, download_url = await render_chart(timeline_data, job_id, timer)
 
-        yield f"data: {json.dumps({'type': 'progress', 'message': '✓ Visualization complete'})}\n\n"
-        await asyncio.sleep(0.5)
+        yield sse_event("progress", "✓ Visualization complete", timer)
 
         # Step 5: Complete - include TimelineData for regeneration
-        # Generate session ID based on file name
-        import hashlib
-        session_id = hashlib.md5(file_path.encode()).hexdigest()
-
-        # Store TimelineData for regeneration
-        conversation_store[session_id] = timeline_data.dict()
+        # Store TimelineData for regeneration (visible to every worker)
+        await asyncio.to_thread(state.save_session, session_id, timeline_data.model_dump_json())
+        window_indexes.invalidate(session_id)
+        if fingerprints is not None:
+            # Later versions of this document only re-extract what changed
+            record = revisions.fingerprint_record(fingerprints, session_id, document["name"], user_request)
+            await asyncio.to_thread(state.save_fingerprints, job_id, revisions.chunk_hashes(fingerprints), record)
 
         result_data = {
             "chart_url": chart_url,  # HTML for viewing (fully static)
             "download_url": download_url,  # PNG for downloading
-            "case": timeline_data.case.dict(),
+            "case": timeline_data.case.model_dump(),
             "event_count": event_count,
             "actor_count": actor_count,
             "milestone_count": milestone_count,
-            "session_id": session_id  # Return session ID for regeneration
+            "session_id": session_id,  # Return session ID for regeneration
+            "ingestion": ingestion,  # Text engine per page (PDFium, pdfplumber fallbacks)
+            "revision": ingestion.get("revision"),  # Previous version reused (None for a new document)
+            "sources": sources,  # Events linked to source passages (None without a search index)
+            "timing": timer.breakdown(),  # Real per-stage durations for this request
+            **(await finish_profile())  # profile_url / profile_stacks_url when profiling was requested
         }
 
-        yield f"data: {json.dumps({'type': 'complete', 'message': '✅ Analysis complete! Your timeline is ready.', 'data': result_data})}\n\n"
+        await asyncio.to_thread(state.update_job, job_id, "complete", stage="done", result=result_data)
+        metrics.JOBS_TOTAL.inc(outcome="complete")
+        yield sse_event("complete", "✅ Analysis complete! Your timeline is ready.", timer, data=result_data)
 
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
         print(f"[BACKEND ERROR] {error_details}")
         error_msg = f"Error during processing: {str(e)}"
-        yield f"data: {json.dumps({'type': 'error', 'message': error_msg})}\n\n"
+        await asyncio.to_thread(state.update_job, job_id, "error", error=error_msg)
+        metrics.JOBS_TOTAL.inc(outcome="error")
+        yield sse_event("error", error_msg, timer, data={"timing": timer.breakdown(), **(await finish_profile())})
+
+    finally:
+        await finish_profile()
+        metrics.JOBS_IN_FLIGHT.dec()
+
+
+async def save_upload(file: UploadFile, prefix: str) -> str:
+    """Save an uploaded file temporarily (basename only - never trust client paths); returns its path"""
+    temp_path = f"output/temp_{prefix}_{os.path.basename(file.filename or 'upload.pdf')}"
+    # Copy in chunks - large productions never sit in memory as one bytes object
+    with open(temp_path, "wb") as f:
+        while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+            f.write(chunk)
+    return temp_path
 
 
 @app.post("/api/process")
 async def process_upload(
     file: UploadFile = File(...),
-    request: str = Form(None)
+    request: str = Form(None),
+    profile: bool = Form(False),
+    x_admin_token: str = Header(None)
 ):
     """
     Accept document upload and return streaming progress updates.
 
     Query params:
     - request: Optional user request like "analyze executives" or "show regulatory timeline"
+    - profile: Admin only (X-Admin-Token header) - CPU/memory profile linked from the complete event
     """
+    if profile and not profiling.is_admin(x_admin_token):
+        return JSONResponse({"error": "Profiling requires a valid X-Admin-Token"}, status_code=403)
 
-    # Save uploaded file temporarily
-    temp_path = f"output/temp_{file.filename}"
+    job_id = uuid.uuid4().hex
+    timer = metrics.RequestTimer()
+    with timer.stage("upload"):
+        temp_path = await save_upload(file, job_id)
+    document_name = os.path.basename(file.filename or "upload.pdf")
 
-    with open(temp_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    # Return streaming response (headers go out before the body, so only upload is known here)
+    return StreamingResponse(
+        process_document(temp_path, request, job_id, timer, profile, document_name),
+        media_type="text/event-stream",
+        headers={"Server-Timing": timer.server_timing()}
+    )
+
+
+async def process_matter(file_paths: List[str], names: List[str], user_request: str = None,
+                         matter_name: str = None, job_id: str = None,
+                         timer: metrics.RequestTimer = None) -> AsyncGenerator[str, None]:
+    """
+    Extract several documents of one matter concurrently and merge them into one chart (see merge.py).
+
+    At most MERGE_CONCURRENCY documents are extracted at once; each document's progress lines are
+    streamed as they happen, prefixed with its position ("[3/120] deposition.pdf: ..."). Thinking
+    lines are not forwarded - with hundreds of documents they would drown the stream. A document
+    that fails is reported and left out; the merge needs at least one timeline.
+    Stage timings add up across documents, so extraction stages can exceed the wall time.
+    """
+    job_id = job_id or uuid.uuid4().hex
+    timer = timer or metrics.RequestTimer()
+    total = len(file_paths)
+    await asyncio.to_thread(state.update_job, job_id, "running", stage="extract", documents=total)
+    metrics.JOBS_IN_FLIGHT.inc()
+
+    timelines: List[Optional[TimelineData]] = [None] * total
+    indexes: List[Optional[str]] = [None] * total
+    documents = [{"name": name, "status": "pending"} for name in names]
+    frames: asyncio.Queue = asyncio.Queue()
+    semaphore = asyncio.Semaphore(MERGE_CONCURRENCY)
+
+    async def extract_one(i: int):
+        label = f"[{i + 1}/{total}] {names[i]}"
+        try:
+            async with semaphore:
+                async for update in extract_document(file_paths[i], user_request, f"{job_id}_{i}", timer):
+                    if update["type"] == "timeline":
+                        timelines[i], indexes[i] = update["timeline"], update["text_index"]
+                        documents[i].update(status="complete", event_count=len(timelines[i].events),
+                                            ingestion=update["ingestion"])
+                    elif update["type"] == "progress":
+                        await frames.put(sse_event("progress", f"{label}: {update['message']}", timer))
+            await frames.put(sse_event("progress", f"✓ {label}: {documents[i]['event_count']} events", timer,
+                                       data={"document": i, "name": names[i]}))
+        except Exception as e:
+            print(f"[WARNING] Merge {job_id}: {names[i]} failed: {e}")
+            documents[i].update(status="error", error=str(e))
+            await frames.put(sse_event("progress", f"⚠ {label}: {e}", timer,
+                                       data={"document": i, "name": names[i], "error": str(e)}))
+        finally:
+            await frames.put(None)
+
+    tasks = []
+    try:
+        yield sse_event("progress", f"📄 {total} documents loaded - extracting {min(total, MERGE_CONCURRENCY)} "
+                        f"at a time", timer)
+        tasks = [asyncio.create_task(extract_one(i)) for i in range(total)]
+        finished = 0
+        while finished < total:
+            frame = await frames.get()
+            if frame is None:
+                finished += 1
+            else:
+                yield frame
+
+        extracted = [t for t in timelines if t is not None]
+        if not extracted:
+            raise ValueError("No document produced a timeline")
+
+        await asyncio.to_thread(state.update_job, job_id, "running", stage="merge")
+        yield sse_event("thinking", "🔗 Resolving actors across documents...", timer)
+        with timer.stage("merge"):
+            timeline_data, merge_stats = await asyncio.to_thread(merge.merge_timelines, extracted, matter_name)
+        yield sse_event("progress", f"✓ Merged {len(extracted)} timelines: {merge_stats['actor_labels']} actor names "
+                        f"→ {merge_stats['actors']} actors, {merge_stats['duplicates_removed']} duplicate events "
+                        f"removed", timer, data={"merge": merge_stats})
+
+        event_count = len(timeline_data.events)
+        actor_count = len(set(e.actor for e in timeline_data.events))
+        milestone_count = sum(1 for e in timeline_data.events if e.milestone)
+
+        session_id = job_id
+        sources = await save_event_sources(
+            session_id, timeline_data, [{"name": n, "index": x} for n, x in zip(names, indexes)], timer
+        )
+        if sources:
+            yield sse_event("progress", f"✓ Linked {sources['events_linked']} of {sources['events']} events "
+                            f"to source passages", timer, data={"sources": sources})
+
+        await asyncio.to_thread(state.update_job, job_id, "running", stage="render")
+        yield sse_event("thinking", "📊 Generating combined Gantt chart...", timer)
+        chart_url, download_url = await render_chart(timeline_data, job_id, timer)
+        yield sse_event("progress", "✓ Visualization complete", timer)
+
+        await asyncio.to_thread(state.save_session, session_id, timeline_data.model_dump_json())
+        window_indexes.invalidate(session_id)
+
+        result_data = {
+            "chart_url": chart_url,
+            "download_url": download_url,
+            "case": timeline_data.case.model_dump(),
+            "event_count": event_count,
+            "actor_count": actor_count,
+            "milestone_count": milestone_count,
+            "session_id": session_id,
+            "documents": documents,  # Per document: status, event_count, ingestion or error
+            "merge": merge_stats,  # Actor resolution and de-duplication counts, actor_aliases
+            "sources": sources,
+            "timing": timer.breakdown(),
+        }
+
+        await asyncio.to_thread(state.update_job, job_id, "complete", stage="done", result=result_data)
+        metrics.JOBS_TOTAL.inc(outcome="complete")
+        yield sse_event("complete", f"✅ Combined timeline of {len(extracted)} documents is ready.", timer,
+                        data=result_data)
+
+    except Exception as e:
+        import traceback
+        error_details = traceback.format_exc()
+        print(f"[BACKEND ERROR] {error_details}")
+        error_msg = f"Error during merge: {str(e)}"
+        await asyncio.to_thread(state.update_job, job_id, "error", error=error_msg)
+        metrics.JOBS_TOTAL.inc(outcome="error")
+        yield sse_event("error", error_msg, timer, data={"documents": documents, "timing": timer.breakdown()})
+
+    finally:
+        # A client that disconnects mid-stream stops the remaining extractions
+        for task in tasks:
+            task.cancel()
+        metrics.JOBS_IN_FLIGHT.dec()
+
+
+@app.post("/api/merge")
+async def merge_upload(
+    files: List[UploadFile] = File(...),
+    request: str = Form(None),
+    matter: str = Form(None)
+):
+    """
+    Accept several documents of one matter and stream progress while building one combined timeline.
+
+    Form fields:
+    - files: The documents (complaint, depositions, orders, ...) - up to HUBBLE_MERGE_MAX_DOCUMENTS
+    - request: Optional user request, applied to every document
+    - matter: Optional case name for the combined chart (default: the first document's case name)
+    """
+    if len(files) > MAX_MERGE_DOCUMENTS:
+        return JSONResponse({"error": f"At most {MAX_MERGE_DOCUMENTS} documents per merge"}, status_code=400)
+
+    job_id = uuid.uuid4().hex
+    timer = metrics.RequestTimer()
+    with timer.stage("upload"):
+        paths = [await save_upload(file, f"{job_id}_{i}") for i, file in enumerate(files)]
+    names = [os.path.basename(file.filename or f"document_{i + 1}") for i, file in enumerate(files)]
 
-    # Return streaming response
     return StreamingResponse(
-        process_document(temp_path, request),
-        media_type="text/event-stream"
+        process_matter(paths, names, request, matter, job_id, timer),
+        media_type="text/event-stream",
+        headers={"Server-Timing": timer.server_timing()}
     )
 
 
 @app.get("/output/{filename}")
-async def serve_output(filename: str):
-    """Serve generated chart images"""
-    file_path = f"output/{filename}"
-    if os.path.exists(file_path):
-        return FileResponse(file_path)
-    return {"error": "File not found"}
+async def serve_output(filename: str, request: Request):
+    """Serve generated chart images with ETag/304 handling and precompressed variants"""
+    return artifacts.artifact_response(request, filename)
+
+
+@app.get("/assets/{filename}")
+async def serve_asset(filename: str, request: Request):
+    """Serve shared, versioned chart libraries (plotly.js, d3, html2canvas)"""
+    return assets.asset_response(request, filename)
 
 
 @app.post("/api/regenerate")
@@ -193,13 +693,11 @@ async def regenerate_timeline(
     - "Move legend to right side"
     - "Add animation"
     """
-    # Retrieve stored TimelineData
-    if session_id not in conversation_store:
+    # Retrieve stored TimelineData (may have been created by another worker)
+    timeline_data = serialization.load_timeline(await asyncio.to_thread(state.get_session, session_id))
+    if timeline_data is None:
         return {"error": "Session not found. Please upload a document first."}
 
-    timeline_data_dict = conversation_store[session_id]
-    timeline_data = TimelineData(**timeline_data_dict)
-
     # TODO: Use Claude to interpret modification and update VisualizationConfig
     # For now, return a simple message
     return {
@@ -209,11 +707,307 @@ async def regenerate_timeline(
     }
 
 
+def session_index(session_id: str) -> Optional[intervals.IntervalIndex]:
+    """
+    IntervalIndex of a stored session's current version (rebuilt when any worker saved a newer
+    one), None if it does not exist
+    """
+    stored = state.get_session_version(session_id)
+    if stored is None:
+        return None
+    return window_indexes.get(session_id, stored[1],
+                              lambda: EventStore.from_timeline(serialization.load_timeline(stored[0])))
+
+
+@app.get("/api/sessions/{session_id}/window")
+async def session_window(session_id: str, start: str, end: str, row_offset: int = 0, row_limit: int = 50):
+    """
+    Events overlapping [start, end] (YYYY-MM-DD, YYYY-MM or YYYY), grouped by chart row (actor)
+    and paginated by row, plus the milestones in the window. Pass next_row_offset back as
+    row_offset for the next page.
+    """
+    try:
+        start_day = intervals.parse_window_bound(start)
+        end_day = intervals.parse_window_bound(end, end=True)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    if start_day > end_day:
+        return JSONResponse({"error": "start must not be after end"}, status_code=400)
+    if row_offset < 0 or not 1 <= row_limit <= MAX_WINDOW_ROWS:
+        return JSONResponse({"error": f"row_offset must be >= 0 and row_limit 1-{MAX_WINDOW_ROWS}"}, status_code=400)
+
+    # Building the index parses the whole session - keep it off the event loop
+    index = await asyncio.to_thread(session_index, session_id)
+    if index is None:
+        return {"error": "Session not found. Please upload a document first."}
+    return {"session_id": session_id, "window": {"start": start, "end": end},
+            **index.window(start_day, end_day, row_offset, row_limit)}
+
+
+@app.get("/api/sessions/{session_id}/analytics")
+async def session_analytics(
+    session_id: str,
+    succession_days: int = analytics.SUCCESSION_DAYS,
+    cluster_days: int = analytics.CLUSTER_DAYS,
+    min_gap_days: int = analytics.MIN_GAP_DAYS
+):
+    """Overlapping tenures, vacancies, same-role successions and milestone clusters (see analytics.py)"""
+    if not all(0 <= days <= 3650 for days in (succession_days, cluster_days, min_gap_days)):
+        return JSONResponse({"error": "Day parameters must be between 0 and 3650"}, status_code=400)
+
+    # Reuses the session's cached EventStore (shared with the window index)
+    index = await asyncio.to_thread(session_index, session_id)
+    if index is None:
+        return {"error": "Session not found. Please upload a document first."}
+    result = await asyncio.to_thread(analytics.analyze, index.store, succession_days, cluster_days, min_gap_days)
+    return {"session_id": session_id, **result}
+
+
+@app.get("/api/sessions/{session_id}/chart")
+async def session_chart(session_id: str, request: Request, tooltips: bool = True):
+    """
+    The session's chart as a compact JSON spec for client-side rendering (see chartspec.py):
+    rows, bars with colors and duration labels, milestones, legend, highlights and footer.
+    ETag / If-None-Match aware and compressed per Accept-Encoding; tooltips=false leaves out
+    action, target and context text.
+    """
+    session_data = await asyncio.to_thread(state.get_session, session_id)
+    if session_data is None:
+        return {"error": "Session not found. Please upload a document first."}
+
+    def build() -> bytes:
+        timeline_data = serialization.load_timeline(session_data)
+        return serialization.dumps(chartspec.build_spec(timeline_data, chartspec.color_map(timeline_data),
+                                                        tooltips)).encode("utf-8")
+
+    try:
+        return await asyncio.to_thread(artifacts.payload_response, request,
+                                       chartspec.spec_digest(session_data, tooltips), build)
+    except ValueError as e:  # Nothing to draw (no dated bars)
+        return JSONResponse({"error": str(e)}, status_code=422)
+
+
+def chart_spec(timeline_data: TimelineData, tooltips: bool) -> dict:
+    return chartspec.build_spec(timeline_data, chartspec.color_map(timeline_data), tooltips)
+
+
+def edit_session(session_id: str, commands: list):
+    """
+    Apply chart commands to a stored session under its lock (shared by every worker) and save it.
+    Returns (timeline, version, spec with tooltips); KeyError if the session is gone, ValueError
+    for invalid commands or an edit that leaves nothing to draw (then nothing is saved). Edited
+    events get new source passages (textindex.relink_sources).
+    """
+    with state.lock(f"session_{session_id}"):
+        stored = state.get_session_version(session_id)
+        if stored is None:
+            raise KeyError(session_id)
+        previous = serialization.load_timeline(stored[0])
+        timeline_data = chartspec.apply_commands(previous, commands)
+        spec = chart_spec(timeline_data, True)  # Raises before saving when there is nothing to draw
+        version = state.save_session(session_id, timeline_data.model_dump_json())
+        # update_event may change what an event's source passages were found by (actor, dates, text)
+        edited = {i: event for i, (old, event) in enumerate(zip(previous.events, timeline_data.events))
+                  if old != event}
+        if edited:
+            textindex.relink_sources(session_id, edited)
+    window_indexes.invalidate(session_id)
+    return timeline_data, version, spec
+
+
+def view_patch(view: dict, timeline_data: TimelineData, version: int, specs: Dict[bool, dict]) -> dict:
+    """Patch message taking a client's view to version (updates the view)"""
+    if view["tooltips"] not in specs:
+        specs[view["tooltips"]] = chart_spec(timeline_data, view["tooltips"])
+    spec = specs[view["tooltips"]]
+    message = {"type": "patch", "base_version": view["version"], "version": version,
+               "patch": patches.diff(view["spec"], spec)}
+    view.update(version=version, spec=spec)
+    return message
+
+
+async def send_json(websocket: WebSocket, message: dict):
+    await websocket.send_text(serialization.dumps(message))
+
+
+@app.websocket("/api/sessions/{session_id}/ws")
+async def session_channel(websocket: WebSocket, session_id: str, tooltips: bool = True):
+    """
+    Persistent chart editing channel for one session. The server sends the chart spec once
+    ({"type": "snapshot", "version", "spec"}), then only JSON Patch diffs against the spec it
+    last sent this client:
+
+    - client {"type": "command", "id", "base_version", "commands": [...]} (see
+      chartspec.apply_commands): the edit is saved and every client of the session on this
+      worker gets {"type": "patch", "base_version", "version", "patch": [...]} (the sender's
+      carries its "id"). A patch applies only to base_version; when the session was edited
+      elsewhere in between, the patch covers both edits.
+    - client {"type": "sync", "version"}: a patch to the stored version if it changed elsewhere
+      (another worker), else {"type": "synced", "version"}
+    - a base_version / version other than the last one sent (the client drifted): the whole
+      spec again, {"type": "resync", "version", "spec"}
+    - errors: {"type": "error", "id"?, "message"}; the session is left unchanged
+    """
+    await websocket.accept()
+    stored = await asyncio.to_thread(state.get_session_version, session_id)
+    if stored is None:
+        await send_json(websocket, {"type": "error", "message": "Session not found. Please upload a document first."})
+        await websocket.close(code=4404)
+        return
+    try:
+        spec = await asyncio.to_thread(chart_spec, serialization.load_timeline(stored[0]), tooltips)
+    except ValueError as e:  # Nothing to draw (no dated bars)
+        await send_json(websocket, {"type": "error", "message": str(e)})
+        await websocket.close(code=4422)
+        return
+
+    channel = session_channels.setdefault(session_id, {"lock": asyncio.Lock(), "sockets": {}})
+    view = {"tooltips": tooltips, "version": stored[1], "spec": spec}
+    channel["sockets"][websocket] = view
+    await send_json(websocket, {"type": "snapshot", "version": stored[1], "spec": spec})
+    try:
+        while True:
+            try:
+                message = serialization.loads(await websocket.receive_text())
+            except ValueError:
+                await send_json(websocket, {"type": "error", "message": "Messages must be JSON"})
+                continue
+            if not isinstance(message, dict):
+                await send_json(websocket, {"type": "error", "message": "Messages must be JSON objects"})
+                continue
+            command_id = message.get("id")
+
+            async with channel["lock"]:  # One edit at a time per session on this worker: patches stay in order
+                if message.get("type") not in ("command", "sync"):
+                    await send_json(websocket, {"type": "error", "id": command_id,
+                                                "message": "type must be \"command\" or \"sync\""})
+                    continue
+                client_version = message.get("base_version" if message["type"] == "command" else "version",
+                                             view["version"])
+                stored = await asyncio.to_thread(state.get_session_version, session_id)
+                if stored is None:
+                    await send_json(websocket, {"type": "error", "id": command_id, "message": "Session not found."})
+                    continue
+                if client_version != view["version"]:  # The client lost track of what it was sent
+                    timeline_data = serialization.load_timeline(stored[0])
+                    view.update(version=stored[1], spec=await asyncio.to_thread(chart_spec, timeline_data, tooltips))
+                    await send_json(websocket, {"type": "resync", "id": command_id, "version": stored[1],
+                                                "spec": view["spec"]})
+                    continue
+                if message["type"] == "sync":
+                    if stored[1] == view["version"]:
+                        await send_json(websocket, {"type": "synced", "version": view["version"]})
+                    else:
+                        timeline_data = serialization.load_timeline(stored[0])
+                        await send_json(websocket, await asyncio.to_thread(view_patch, view, timeline_data,
+                                                                           stored[1], {}))
+                    continue
+
+                try:
+                    timeline_data, version, spec = await asyncio.to_thread(
+                        edit_session, session_id, message.get("commands"))
+                except KeyError:
+                    await send_json(websocket, {"type": "error", "id": command_id, "message": "Session not found."})
+                    continue
+                except ValueError as e:
+                    await send_json(websocket, {"type": "error", "id": command_id, "message": str(e)})
+                    continue
+
+                specs = {True: spec}
+                for client, client_view in list(channel["sockets"].items()):
+                    patch = await asyncio.to_thread(view_patch, client_view, timeline_data, version, specs)
+                    if client is websocket:
+                        patch["id"] = command_id
+                    try:
+                        await send_json(client, patch)
+                    except Exception:  # Closed mid-send; its own handler unregisters it
+                        channel["sockets"].pop(client, None)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        channel["sockets"].pop(websocket, None)
+        if not channel["sockets"] and session_channels.get(session_id) is channel:
+            del session_channels[session_id]
+
+
+@app.get("/api/sessions/{session_id}/search")
+async def session_search(session_id: str, q: str, limit: int = 20):
+    """
+    Term and phrase search over a session's documents: '"general counsel" resigned' finds pages
+    with the phrase and the word. Pages are BM25-ranked, with snippets and highlight offsets.
+    """
+    if not 1 <= limit <= MAX_SEARCH_HITS:
+        return JSONResponse({"error": f"limit must be 1-{MAX_SEARCH_HITS}"}, status_code=400)
+    parts = textindex.parse_query(q)
+    if not parts:
+        return JSONResponse({"error": "Query has no searchable words"}, status_code=400)
+
+    sources = await asyncio.to_thread(textindex.load_sources, session_id)
+    if sources is None:
+        return {"error": "No search index for this session. Please upload a document first."}
+    timer = metrics.RequestTimer()
+    with timer.stage("search"):
+        total, hits = await asyncio.to_thread(textindex.search_documents, sources["documents"], parts, limit,
+                                              text_indexes.get)
+    return {"session_id": session_id, "query": q, "total_pages": total, "hits": hits,
+            "took_ms": timer.elapsed_ms()}
+
+
+@app.get("/api/sessions/{session_id}/events/{event_index}/sources")
+async def event_sources(session_id: str, event_index: int):
+    """
+    Source passages of one event (its position in the session's events - the "event" field of
+    window results): document, page, character span, snippet.
+    """
+    sources = await asyncio.to_thread(textindex.load_sources, session_id)
+    if sources is None:
+        return {"error": "No search index for this session. Please upload a document first."}
+    if not 0 <= event_index < len(sources["events"]):
+        return JSONResponse({"error": f"event_index must be 0-{len(sources['events']) - 1}"}, status_code=400)
+
+    index = await asyncio.to_thread(session_index, session_id)
+    if index is None:
+        return {"error": "Session not found. Please upload a document first."}
+    resolved = await asyncio.to_thread(textindex.resolve_sources, sources["documents"],
+                                       sources["events"][event_index], text_indexes.get)
+    return {"session_id": session_id, "event_index": event_index,
+            "event": index.store.event(event_index).model_dump(), "sources": resolved}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Current stage/status of a processing job, answerable by any worker"""
+    job = await asyncio.to_thread(state.get_job, job_id)
+    if job is None:
+        return {"error": "Job not found"}
+    return job
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus text exposition of this worker's metrics"""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "Hubble API"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the warm-up hook has preloaded renderers and the export pool"""
+    if not readiness["ready"]:
+        return JSONResponse(
+            {"status": "warming_up", "error": readiness["error"]},
+            status_code=503
+        )
+    return {"status": "ready", "extraction_enabled": EXTRACTION_ENABLED, "llm_mode": recording.LLM_MODE,
+            "missing_assets": assets.missing_assets()}
+
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # WEB_CONCURRENCY > 1 runs several worker processes sharing state through state.py
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run("main:app" if workers > 1 else app, host="0.0.0.0", port=8000, workers=workers)
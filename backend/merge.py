@@ -0,0 +1,361 @@
+"""
+Merge the timelines of several documents of one matter into a single TimelineData.
+
+A complaint, a deposition and an SEC order each name the same people differently
+("Dr. Eleanor Park - CSO (Original)", "Eleanor Park", "Park, Eleanor", "E. Park"). Merging
+resolves those labels to one actor each, then drops the events several documents report twice.
+
+Actor resolution never compares every label with every other one. Each label is normalized
+(honorifics, degrees, punctuation and "(Status)" removed; "Last, First" reordered) and put in
+blocks keyed by last name + first initial and by first name + last initial, so a typo in either
+name still shares a block with the right spelling. Only labels in the same block are compared:
+
+- names match when the last names (and the first names, unless one is an initial) are equal or
+  at least NAME_SIMILARITY alike (difflib ratio)
+- titles must agree ("CSO" == "Chief Scientific Officer"): "Michael Chen - CFO" and
+  "Michael Chen - CEO" are two chart rows, as the extractor labels them
+- an untitled label ("Eleanor Park") joins a titled actor only when exactly one titled actor
+  of that name exists; otherwise it stays on its own
+
+Matches are joined with union-find, and each actor is shown under its most informative label.
+
+Events are then de-duplicated per actor in one sort + sweep: bars from different documents
+overlapping by at least DUPLICATE_OVERLAP of the shorter one, and milestones within MILESTONE_DAYS
+with similar actions, are one event - the copy with the most precise dates (then the longest
+context) is kept. Events of a single document are never merged with each other.
+"""
+
+import os
+import re
+from collections import Counter, defaultdict, deque
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from analytics import parse_actor
+from eventstore import NO_DAY, parse_day
+from models import ActorHighlight, CaseMetadata, Event, TimelineData, VisualizationConfig
+
+NAME_SIMILARITY = float(os.getenv("HUBBLE_MERGE_NAME_SIMILARITY", "0.85"))
+DUPLICATE_OVERLAP = 0.5  # Share of the shorter bar two same-actor bars must overlap
+MILESTONE_DAYS = 7  # Same-actor milestones this close with similar actions are one event
+ACTION_SIMILARITY = 0.5  # Word Jaccard of two milestone actions
+
+_HONORIFICS = {"dr", "mr", "mrs", "ms", "miss", "mx", "prof", "professor", "hon", "judge", "sir", "dame"}
+_SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "phd", "md", "jd", "esq", "cpa", "mba", "rn"}
+_TITLE_STOPWORDS = {"of", "and", "the", "for", "&"}
+_PARENTHETICAL = re.compile(r"\([^()]*\)")
+_DROPPED = re.compile(r"[.'’]")
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WORD = re.compile(r"\w+")
+
+
+def name_tokens(label: str) -> List[str]:
+    """Normalized name words of an actor label: "Dr. Eleanor Park - CSO (Original)" -> ["eleanor", "park"]"""
+    name, _, _ = parse_actor(label)
+    name = _PARENTHETICAL.sub(" ", name)
+    # "Park, Eleanor" -> "Eleanor Park" (but not "Eleanor Park, Jr.")
+    parts = [p.strip() for p in name.split(",")]
+    if len(parts) == 2 and parts[1] and _DROPPED.sub("", parts[1]).casefold() not in _SUFFIXES:
+        name = f"{parts[1]} {parts[0]}"
+    words = _PUNCTUATION.sub(" ", _DROPPED.sub("", name.casefold())).split()
+    core = [w for w in words if w not in _HONORIFICS and w not in _SUFFIXES]
+    return core or words
+
+
+def title_key(title: Optional[str]) -> Optional[str]:
+    """Comparable form of a title: multi-word titles become their acronym ("Chief Scientific Officer" -> "cso")"""
+    if not title:
+        return None
+    words = [w for w in _WORD.findall(title.casefold()) if w not in _TITLE_STOPWORDS]
+    if len(words) > 1:
+        return "".join(w[0] for w in words)
+    return words[0] if words else None
+
+
+def _similar(a: str, b: str) -> bool:
+    return a == b or SequenceMatcher(None, a, b).ratio() >= NAME_SIMILARITY
+
+
+def _first_names_match(a: str, b: str) -> bool:
+    # "e" matches "eleanor"
+    if len(a) == 1 or len(b) == 1:
+        return a[0] == b[0]
+    return _similar(a, b)
+
+
+def same_name(a: Sequence[str], b: Sequence[str]) -> bool:
+    """Whether two normalized names are the same person (first and last word; middle names ignored)"""
+    if a == b:
+        return True
+    if len(a) < 2 or len(b) < 2:
+        return False  # Single words (organizations, agencies) only match exactly
+    return _similar(a[-1], b[-1]) and _first_names_match(a[0], b[0])
+
+
+def blocking_keys(tokens: Sequence[str]) -> List[str]:
+    """Blocks a label is compared in: last name + first initial, and first name + last initial"""
+    if len(tokens) < 2:
+        return [f"={' '.join(tokens)}"]
+    first, last = tokens[0], tokens[-1]
+    keys = [f"{last}|{first[0]}"]
+    if len(first) > 1:  # An initial alone would block "E. Park" with every E.-something
+        keys.append(f"{first}|{last[0]}")
+    return keys
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> None:
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+
+def resolve_actors(label_counts: Dict[str, int]) -> Tuple[Dict[str, str], dict]:
+    """
+    Map every actor label to its canonical label (see module docstring).
+
+    Args:
+        label_counts: Events per distinct label, across all documents
+
+    Returns:
+        (label -> canonical label, stats with blocks/comparisons against the all-pairs count)
+    """
+    labels = list(label_counts)
+    parsed = [parse_actor(label) for label in labels]
+    tokens = [name_tokens(label) for label in labels]
+    titles = [title_key(title) for _, title, _ in parsed]
+
+    blocks: Dict[str, List[int]] = defaultdict(list)
+    for i, words in enumerate(tokens):
+        for key in blocking_keys(words):
+            blocks[key].append(i)
+
+    uf = _UnionFind(len(labels))
+    untitled_candidates: Dict[int, set] = defaultdict(set)  # Untitled label -> titled labels of that name
+    compared = set()
+    for members in blocks.values():
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                i, j = members[x], members[y]
+                pair = (i, j) if i < j else (j, i)
+                if pair in compared:  # Two labels can share both of their blocks
+                    continue
+                compared.add(pair)
+                if not same_name(tokens[i], tokens[j]):
+                    continue
+                if titles[i] == titles[j]:
+                    uf.union(i, j)
+                elif titles[i] is None or titles[j] is None:
+                    untitled, titled = (i, j) if titles[i] is None else (j, i)
+                    untitled_candidates[untitled].add(titled)
+
+    # Untitled labels join the titled actor of their name only if it is unambiguous
+    attach: Dict[int, set] = defaultdict(set)
+    for untitled, titled in untitled_candidates.items():
+        attach[uf.find(untitled)].update(uf.find(t) for t in titled)
+    for root, targets in attach.items():
+        if len(targets) == 1:
+            uf.union(root, targets.pop())
+
+    clusters: Dict[int, List[int]] = defaultdict(list)
+    for i in range(len(labels)):
+        clusters[uf.find(i)].append(i)
+
+    canonical: Dict[str, str] = {}
+    aliases = {}
+    for members in clusters.values():
+        # Most informative label: has a title, has a status, most events, first seen
+        best = max(members, key=lambda i: (parsed[i][1] is not None, parsed[i][2] is not None,
+                                           label_counts[labels[i]], -i))
+        for i in members:
+            canonical[labels[i]] = labels[best]
+        if len(members) > 1:
+            aliases[labels[best]] = sorted(labels[i] for i in members if i != best)
+
+    n = len(labels)
+    stats = {
+        "actor_labels": n,
+        "actors": len(clusters),
+        "blocks": len(blocks),
+        "largest_block": max((len(m) for m in blocks.values()), default=0),
+        "comparisons": len(compared),
+        "all_pairs": n * (n - 1) // 2,
+        "actor_aliases": aliases,
+    }
+    return canonical, stats
+
+
+def _action_words(action: str) -> set:
+    return set(_WORD.findall(action.casefold()))
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def _better(a: Event, b: Event, days: Dict[Optional[str], Tuple[int, int]]) -> Event:
+    """The copy of a duplicated event to keep: most precise dates, then longest context"""
+    def rank(e: Event):
+        return (-(days[e.start][1] + days[e.end][1]), len(e.context))
+    return b if rank(b) > rank(a) else a
+
+
+def dedupe_events(events: List[Event], sources: List[int]) -> List[Event]:
+    """
+    Drop events that several documents report (events must already carry canonical actors).
+
+    sources[i] is the document of events[i]. Sorted by (actor, kind, start) then swept once;
+    returns the kept events in chronological order.
+    """
+    days: Dict[Optional[str], Tuple[int, int]] = {}
+    for e in events:
+        for value in (e.start, e.end):
+            if value not in days:
+                days[value] = parse_day(value)
+
+    def kind(e: Event) -> int:
+        return 0 if e.end is not None and not e.milestone else 1  # bar / point
+
+    order = sorted(range(len(events)), key=lambda i: (events[i].actor, kind(events[i]), days[events[i].start][0], i))
+    kept: List[Tuple[int, Event]] = []  # (first source position, event)
+    group = None
+    bar = None  # Current bar cluster: [position, event, start, end, documents]
+    recent: deque = deque()  # Current actor's milestones within MILESTONE_DAYS: [day, words, position, event, documents]
+    undated_seen: Dict[tuple, int] = {}  # -> document that first reported it
+
+    def flush_bar():
+        if bar is not None:
+            kept.append((bar[0], bar[1]))
+
+    for i in order:
+        e = events[i]
+        start = days[e.start][0]
+        if (e.actor, kind(e)) != group:
+            flush_bar()
+            group, bar = (e.actor, kind(e)), None
+            kept.extend((m[2], m[3]) for m in recent)
+            recent.clear()
+
+        if start == NO_DAY:  # Undated: only exact repeats are duplicates
+            key = (e.actor, e.action, e.start, e.end, e.milestone)
+            if key not in undated_seen or undated_seen[key] == sources[i]:
+                undated_seen.setdefault(key, sources[i])
+                kept.append((i, e))
+            continue
+
+        if kind(e) == 0:
+            end = days[e.end][0]
+            if end == NO_DAY:
+                kept.append((i, e))
+                continue
+            if bar is not None and sources[i] not in bar[4]:
+                overlap = min(end, bar[3]) - max(start, bar[2]) + 1
+                shorter = min(end - start, bar[3] - bar[2]) + 1
+                if shorter > 0 and overlap / shorter >= DUPLICATE_OVERLAP:
+                    bar[1] = _better(bar[1], e, days)
+                    bar[4].add(sources[i])
+                    continue
+            flush_bar()
+            bar = [i, e, start, end, {sources[i]}]
+        else:
+            while recent and recent[0][0] < start - MILESTONE_DAYS:
+                old = recent.popleft()
+                kept.append((old[2], old[3]))
+            words = _action_words(e.action)
+            for m in recent:
+                if sources[i] not in m[4] and _jaccard(words, m[1]) >= ACTION_SIMILARITY:
+                    m[3] = _better(m[3], e, days)
+                    m[4].add(sources[i])
+                    break
+            else:
+                recent.append([start, words, i, e, {sources[i]}])
+    flush_bar()
+    kept.extend((m[2], m[3]) for m in recent)
+
+    def chronological(item):
+        position, e = item
+        start = days[e.start][0]
+        return (start == NO_DAY, start, position)
+    return [e for _, e in sorted(kept, key=chronological)]
+
+
+def _merge_configs(configs: List[VisualizationConfig], canonical: Dict[str, str],
+                   n_documents: int) -> VisualizationConfig:
+    highlights: Dict[str, ActorHighlight] = {}
+    focus: Optional[List[str]] = []
+    milestones: Dict[str, None] = {}
+    for config in configs:
+        for h in config.actor_highlights:
+            name = canonical.get(h.name, h.name)
+            highlights.setdefault(name, ActorHighlight(name=name, color=h.color, reason=h.reason))
+        if focus is not None:
+            # A document without a focus filter shows everyone, so the merged chart does too
+            focus = None if config.focus_actors is None else focus + config.focus_actors
+        milestones.update(dict.fromkeys(config.key_milestone_events))
+    document_types = Counter(c.document_type for c in configs)
+    return VisualizationConfig(
+        focus_actors=list(dict.fromkeys(canonical.get(a, a) for a in focus)) if focus is not None else None,
+        key_milestone_events=list(milestones),
+        actor_highlights=list(highlights.values()),
+        sort_strategy=configs[0].sort_strategy,
+        # No footer: the chart falls back to sweep-line analytics over the merged events
+        footer_analysis="",
+        document_type=document_types.most_common(1)[0][0],
+        visualization_rationale=f"Merged from {n_documents} documents",
+    )
+
+
+def _merge_cases(cases: List[CaseMetadata], matter_name: Optional[str]) -> CaseMetadata:
+    def bound(values, pick):
+        dated = [(parse_day(v)[0], v) for v in values if v and parse_day(v)[0] != NO_DAY]
+        return pick(dated)[1] if dated else None
+    types = Counter(c.type for c in cases if c.type)
+    return CaseMetadata(
+        name=matter_name or cases[0].name,
+        id=next((c.id for c in cases if c.id), None),
+        type=types.most_common(1)[0][0] if types else None,
+        start=bound([c.start for c in cases], min),
+        end=bound([c.end for c in cases], max),
+    )
+
+
+def merge_timelines(timelines: List[TimelineData], matter_name: str = None) -> Tuple[TimelineData, dict]:
+    """
+    One TimelineData for a matter from its documents' timelines (in upload order).
+
+    Returns:
+        (merged timeline, stats: documents, actor resolution counts, events in/out, actor_aliases)
+    """
+    if not timelines:
+        raise ValueError("No timelines to merge")
+    label_counts = Counter(e.actor for t in timelines for e in t.events)
+    canonical, stats = resolve_actors(label_counts)
+
+    events = [e if canonical[e.actor] == e.actor else e.model_copy(update={"actor": canonical[e.actor]})
+              for t in timelines for e in t.events]
+    sources = [document for document, t in enumerate(timelines) for _ in t.events]
+    merged_events = dedupe_events(events, sources)
+
+    configs = [t.visualization_config for t in timelines if t.visualization_config]
+    merged = TimelineData(
+        case=_merge_cases([t.case for t in timelines], matter_name),
+        events=merged_events,
+        visualization_config=_merge_configs(configs, canonical, len(timelines)) if configs else None,
+    )
+    stats = {
+        "documents": len(timelines),
+        "events_in": len(events),
+        "events_out": len(merged_events),
+        "duplicates_removed": len(events) - len(merged_events),
+        **stats,
+    }
+    return merged, stats
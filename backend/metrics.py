@@ -0,0 +1,259 @@
+"""
+Minimal Prometheus-style metrics (text exposition format 0.0.4), served at /metrics.
+
+Metrics are per process: with several uvicorn workers each worker reports its own values,
+so scrape every worker (or aggregate by instance) rather than a single load-balanced URL.
+"""
+
+import asyncio
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Seconds - covers fast stages (JSON parse) through slow ones (LLM, PNG export)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in sorted(self._values.items())]
+
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in sorted(self._values.items())]
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> (per-bucket counts (non-cumulative, last = +Inf), sum, count)
+        self._series: Dict[LabelKey, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total, count = self._series.get(key) or ([0] * (len(self.buckets) + 1), 0.0, 0)
+            counts[index] += 1
+            self._series[key] = (counts, total + value, count + 1)
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        update_cache_ratios()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "hubble_stage_duration_seconds",
+    "Duration of each process_document / process_matter stage "
+    "(upload, pdf_extraction, text_index, fingerprint, compaction, passage_index, llm_first_token, llm_total, json_parse, "
+    "merge, provenance, render_html, render_png) and of session searches (search)"
+))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "hubble_llm_tokens_total",
+    "Tokens reported by the messages API, by direction (input/output)"
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "hubble_cache_requests_total",
+    "Cache lookups by cache name and result (hit/miss)"
+))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "hubble_cache_hit_ratio",
+    "Hits / lookups since process start, by cache name"
+))
+JOBS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "hubble_jobs_in_flight",
+    "process_document jobs currently running in this worker"
+))
+JOBS_TOTAL = REGISTRY.register(Counter(
+    "hubble_jobs_total",
+    "Finished process_document jobs by outcome (complete/error)"
+))
+PROMPT_TOKENS_ESTIMATED = REGISTRY.register(Counter(
+    "hubble_prompt_tokens_estimated_total",
+    "Estimated document tokens before and after prompt compaction (phase=before/after)"
+))
+PROMPT_COMPACTION_RATIO = REGISTRY.register(Histogram(
+    "hubble_prompt_compaction_ratio",
+    "Compacted / original document size per job",
+    buckets=(0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 0.98, 1.0)
+))
+EVENT_LOOP_LAG = REGISTRY.register(Histogram(
+    "hubble_event_loop_lag_seconds",
+    "Delay between when a periodic event-loop tick was due and when it ran",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+))
+
+
+class RequestTimer:
+    """
+    Stage durations for a single request.
+
+    Every recorded stage also feeds the process-wide STAGE_SECONDS histogram, so the same
+    numbers show up in /metrics, in Server-Timing headers and in the SSE timing payloads.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}  # stage -> seconds (accumulated)
+        self.observers: List[Callable[[str, float], None]] = []  # e.g. the profiler (profiling.py)
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 1)
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        STAGE_SECONDS.observe(seconds, stage=stage)
+        for observer in self.observers:
+            observer(stage, seconds)
+
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def breakdown(self) -> dict:
+        """{"stages_ms": {...}, "total_ms": ...} for the complete payload"""
+        return {
+            "stages_ms": {stage: round(seconds * 1000, 1) for stage, seconds in self.stages.items()},
+            "total_ms": self.elapsed_ms(),
+        }
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, e.g. 'upload;dur=12.3, pdf_extraction;dur=480.0'"""
+        return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.stages.items())
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def update_cache_ratios() -> None:
+    caches = {dict(key)["cache"] for key in CACHE_REQUESTS._values}
+    for cache in caches:
+        hits = CACHE_REQUESTS.value(cache=cache, result="hit")
+        total = hits + CACHE_REQUESTS.value(cache=cache, result="miss")
+        if total:
+            CACHE_HIT_RATIO.set(hits / total, cache=cache)
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """Background task: a blocked event loop shows up as ticks that run late"""
+    loop = asyncio.get_running_loop()
+    while True:
+        due = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - due))
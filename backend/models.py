@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 
 class Event(BaseModel):
@@ -33,6 +33,7 @@ class VisualizationConfig(BaseModel):
 
     # How to highlight (Claude determines colors and reasons)
     actor_highlights: List[ActorHighlight] = []  # Actors to highlight with custom colors and legal reasoning
+    role_colors: Dict[str, str] = {}  # User overrides of the role palette (roleType -> hex color)
 
     # Structure and analysis
     sort_strategy: str = "chronological"  # How to order actors: "chronological", "by_role", "by_legal_significance"
@@ -0,0 +1,162 @@
+"""
+Date-bearing passage index for focused extraction.
+
+Gantt extraction is about tenures, roles and dated events, which live in the sentences that
+mention dates. index_passages finds every date mention in one linear pass over the pages and
+keeps the sentence around it (plus one neighbour on each side), merging overlapping windows.
+Passages are scored by how specific their dates are and by tenure/role vocabulary.
+
+When a document is longer than the prompt budget, focused_text sends the best-scoring passages,
+in document order and prefixed with their page ("[p. 12] ..."), instead of a blind prefix.
+HUBBLE_FOCUS_MODE: "auto" (focus only over budget, default), "always" or "off".
+"""
+
+import os
+import re
+from typing import Callable, Iterable, List, Optional, Tuple
+
+FOCUS_MODE = os.getenv("HUBBLE_FOCUS_MODE", "auto").lower()
+if FOCUS_MODE not in ("auto", "always", "off"):
+    raise ValueError(f"HUBBLE_FOCUS_MODE must be auto, always or off (got {FOCUS_MODE})")
+
+CONTEXT_SENTENCES = 1  # Neighbouring sentences kept on each side of a date
+MAX_WINDOW_CHARS = 300  # Cap on each side of a date, for "sentences" that are really tables or lists
+MAX_PASSAGE_CHARS = 1200  # Date-dense stretches are split so ranking stays fine-grained
+
+_MONTH = (r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?"
+          r"|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\.?")
+_ORDINAL = r"\d{1,2}(?:st|nd|rd|th)?"
+
+# Most specific forms first; the group that matched gives the date's precision
+_DATE = re.compile(
+    rf"\b(?P<day>{_MONTH}\s+{_ORDINAL},?\s+\d{{4}}"
+    rf"|{_ORDINAL}\s+(?:of\s+)?{_MONTH},?\s+\d{{4}}"
+    r"|\d{1,2}/\d{1,2}/(?:\d{4}|\d{2})"
+    r"|\d{4}-\d{2}-\d{2})\b"
+    rf"|\b(?P<month>{_MONTH},?\s+\d{{4}}"
+    r"|\d{4}-\d{2}"
+    r"|(?:Q[1-4]|(?:first|second|third|fourth)\s+quarter\s+(?:of\s+)?)\s*\d{4})\b"
+    r"|\b(?P<year>(?:19|20)\d{2})\b"
+)
+DATE_WEIGHTS = {"day": 3, "month": 2, "year": 1}
+
+_TENURE = re.compile(
+    r"\b(?:appointed|hired|joined|resigned|retired|terminated|fired|promoted|elected|named|served|serving"
+    r"|succeeded|replaced|departed|stepped down|tenure|employed|effective|until|through|since)\b",
+    re.IGNORECASE,
+)
+_ROLE = re.compile(
+    r"\b(?:CEO|CFO|COO|CTO|CMO|CSO|President|Chair(?:man|woman|person)?|Director|Officer|VP"
+    r"|Vice President|General Counsel|Secretary|Treasurer|Founder|Partner|Head of|Board|Counsel)\b"
+)
+# Sentence end (punctuation before a capitalised word) or paragraph break
+_SENTENCE_END = re.compile(r"[.!?;](?=\s+[\"'(\[]?[A-Z])|\n\s*\n")
+_WHITESPACE = re.compile(r"\s+")
+_REQUEST_TERM = re.compile(r"[a-z]{4,}")
+_REQUEST_STOPWORDS = {"show", "timeline", "chart", "analyze", "analysis", "with", "from", "that", "this", "their",
+                      "them", "what", "when", "which", "about", "into", "only", "over", "were", "have"}
+
+
+def _request_terms(user_request: Optional[str]) -> List[str]:
+    if not user_request:
+        return []
+    return sorted({term for term in _REQUEST_TERM.findall(user_request.lower()) if term not in _REQUEST_STOPWORDS})
+
+
+def _score(text: str, date_weight: int, terms: List[str]) -> int:
+    lowered = text.lower() if terms else ""
+    return (date_weight + 2 * len(_TENURE.findall(text)) + 2 * min(3, len(_ROLE.findall(text)))
+            + sum(lowered.count(term) for term in terms))
+
+
+def _page_passages(page_number: int, page: str, terms: List[str]) -> List[dict]:
+    """Date windows of one page, overlapping windows merged"""
+    bounds = [0] + [m.end() for m in _SENTENCE_END.finditer(page)] + [len(page)]
+    passages: List[dict] = []
+    current = None
+    sentence = 0  # Index of the sentence holding the current match; dates come in order
+
+    def close(passage):
+        text = _WHITESPACE.sub(" ", page[passage["start"]:passage["end"]]).strip()
+        weight = passage.pop("date_weight")
+        passage.update(text=text, score=_score(text, weight, terms))
+        passages.append(passage)
+
+    for match in _DATE.finditer(page):
+        while bounds[sentence + 1] <= match.start():
+            sentence += 1
+        start = max(bounds[max(0, sentence - CONTEXT_SENTENCES)], match.start() - MAX_WINDOW_CHARS)
+        end = min(bounds[min(len(bounds) - 1, sentence + 1 + CONTEXT_SENTENCES)], match.end() + MAX_WINDOW_CHARS)
+        weight = DATE_WEIGHTS[match.lastgroup]
+
+        if current is not None and start <= current["end"]:
+            if end - current["start"] <= MAX_PASSAGE_CHARS:
+                current["end"] = max(current["end"], end)
+                current["dates"].append(match.group())
+                current["date_weight"] += weight
+                continue
+            start = min(current["end"], match.start())  # Continue where the full passage stops
+        if current is not None:
+            close(current)
+        current = {"page": page_number, "start": start, "end": end, "dates": [match.group()], "date_weight": weight}
+
+    if current is not None:
+        close(current)
+    return passages
+
+
+def index_passages(pages: Iterable[str], user_request: str = None) -> List[dict]:
+    """
+    Every date-bearing passage in the document, in document order.
+
+    Each passage: {"page", "start", "end" (character offsets in that page's text), "text",
+    "dates" (the mentions found), "score"}. Words from user_request raise the score of
+    passages that mention them.
+    """
+    terms = _request_terms(user_request)
+    passages: List[dict] = []
+    for page_number, page in enumerate(pages, start=1):
+        passages.extend(_page_passages(page_number, page, terms))
+    return passages
+
+
+def format_passage(passage: dict) -> str:
+    return f"[p. {passage['page']}] {passage['text']}"
+
+
+def select_passages(passages: List[dict], max_chars: int) -> Tuple[str, List[dict]]:
+    """Highest-scoring passages that fit in max_chars, joined in document order"""
+    chosen, used = [], 0
+    for passage in sorted(passages, key=lambda p: (-p["score"], p["page"], p["start"])):
+        size = len(format_passage(passage)) + 2  # Blank line between passages
+        if used + size > max_chars:
+            continue
+        chosen.append(passage)
+        used += size
+    chosen.sort(key=lambda p: (p["page"], p["start"]))
+    return "\n\n".join(format_passage(p) for p in chosen), chosen
+
+
+def should_focus(document_chars: int, max_chars: int) -> bool:
+    return FOCUS_MODE == "always" or (FOCUS_MODE == "auto" and document_chars > max_chars)
+
+
+def focused_text(iter_pages: Callable[[], Iterable[str]], max_chars: int,
+                 user_request: str = None) -> Tuple[str, dict]:
+    """
+    The ranked date passages that fit in max_chars, and stats for the progress event.
+
+    Returns "" (stats["passages_sent"] == 0) when the document has no dates, so the
+    caller can keep the plain prefix.
+    """
+    passages = index_passages(iter_pages(), user_request)
+    text, chosen = select_passages(passages, max_chars)
+    pages_sent = sorted({p["page"] for p in chosen})
+    return text, {
+        "passages_indexed": len(passages),
+        "passages_sent": len(chosen),
+        "dates_indexed": sum(len(p["dates"]) for p in passages),
+        "pages_with_dates": len({p["page"] for p in passages}),
+        "pages_sent": pages_sent,
+        "chars": len(text),
+    }
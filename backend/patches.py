@@ -0,0 +1,151 @@
+"""
+Minimal JSON Patch (RFC 6902) diffs between two JSON documents.
+
+Used by the session channel (see main.session_channel) to send a client only what changed in
+its chart spec. diff() recurses into objects and arrays: arrays of equal length are compared
+element by element (the spec's columns keep their length when text or colors change), others
+have their common prefix and suffix trimmed so inserting or removing a bar costs an op per
+column, not the column. When a container's ops would be larger than its new value (a row
+reorder renumbers a whole column), the value is replaced instead. An array whose only change
+is one element moving (a highlighted row sinks to the bottom) gets a single move op. Only
+add / remove / replace / move ops are produced; apply() applies them.
+"""
+
+import copy
+from typing import Any, List
+
+import serialization
+
+
+def _pointer(path: str, key) -> str:
+    """JSON Pointer of key under path (RFC 6901 escaping)"""
+    return f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+
+def _same(old: Any, new: Any) -> bool:
+    # Types too, at every depth: False == 0 and 1 == 1.0 in Python, not in JSON. Containers
+    # that are == are compared as JSON text, which tells those apart in one C-speed pass
+    if type(old) is not type(new) or old != new:
+        return False
+    if isinstance(old, (dict, list)):
+        return serialization.dumps(old) == serialization.dumps(new)
+    return True
+
+
+def _diff(old: Any, new: Any, path: str, ops: List[dict]):
+    if _same(old, new):
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        nested: List[dict] = []
+        for key in old:
+            if key not in new:
+                nested.append({"op": "remove", "path": _pointer(path, key)})
+        for key, value in new.items():
+            if key in old:
+                _diff(old[key], value, _pointer(path, key), nested)
+            else:
+                nested.append({"op": "add", "path": _pointer(path, key), "value": value})
+    elif isinstance(old, list) and isinstance(new, list):
+        nested = []
+        _diff_list(old, new, path, nested)
+    else:
+        ops.append({"op": "replace", "path": path, "value": new})
+        return
+    replace = {"op": "replace", "path": path, "value": new}
+    if len(nested) > 1 and len(serialization.dumps(nested)) > len(serialization.dumps(replace)):
+        ops.append(replace)
+    else:
+        ops.extend(nested)
+
+
+def _moved(old: list, new: list) -> bool:
+    return all(_same(a, b) for a, b in zip(old, new))
+
+
+def _diff_list(old: list, new: list, path: str, ops: List[dict]):
+    prefix = 0
+    limit = min(len(old), len(new))
+    while prefix < limit and _same(old[prefix], new[prefix]):
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and _same(old[-1 - suffix], new[-1 - suffix]):
+        suffix += 1
+    old_middle, new_middle = old[prefix:len(old) - suffix], new[prefix:len(new) - suffix]
+    if len(old) == len(new):
+        last = prefix + len(old_middle) - 1
+        if len(old_middle) > 2 and _moved(old_middle[1:], new_middle) and _same(old_middle[0], new_middle[-1]):
+            ops.append({"op": "move", "from": _pointer(path, prefix), "path": _pointer(path, last)})
+        elif len(old_middle) > 2 and _moved(old_middle, new_middle[1:]) and _same(old_middle[-1], new_middle[0]):
+            ops.append({"op": "move", "from": _pointer(path, last), "path": _pointer(path, prefix)})
+        else:
+            for i, (a, b) in enumerate(zip(old_middle, new_middle)):
+                _diff(a, b, _pointer(path, prefix + i), ops)
+        return
+    common = min(len(old_middle), len(new_middle))
+    for i in range(common):
+        _diff(old_middle[i], new_middle[i], _pointer(path, prefix + i), ops)
+    at = prefix + common
+    for _ in range(len(old_middle) - common):
+        ops.append({"op": "remove", "path": _pointer(path, at)})  # Later elements shift down
+    for i, value in enumerate(new_middle[common:]):
+        ops.append({"op": "add", "path": _pointer(path, at + i), "value": value})
+
+
+def diff(old: Any, new: Any) -> List[dict]:
+    """JSON Patch ops turning old into new ([] when equal)"""
+    ops: List[dict] = []
+    _diff(old, new, "", ops)
+    return ops
+
+
+def _parse(path: str) -> List[str]:
+    if path == "":
+        return []
+    if not path.startswith("/"):
+        raise ValueError(f"Invalid JSON Pointer: {path!r}")
+    return [part.replace("~1", "/").replace("~0", "~") for part in path[1:].split("/")]
+
+
+def _take(doc: Any, path: str) -> Any:
+    """Remove and return the value at path (the first half of a move)"""
+    parts = _parse(path)
+    parent = doc
+    for part in parts[:-1]:
+        parent = parent[int(part)] if isinstance(parent, list) else parent[part]
+    return parent.pop(int(parts[-1]) if isinstance(parent, list) else parts[-1])
+
+
+def apply(doc: Any, ops: List[dict]) -> Any:
+    """A copy of doc with add / remove / replace / move ops applied"""
+    doc = copy.deepcopy(doc)
+    for op in ops:
+        if op["op"] == "move":
+            op = {"op": "add", "path": op["path"], "value": _take(doc, op["from"])}
+        parts = _parse(op["path"])
+        if not parts:
+            if op["op"] == "remove":
+                raise ValueError("Cannot remove the whole document")
+            doc = copy.deepcopy(op["value"])
+            continue
+        parent = doc
+        for part in parts[:-1]:
+            parent = parent[int(part)] if isinstance(parent, list) else parent[part]
+        key = parts[-1]
+        if isinstance(parent, list):
+            index = len(parent) if key == "-" else int(key)
+            if op["op"] == "add":
+                parent.insert(index, copy.deepcopy(op["value"]))
+            elif op["op"] == "remove":
+                del parent[index]
+            elif op["op"] == "replace":
+                parent[index] = copy.deepcopy(op["value"])
+            else:
+                raise ValueError(f"Unsupported op: {op['op']!r}")
+        else:
+            if op["op"] in ("add", "replace"):
+                parent[key] = copy.deepcopy(op["value"])
+            elif op["op"] == "remove":
+                del parent[key]
+            else:
+                raise ValueError(f"Unsupported op: {op['op']!r}")
+    return doc
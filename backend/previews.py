@@ -0,0 +1,169 @@
+"""
+Progressive chart previews while the model is still writing its response.
+
+The model streams its <thinking> lines, then the timeline JSON; the events array alone can take
+a minute at typical output speeds. PreviewBuilder is polled with the response accumulated so
+far (EventExtractor.extract_events does this per chunk) and, at most every PREVIEW_SECONDS,
+returns the events completed since its last update as a small chart-spec delta:
+
+- EventScanner finds the events array after the ```json fence and picks out each complete
+  {...} element. It keeps its position and nesting state between polls, so every character
+  of the response is scanned once.
+- The preview layout is append-only: rows (actors), legend entries (roles) and event indexes
+  are fixed once sent, so each update only adds rows, legend entries, bars and milestones
+  (chartspec's column names: a bar's "role" is its legend index, "event" its index in the
+  events array). Role colors follow EventExtractor.generate_color_palette (first appearance),
+  so they match the final chart.
+
+Highlights, focus and the footer come after the events in the response; the final chart (the
+"complete" frame) replaces the preview.
+"""
+
+import json
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+import serialization
+from extractor import EventExtractor
+from models import CaseMetadata, Event
+from visualizer_d3 import D3GanttVisualizer
+
+PREVIEW_SECONDS = float(os.getenv("HUBBLE_PREVIEW_SECONDS", "3"))  # 0 disables previews
+
+_EVENTS_ARRAY = re.compile(r'"events"\s*:\s*\[')
+_CASE_OBJECT = re.compile(r'"case"\s*:\s*(?=\{)')
+_STRUCTURE = re.compile(r'[{}\[\]"\\]')
+
+
+class EventScanner:
+    """Complete elements of the "events" array in a growing model response, scanned incrementally"""
+
+    def __init__(self):
+        self.position: Optional[int] = None  # Next offset to scan; None until the array is found
+        self.depth = 0  # Nesting inside the events array
+        self.in_string = False
+        self.skip = -1  # Offset of an escaped character
+        self.element_start = 0
+        self.elements = 0  # Elements seen (valid or not): the next element's event index
+        self.done = False  # The array's closing bracket was seen
+        self.case: Optional[CaseMetadata] = None
+
+    def _find_array(self, text: str) -> bool:
+        fence = text.find("```json")
+        if fence < 0:
+            fence = text.find("</thinking>")  # Unfenced JSON after the thinking block
+        if fence < 0:
+            return False
+        match = _EVENTS_ARRAY.search(text, fence)
+        if match is None:
+            return False
+        case = _CASE_OBJECT.search(text, fence, match.start())
+        if case:
+            try:
+                self.case = CaseMetadata.model_validate(json.JSONDecoder().raw_decode(text, case.end())[0])
+            except ValueError:
+                pass
+        self.position = match.end()
+        return True
+
+    def feed(self, text: str) -> List[Tuple[int, Event]]:
+        """(event index, Event) of the elements completed since the last call"""
+        if self.done or (self.position is None and not self._find_array(text)):
+            return []
+        found = []
+        for match in _STRUCTURE.finditer(text, self.position):
+            i = match.start()
+            if i == self.skip:
+                continue
+            char = text[i]
+            if self.in_string:
+                if char == "\\":
+                    self.skip = i + 1
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "{[":
+                if self.depth == 0:
+                    self.element_start = i
+                self.depth += 1
+            elif self.depth == 0:  # "]" or "}" closing the events array
+                self.done = True
+                break
+            else:
+                self.depth -= 1
+                if self.depth == 0:
+                    try:
+                        found.append((self.elements, Event.model_validate(serialization.loads(text[self.element_start:i + 1]))))
+                    except ValueError:
+                        pass  # Not an event; the final parse reports it
+                    self.elements += 1
+        self.position = len(text)
+        return found
+
+
+class PreviewBuilder:
+    """Throttled, append-only preview updates of a streaming extraction (see the module docstring)"""
+
+    def __init__(self, interval: float = PREVIEW_SECONDS):
+        self.interval = interval
+        self.scanner = EventScanner()
+        self.events: List[Event] = []
+        self.rows: Dict[str, int] = {}
+        self.roles: Dict[str, int] = {}
+        self.case_sent = False
+        self.updates = 0
+        self.last = time.monotonic()
+        self._durations = D3GanttVisualizer()
+
+    def poll(self, text: str) -> Optional[dict]:
+        """An update when one is due and new events are complete, else None"""
+        now = time.monotonic()
+        if now - self.last < self.interval:
+            return None
+        self.last = now
+        found = self.scanner.feed(text)
+        if not found:
+            return None
+        return self._update(found)
+
+    def _duration(self, event: Event) -> Optional[str]:
+        try:
+            return self._durations.calculate_duration_label(event.start, event.end)
+        except ValueError:
+            return None
+
+    def _update(self, found: List[Tuple[int, Event]]) -> dict:
+        self.events.extend(event for _, event in found)
+        colors = EventExtractor.generate_color_palette(self.events)
+        new_rows: List[str] = []
+        new_legend: List[dict] = []
+        bars = {"row": [], "role": [], "start": [], "end": [], "duration": [], "event": [], "action": []}
+        milestones = {"start": [], "action": [], "event": []}
+
+        for index, event in found:
+            if event.end is not None:
+                if event.actor not in self.rows:
+                    self.rows[event.actor] = len(self.rows)
+                    new_rows.append(event.actor)
+                if event.roleType not in self.roles:
+                    self.roles[event.roleType] = len(self.roles)
+                    new_legend.append({"label": event.roleType, "color": colors[event.roleType]})
+                for column, value in (("row", self.rows[event.actor]), ("role", self.roles[event.roleType]),
+                                      ("start", event.start), ("end", event.end),
+                                      ("duration", self._duration(event)), ("event", index),
+                                      ("action", event.action)):
+                    bars[column].append(value)
+            if event.milestone or event.end is None:
+                for column, value in (("start", event.start), ("action", event.action), ("event", index)):
+                    milestones[column].append(value)
+
+        self.updates += 1
+        update = {"seq": self.updates, "events": len(self.events), "rows": new_rows, "legend": new_legend,
+                  "bars": bars, "milestones": milestones}
+        if not self.case_sent and self.scanner.case is not None:
+            update["case"] = self.scanner.case.model_dump(exclude_none=True)
+            self.case_sent = True
+        return update
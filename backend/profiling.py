@@ -0,0 +1,216 @@
+"""
+Opt-in per-request CPU and memory profiling for process_document.
+
+Admins send `profile=true` with an `X-Admin-Token` header matching HUBBLE_ADMIN_TOKEN. The job
+then runs under
+
+- a sampling CPU profiler (stdlib only): a background thread records the stacks of the event
+  loop thread and the worker threads (PDF parsing, rendering) every few milliseconds
+- tracemalloc, snapshotted each time a RequestTimer stage finishes, so allocations are
+  attributed to the stage (pdf_extraction, llm_total, render_html, ...) that made them
+
+The report (JSON) and collapsed stacks (for speedscope / flamegraph.pl) are published as
+artifacts and linked from the complete payload.
+
+Profiled jobs run several times slower (tracemalloc hooks every allocation), so compare stages
+within one profile rather than against unprofiled timings.
+
+tracemalloc is process-wide, so only one profiled job runs at a time per worker; a second
+concurrent request is processed normally without profiling. Samples from the event loop thread
+also include any other requests running on it at the same time.
+"""
+
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Optional
+
+import artifacts
+import metrics
+
+ADMIN_TOKEN = os.getenv("HUBBLE_ADMIN_TOKEN")
+
+SAMPLE_INTERVAL = float(os.getenv("HUBBLE_PROFILE_INTERVAL_MS", "5")) / 1000
+# Each extra frame makes allocation-heavy code (pdfminer) markedly slower under tracing:
+# 1 frame is ~6x slower than untraced, 3 frames ~14x
+TRACEMALLOC_FRAMES = int(os.getenv("HUBBLE_PROFILE_TRACEMALLOC_FRAMES", "1"))
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 15
+
+# Only one profiled job per process (tracemalloc and the sampler are process-wide)
+_active = threading.Lock()
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """Constant-time check of the X-Admin-Token header; profiling is off if no token is configured"""
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+def _code_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Periodically samples the stacks of the given threads (leaf-last collapsed stacks)"""
+
+    def __init__(self, thread_filter, interval: float = SAMPLE_INTERVAL):
+        self.thread_filter = thread_filter  # (thread_id, thread_name) -> bool
+        self.interval = interval
+        self.stacks: Counter = Counter()  # "root;...;leaf" -> samples
+        self.samples = 0
+        self._labels: Dict[object, str] = {}  # code object -> label (formatting every frame is slow)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me or not self.thread_filter(thread_id, names.get(thread_id, "")):
+                    continue
+                labels = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = self._labels.get(code)
+                    if label is None:
+                        label = self._labels[code] = _code_label(code)
+                    labels.append(label)
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(labels))] += 1
+                self.samples += 1
+
+    def top_functions(self, limit: int = TOP_FUNCTIONS) -> List[dict]:
+        """Functions by self samples (time spent in the function itself), with inclusive totals"""
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            self_counts[frames[-1]] += count
+            for label in set(frames):
+                total_counts[label] += count
+        total = self.samples or 1
+        return [
+            {
+                "function": label,
+                "self_samples": self_counts[label],
+                "total_samples": total_counts[label],
+                "self_pct": round(100 * self_counts[label] / total, 1),
+                "total_pct": round(100 * total_counts[label] / total, 1),
+            }
+            for label, _ in self_counts.most_common(limit)
+        ]
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format: one 'a;b;c count' line per unique stack"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+
+class RequestProfiler:
+    """
+    CPU sampling + per-stage tracemalloc snapshots for one job.
+
+    Attach it to the job's RequestTimer; every recorded stage takes a snapshot and stores the
+    top allocations since the previous stage finished.
+    """
+
+    def __init__(self, job_id: str, timer: metrics.RequestTimer):
+        self.job_id = job_id
+        self.timer = timer
+        self.stages: List[Dict] = []
+        self.started = time.perf_counter()
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._owns_tracemalloc = False
+
+        # Profile the event loop thread, the chart render threads and the to_thread workers (PDF parsing)
+        loop_thread = threading.get_ident()
+        self.cpu = SamplingProfiler(
+            lambda tid, name: tid == loop_thread or name.startswith(("render", "asyncio"))
+        )
+
+    @classmethod
+    def try_start(cls, job_id: str, timer: metrics.RequestTimer) -> Optional["RequestProfiler"]:
+        """Start profiling unless another profiled job is already running in this process"""
+        if not _active.acquire(blocking=False):
+            print(f"[WARNING] Profiling skipped for job {job_id}: another profiled job is running")
+            return None
+        profiler = cls(job_id, timer)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            profiler._owns_tracemalloc = True
+        tracemalloc.reset_peak()
+        profiler._previous = tracemalloc.take_snapshot()
+        timer.observers.append(profiler.on_stage)
+        profiler.cpu.start()
+        return profiler
+
+    def on_stage(self, stage: str, seconds: float) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        top = snapshot.compare_to(self._previous, "traceback")[:TOP_ALLOCATIONS]
+        self._previous = snapshot
+        tracemalloc.reset_peak()
+
+        self.stages.append({
+            "stage": stage,
+            "seconds": round(seconds, 4),
+            "traced_current_mb": round(current / 2**20, 2),
+            "traced_peak_mb": round(peak / 2**20, 2),
+            "top_allocations": [
+                {
+                    "size_kb": round(stat.size_diff / 1024, 1),
+                    "count": stat.count_diff,
+                    # Innermost frames last (only one unless HUBBLE_PROFILE_TRACEMALLOC_FRAMES is raised)
+                    "traceback": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                }
+                for stat in top if stat.size_diff > 0
+            ],
+        })
+
+    def finish(self, output_dir: str = artifacts.OUTPUT_DIR) -> Dict[str, str]:
+        """Stop profiling, publish the report and collapsed stacks; returns their /output/ URLs"""
+        try:
+            self.cpu.stop()
+            if self.on_stage in self.timer.observers:
+                self.timer.observers.remove(self.on_stage)
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+        finally:
+            _active.release()
+
+        stacks_path = os.path.join(output_dir, f"profile_{self.job_id}.folded.txt")
+        with open(stacks_path, "w", encoding="utf-8") as f:
+            f.write(self.cpu.collapsed())
+        stacks_name = artifacts.publish(stacks_path)
+
+        report = {
+            "job_id": self.job_id,
+            "duration_s": round(time.perf_counter() - self.started, 3),
+            "sample_interval_ms": self.cpu.interval * 1000,
+            "samples": self.cpu.samples,
+            "top_functions": self.cpu.top_functions(),
+            "stages": self.stages,
+            "collapsed_stacks_url": f"/output/{stacks_name}",
+        }
+        report_path = os.path.join(output_dir, f"profile_{self.job_id}.json")
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        report_name = artifacts.publish(report_path)
+
+        print(f"[SUCCESS] Profile for job {self.job_id}: {self.cpu.samples} samples, {len(self.stages)} stages")
+        return {"profile_url": f"/output/{report_name}", "profile_stacks_url": f"/output/{stacks_name}"}
@@ -0,0 +1,102 @@
+"""
+Record-and-replay of streamed LLM responses.
+
+HUBBLE_LLM_MODE selects where `EventExtractor.extract_events` gets its text chunks from:
+
+- live (default): the messages API
+- record: the messages API, and every chunk is saved with its timing
+- replay: saved chunks only - no network, no API key, no cost
+
+Recordings are keyed by (document text, user request), so the same upload replays the same
+response. They use the same JSON format as benchmarks/fake_llm.py:
+
+    {"model": ..., "usage": {...}, "chunks": [{"delay": 0.84, "text": "..."}, ...]}
+
+where "delay" is seconds since the previous chunk (the first is time to first token).
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import AsyncIterator, List, Optional
+
+LLM_MODES = ("live", "record", "replay")
+
+LLM_MODE = os.getenv("HUBBLE_LLM_MODE", "live").lower()
+if LLM_MODE not in LLM_MODES:
+    raise ValueError(f"Unknown HUBBLE_LLM_MODE: {LLM_MODE} (expected one of {', '.join(LLM_MODES)})")
+
+RECORDINGS_DIR = os.getenv(
+    "HUBBLE_RECORDINGS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "recordings")
+)
+
+# 1 = original timing, 10 = ten times faster, 0 = no delays at all
+REPLAY_SPEED = float(os.getenv("HUBBLE_REPLAY_SPEED", "1"))
+
+
+def recording_key(text: str, user_request: Optional[str]) -> str:
+    digest = hashlib.sha256()
+    digest.update(text.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update((user_request or "").encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def recording_path(key: str, recordings_dir: str = None) -> str:
+    return os.path.join(recordings_dir or RECORDINGS_DIR, f"{key}.json")
+
+
+def load_recording(key: str, recordings_dir: str = None) -> dict:
+    path = recording_path(key, recordings_dir)
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"No LLM recording for this document/request ({path}) - "
+            f"run once with HUBBLE_LLM_MODE=record to create it"
+        )
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class StreamRecorder:
+    """Collects chunks with inter-chunk delays while a live stream is consumed"""
+
+    def __init__(self, key: str, model: str, user_request: Optional[str] = None):
+        self.key = key
+        self.model = model
+        self.user_request = user_request
+        self.chunks: List[dict] = []
+        self._last = time.perf_counter()
+
+    def add(self, text: str) -> None:
+        now = time.perf_counter()
+        self.chunks.append({"delay": round(now - self._last, 4), "text": text})
+        self._last = now
+
+    def save(self, usage: dict, recordings_dir: str = None) -> str:
+        path = recording_path(self.key, recordings_dir)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "key": self.key,
+                "model": self.model,
+                "user_request": self.user_request,
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "usage": usage,
+                "chunks": self.chunks,
+            }, f, indent=1)
+        os.replace(tmp_path, path)
+        print(f"[SUCCESS] LLM response recorded to {path} ({len(self.chunks)} chunks)")
+        return path
+
+
+async def replay_chunks(recording: dict, speed: float = None) -> AsyncIterator[str]:
+    """Yield recorded chunks with their original delays divided by speed"""
+    speed = REPLAY_SPEED if speed is None else speed
+    for chunk in recording["chunks"]:
+        if speed > 0 and chunk["delay"] > 0:
+            await asyncio.sleep(chunk["delay"] / speed)
+        yield chunk["text"]
@@ -0,0 +1,232 @@
+"""
+Incremental re-extraction of revised documents: page and chunk fingerprints.
+
+A v2 of a filing usually changes a few paragraphs, yet a full extraction re-sends every page to
+the model. Each single-document session stores fingerprints of its text (in the state backend):
+
+- one hash per page (the page's text without boilerplate, whitespace normalized)
+- one hash per chunk: the document's text is read as one stream, boilerplate lines (running
+  headers, Bates numbers, "Page x of y") dropped, and cut at sentence ends and blank lines, so
+  an insertion that pushes every later sentence onto a different page changes no other chunk
+
+A new upload's chunk hashes are looked up in the state backend's inverted index (a bottom-k
+sample, so the lookup costs the same for any document size). When at least MIN_SHARED of its
+chunks belong to one known document, only the pages holding new chunks are sent to the model
+(pages whose hash matches a known page never are). The previous session's events are carried
+over, minus those whose every source passage (textindex links) touched a removed chunk, and
+merged with the events of the changed pages (merge.merge_timelines dedupes the overlap).
+"""
+
+import hashlib
+import os
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import compaction
+import passages
+import serialization
+from merge import merge_timelines
+from models import TimelineData
+
+REVISIONS_ENABLED = os.getenv("HUBBLE_REVISIONS", "1") == "1"
+MIN_SHARED = float(os.getenv("HUBBLE_REVISION_MIN_SHARED", "0.6"))  # Share of the new document's chunks
+MIN_CHUNKS = 5  # Shorter documents are always extracted in full
+MIN_CHUNK_CHARS = 20  # Shorter chunks ("Id.", "1.") are too common to identify anything
+SAMPLE_CHUNKS = 1024  # Chunk hashes looked up per upload (the smallest ones: a uniform sample)
+CANDIDATES = 3
+
+_CHUNK_END = re.compile(r"[.!?][\"')\]]*(?=\s|$)")
+_SPACES = re.compile(r"\s+")
+
+
+def _hash(text: str) -> int:
+    """Signed 64-bit hash (fits an SQLite INTEGER)"""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+
+def fingerprint_pages(iter_pages: Callable[[], Iterable[str]]) -> dict:
+    """
+    Fingerprints of a document given a callable that iterates its pages (called twice, like
+    compaction.compact_pages).
+
+    Returns {"pages": n, "page_hashes": [...], "chunks": [[hash, page, start, end_page, end], ...]}:
+    chunk spans are character offsets in the raw page texts (as in textindex links), and may
+    continue onto later pages.
+    """
+    boilerplate, _ = compaction.find_boilerplate(iter_pages())
+    page_hashes: List[int] = []
+    chunks: List[list] = []
+    words: List[str] = []
+    span: list = []  # [page, start, end_page, end] of the open chunk
+
+    def add(piece: str, page: int, start: int, end: int):
+        if not words:
+            span[:] = [page, start, page, end]
+        span[2:] = [page, end]
+        words.extend(piece.split())
+
+    def close():
+        text = " ".join(words).lower()
+        if len(text) >= MIN_CHUNK_CHARS:
+            chunks.append([_hash(text), *span])
+        words.clear()
+
+    page_number = 0
+    for page_number, page in enumerate(iter_pages(), start=1):
+        page_hashes.append(_hash(_normalize(compaction.clean_page(page, boilerplate)[0])))
+        offset = 0
+        for line in page.split("\n"):
+            line_start, offset = offset, offset + len(line) + 1
+            normalized = _SPACES.sub(" ", line).strip()
+            if not normalized:
+                close()  # Blank line: paragraph end
+                continue
+            if compaction.is_boilerplate(normalized, boilerplate):
+                continue
+            position = 0
+            for match in _CHUNK_END.finditer(line):
+                add(line[position:match.end()], page_number, line_start + position, line_start + match.end())
+                close()
+                position = match.end()
+            if line[position:].strip():
+                add(line[position:], page_number, line_start + position, line_start + len(line))
+    close()
+    return {"pages": page_number, "page_hashes": page_hashes, "chunks": chunks}
+
+
+def chunk_hashes(fingerprints: dict) -> List[int]:
+    return sorted({chunk[0] for chunk in fingerprints["chunks"]})
+
+
+def compare(fingerprints: dict, previous: dict) -> dict:
+    """
+    What changed between a known document's fingerprints and a new version's.
+
+    Returns {"shared": share of the new version's chunks already known, "changed_pages": new
+    pages holding new chunks, "removed": previous chunks gone from the new version, plus counts}.
+    """
+    known = {chunk[0] for chunk in previous["chunks"]}
+    current = {chunk[0] for chunk in fingerprints["chunks"]}
+    added = [chunk for chunk in fingerprints["chunks"] if chunk[0] not in known]
+    previous_pages = set(previous["page_hashes"])
+    identical = {page for page, h in enumerate(fingerprints["page_hashes"], start=1) if h in previous_pages}
+    changed = {page for _, start_page, _, end_page, _ in added for page in range(start_page, end_page + 1)}
+    return {
+        "shared": round(1 - len({chunk[0] for chunk in added}) / len(current), 4) if current else 0.0,
+        "changed_pages": sorted(changed - identical),
+        "removed": [chunk for chunk in previous["chunks"] if chunk[0] not in current],
+        "pages": fingerprints["pages"],
+        "pages_identical": len(identical),
+        "chunks": len(fingerprints["chunks"]),
+        "chunks_added": len(added),
+    }
+
+
+def request_hash(user_request: Optional[str]) -> str:
+    """The extraction request a session was built for, as stored in its fingerprint record"""
+    return hashlib.sha256((user_request or "").encode("utf-8")).hexdigest()[:16]
+
+
+def find_revision(state, fingerprints: dict, user_request: Optional[str] = None) -> Optional[dict]:
+    """
+    The known document this one is a revision of, if any: compare() results plus "document_id",
+    "session_id" and "name" of the previous version. None below MIN_SHARED, or when the previous
+    session is gone. Only sessions extracted for the same user_request are reused: another
+    request asks the model for other events.
+    """
+    hashes = chunk_hashes(fingerprints)
+    if len(hashes) < MIN_CHUNKS:
+        return None
+    sample = hashes[:SAMPLE_CHUNKS]
+    for document_id, shared in state.match_fingerprints(sample, CANDIDATES):
+        if shared / len(sample) < MIN_SHARED:
+            break
+        data = state.get_fingerprints(document_id)
+        if data is None:
+            continue
+        previous = serialization.loads(data)
+        if previous.get("request") != request_hash(user_request):
+            continue
+        if state.get_session(previous["session_id"]) is None:
+            continue
+        changes = compare(fingerprints, previous)
+        if changes["shared"] >= MIN_SHARED:
+            return {"document_id": document_id, "session_id": previous["session_id"],
+                    "name": previous.get("name"), **changes}
+    return None
+
+
+def fingerprint_record(fingerprints: dict, session_id: str, name: str, user_request: Optional[str] = None) -> str:
+    """What state.save_fingerprints stores for a document"""
+    return serialization.dumps({"session_id": session_id, "name": name, "request": request_hash(user_request),
+                                **fingerprints})
+
+
+def _removed_by_page(removed: List[list]) -> Dict[int, List[Tuple[int, float]]]:
+    spans: Dict[int, List[Tuple[int, float]]] = {}
+    for _, start_page, start, end_page, end in removed:
+        for page in range(start_page, end_page + 1):
+            spans.setdefault(page, []).append((start if page == start_page else 0,
+                                               end if page == end_page else float("inf")))
+    return spans
+
+
+def carry_over(previous: TimelineData, links: Optional[List[List[dict]]],
+               removed: List[list]) -> Tuple[TimelineData, int]:
+    """
+    The previous version's timeline without events whose every source passage touches removed
+    text; events without links are kept. Returns (timeline, events dropped).
+    """
+    if not removed or not links:
+        return previous, 0
+    spans = _removed_by_page(removed)
+
+    def touched(link: dict) -> bool:
+        return any(start < link["end"] and link["start"] < end for start, end in spans.get(link["page"], ()))
+
+    kept = [e for e, sources in zip(previous.events, links) if not (sources and all(map(touched, sources)))]
+    kept.extend(previous.events[len(links):])
+    return previous.model_copy(update={"events": kept}), len(previous.events) - len(kept)
+
+
+def changed_text(iter_pages: Callable[[], Iterable[str]], pages: List[int], max_chars: int) -> Tuple[str, dict]:
+    """
+    The changed pages for the model, "[p. N]" marked like focused passages; when they do not fit
+    max_chars, their ranked date passages (passages.select_passages) instead.
+    """
+    wanted = set(pages)
+    cleaned = [(number, text) for number, text in enumerate(compaction.clean_pages(iter_pages), start=1)
+               if number in wanted]
+    text = "\n\n".join(f"[p. {number}] {page}" for number, page in cleaned)
+    if len(text) <= max_chars:
+        return text, {"pages_sent": pages, "chars_sent": len(text), "passages_only": False}
+    found = passages.index_passages(compaction.clean_pages(iter_pages))
+    text, chosen = passages.select_passages([p for p in found if p["page"] in wanted], max_chars)
+    return text, {"pages_sent": sorted({p["page"] for p in chosen}), "chars_sent": len(text), "passages_only": True}
+
+
+def apply_revision(carried: TimelineData, changes: Optional[TimelineData], revision: dict) -> Tuple[TimelineData, dict]:
+    """Carried-over events merged with the changed pages' events; (timeline, merge stats)"""
+    note = (f"Revision of {revision['name'] or 'a known document'}: {len(revision['changed_pages'])} of "
+            f"{revision['pages']} pages re-extracted")
+    if changes is None or not changes.events:
+        config = carried.visualization_config
+        updated = config.model_copy(update={"visualization_rationale": note}) if config else None
+        return carried.model_copy(update={"visualization_config": updated}), {}
+    merged, stats = merge_timelines([carried, changes], matter_name=carried.case.name)
+    if merged.visualization_config:
+        merged.visualization_config = merged.visualization_config.model_copy(
+            update={"visualization_rationale": note})
+    return merged, stats
+
+
+def revision_stats(revision: dict) -> dict:
+    """The revision summary for progress events and payloads"""
+    stats = {key: revision[key] for key in ("document_id", "session_id", "name", "shared", "pages",
+                                            "pages_identical", "chunks", "chunks_added")}
+    stats.update(pages_changed=revision["changed_pages"], chunks_removed=len(revision["removed"]))
+    return stats
@@ -0,0 +1,67 @@
+"""
+One serialization path for models, SSE frames, stored state and chart data.
+
+Pydantic models go through pydantic v2's Rust core (model_dump_json / model_validate_json)
+without building intermediate dicts. Plain dicts use orjson when installed, otherwise the
+stdlib json module. Output is always compact: no indentation, no spaces after separators,
+non-ASCII text as UTF-8 rather than \\u escapes.
+
+benchmarks/bench_serialization.py compares this with the old json.dumps/.dict() path.
+"""
+
+import json
+from typing import Any, Optional, Type, TypeVar, Union
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # orjson is optional - the stdlib encoder produces the same JSON, slower
+    orjson = None
+
+from models import TimelineData
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """Encoder fallback: pydantic models nested in plain payloads"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> str:
+    """Compact JSON text for a plain payload (dicts, lists, scalars; nested models allowed)"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump_json()
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode("utf-8")
+    return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_model(model: Type[ModelT], data: Union[str, bytes, dict]) -> ModelT:
+    """Validate a model straight from JSON text (no intermediate dict) or from a dict"""
+    if isinstance(data, dict):
+        return model.model_validate(data)
+    return model.model_validate_json(data)
+
+
+def load_timeline(data: Union[str, bytes, dict, None]) -> Optional[TimelineData]:
+    return None if data is None else load_model(TimelineData, data)
+
+
+def sse_frame(payload: dict) -> str:
+    """One Server-Sent Events frame"""
+    return f"data: {dumps(payload)}\n\n"
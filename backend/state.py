@@ -0,0 +1,307 @@
+import fcntl
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from collections import Counter
+from typing import ContextManager, Dict, Iterator, List, Optional, Set, Tuple
+
+import serialization
+
+
+class StateBackend(ABC):
+    """
+    Shared state for sessions, job status and artifact metadata.
+
+    Everything a request may need from another request lives here (never in module globals),
+    so any uvicorn worker - or any node sharing the state directory - can serve any request.
+    Sessions are TimelineData JSON text (written with model_dump_json, read back with
+    serialization.load_timeline), versioned: every save bumps the session's version, so clients
+    holding an older copy can tell. Jobs and artifact metadata are plain JSON-serializable dicts.
+    Document fingerprints (revisions.py) are JSON text plus their chunk hashes, indexed so a new
+    upload finds the known documents it shares chunks with.
+    """
+
+    @abstractmethod
+    def save_session(self, session_id: str, data: str) -> int:
+        """Store a session; returns its new version (1 for a new session)"""
+        ...
+
+    @abstractmethod
+    def get_session(self, session_id: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def get_session_version(self, session_id: str) -> Optional[Tuple[str, int]]:
+        """(data, version) of a session"""
+        ...
+
+    @abstractmethod
+    def update_job(self, job_id: str, status: str, **fields) -> None:
+        """Create or update a job; fields are merged into the existing job record"""
+        ...
+
+    @abstractmethod
+    def get_job(self, job_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def put_artifact(self, name: str, metadata: dict) -> None:
+        ...
+
+    @abstractmethod
+    def get_artifact(self, name: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def save_fingerprints(self, document_id: str, chunk_hashes: List[int], data: str) -> None:
+        ...
+
+    @abstractmethod
+    def get_fingerprints(self, document_id: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def match_fingerprints(self, chunk_hashes: List[int], limit: int = 3) -> List[Tuple[str, int]]:
+        """(document_id, chunk_hashes shared) of the best-matching known documents, most shared first"""
+        ...
+
+    @abstractmethod
+    def lock(self, name: str) -> ContextManager[None]:
+        """Exclusive lock across every worker sharing this backend"""
+        ...
+
+
+class MemoryStateBackend(StateBackend):
+    """Single-process backend (tests, `python main.py` with one worker)"""
+
+    def __init__(self):
+        self._sessions: Dict[str, Tuple[str, int]] = {}
+        self._jobs: Dict[str, dict] = {}
+        self._artifacts: Dict[str, dict] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self._chunks: Dict[int, Set[str]] = {}  # Chunk hash -> documents containing it
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def save_session(self, session_id: str, data: str) -> int:
+        with self._guard:
+            version = self._sessions.get(session_id, (None, 0))[1] + 1
+            self._sessions[session_id] = (data, version)
+        return version
+
+    def get_session(self, session_id: str) -> Optional[str]:
+        session = self._sessions.get(session_id)
+        return session[0] if session else None
+
+    def get_session_version(self, session_id: str) -> Optional[Tuple[str, int]]:
+        return self._sessions.get(session_id)
+
+    def update_job(self, job_id: str, status: str, **fields) -> None:
+        job = self._jobs.setdefault(job_id, {"job_id": job_id, "created_at": time.time()})
+        job.update(fields)
+        job["status"] = status
+        job["updated_at"] = time.time()
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+    def put_artifact(self, name: str, metadata: dict) -> None:
+        self._artifacts[name] = metadata
+
+    def get_artifact(self, name: str) -> Optional[dict]:
+        return self._artifacts.get(name)
+
+    def save_fingerprints(self, document_id: str, chunk_hashes: List[int], data: str) -> None:
+        with self._guard:
+            self._fingerprints[document_id] = data
+            for chunk_hash in set(chunk_hashes):
+                self._chunks.setdefault(chunk_hash, set()).add(document_id)
+
+    def get_fingerprints(self, document_id: str) -> Optional[str]:
+        return self._fingerprints.get(document_id)
+
+    def match_fingerprints(self, chunk_hashes: List[int], limit: int = 3) -> List[Tuple[str, int]]:
+        shared: Counter = Counter()
+        for chunk_hash in set(chunk_hashes):
+            shared.update(self._chunks.get(chunk_hash, ()))
+        return shared.most_common(limit)
+
+    @contextmanager
+    def lock(self, name: str) -> Iterator[None]:
+        with self._guard:
+            named_lock = self._locks.setdefault(name, threading.Lock())
+        with named_lock:
+            yield
+
+
+class SQLiteStateBackend(StateBackend):
+    """
+    Local-filesystem backend: one SQLite database plus flock() lock files in state_dir.
+
+    Safe across worker processes on one host, and across nodes that mount the same volume
+    (SQLite's rollback journal is used rather than WAL, which needs shared memory on one host).
+    """
+
+    MATCH_BATCH = 500
+
+    def __init__(self, state_dir: str):
+        self.state_dir = state_dir
+        self.db_path = os.path.join(state_dir, "hubble.db")
+        self.lock_dir = os.path.join(state_dir, "locks")
+        os.makedirs(self.lock_dir, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    version INTEGER NOT NULL DEFAULT 1
+                );
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS artifacts (
+                    name TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    document_id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS fingerprint_chunks (
+                    hash INTEGER NOT NULL,
+                    document_id TEXT NOT NULL,
+                    PRIMARY KEY (hash, document_id)
+                ) WITHOUT ROWID;
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+            if "version" not in columns:  # Databases created before sessions were versioned
+                conn.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A short-lived connection per operation keeps this safe across threads and processes
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def save_session(self, session_id: str, data: str) -> int:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO sessions (session_id, data, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (session_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at, "
+                "version = sessions.version + 1",
+                (session_id, data, time.time())
+            )
+            # Same transaction, so this is the version just written
+            return conn.execute("SELECT version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()[0]
+
+    def get_session(self, session_id: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def get_session_version(self, session_id: str) -> Optional[Tuple[str, int]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT data, version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def update_job(self, job_id: str, status: str, **fields) -> None:
+        with self._connect() as conn:
+            # BEGIN IMMEDIATE so the read-merge-write is atomic across processes
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            job = serialization.loads(row[0]) if row else {"job_id": job_id, "created_at": time.time()}
+            job.update(fields)
+            job["status"] = status
+            job["updated_at"] = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, status, data, updated_at) VALUES (?, ?, ?, ?)",
+                (job_id, status, serialization.dumps(job), job["updated_at"])
+            )
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return serialization.loads(row[0]) if row else None
+
+    def put_artifact(self, name: str, metadata: dict) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO artifacts (name, data, created_at) VALUES (?, ?, ?)",
+                (name, serialization.dumps(metadata), time.time())
+            )
+
+    def get_artifact(self, name: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM artifacts WHERE name = ?", (name,)).fetchone()
+        return serialization.loads(row[0]) if row else None
+
+    def save_fingerprints(self, document_id: str, chunk_hashes: List[int], data: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO fingerprints (document_id, data, created_at) VALUES (?, ?, ?)",
+                (document_id, data, time.time())
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO fingerprint_chunks (hash, document_id) VALUES (?, ?)",
+                ((chunk_hash, document_id) for chunk_hash in set(chunk_hashes))
+            )
+
+    def get_fingerprints(self, document_id: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM fingerprints WHERE document_id = ?", (document_id,)).fetchone()
+        return row[0] if row else None
+
+    def match_fingerprints(self, chunk_hashes: List[int], limit: int = 3) -> List[Tuple[str, int]]:
+        shared: Counter = Counter()
+        unique = list(set(chunk_hashes))
+        with self._connect() as conn:
+            # Batches stay under SQLite's bound-parameter limit; each is an index seek per hash
+            for i in range(0, len(unique), self.MATCH_BATCH):
+                batch = unique[i:i + self.MATCH_BATCH]
+                rows = conn.execute(
+                    f"SELECT document_id, COUNT(*) FROM fingerprint_chunks "
+                    f"WHERE hash IN ({', '.join('?' * len(batch))}) GROUP BY document_id", batch
+                ).fetchall()
+                for document_id, count in rows:
+                    shared[document_id] += count
+        return shared.most_common(limit)
+
+    @contextmanager
+    def lock(self, name: str) -> Iterator[None]:
+        lock_path = os.path.join(self.lock_dir, f"{name}.lock")
+        with open(lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def create_state_backend() -> StateBackend:
+    """
+    Build the backend selected by environment:
+
+    - HUBBLE_STATE_BACKEND: "sqlite" (default, multi-worker safe) or "memory"
+    - HUBBLE_STATE_DIR: directory for the database and lock files (default output/state)
+    """
+    kind = os.getenv("HUBBLE_STATE_BACKEND", "sqlite").lower()
+    if kind == "memory":
+        return MemoryStateBackend()
+    if kind == "sqlite":
+        return SQLiteStateBackend(os.getenv("HUBBLE_STATE_DIR", "output/state"))
+    raise ValueError(f"Unknown HUBBLE_STATE_BACKEND: {kind}")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Interval index checks: overlap queries against a brute-force scan, and inverted intervals"""
+
+import random
+from datetime import date, timedelta
+
+import analytics
+from eventstore import NO_DAY, EventStore, parse_day
+from intervals import IntervalIndex
+from models import CaseMetadata, Event, TimelineData
+
+ACTORS = ["Dr. Eleanor Park - CSO", "Marcus Hale - CFO", "Sophia Martinez - CEO", "FDA", "Jordan Lee - CFO"]
+
+
+def random_timeline(n_events: int, seed: int) -> TimelineData:
+    """Bars, milestones and open-ended events, some with month/year dates, some inverted"""
+    rng = random.Random(seed)
+    first = date(2015, 1, 1)
+    events = []
+    for _ in range(n_events):
+        start = first + timedelta(days=rng.randrange(3000))
+        kind = rng.random()
+        if kind < 0.15:
+            end = None
+        elif kind < 0.25:
+            end = start - timedelta(days=rng.randrange(1, 400))  # Inverted: end before start
+        else:
+            end = start + timedelta(days=rng.randrange(0, 900))
+        start_text = start.isoformat() if rng.random() < 0.8 else start.isoformat()[:7]
+        events.append(Event(actor=rng.choice(ACTORS), action="served", roleType=rng.choice(["Executive", "Other"]),
+                            start=start_text, end=end.isoformat() if end else None, context="",
+                            milestone=rng.random() < 0.05))
+    return TimelineData(case=CaseMetadata(name="Test"), events=events)
+
+
+def brute_force(timeline: TimelineData, start_day: int, end_day: int) -> set:
+    """Events overlapping [start_day, end_day], one comparison per event"""
+    found = set()
+    for row, event in enumerate(timeline.events):
+        start = parse_day(event.start)[0]
+        end = parse_day(event.end)[0] if event.end is not None else start
+        if start == NO_DAY or end == NO_DAY or end < start:
+            continue
+        if start <= end_day and end >= start_day:
+            found.add(row)
+    return found
+
+
+def test_overlapping_matches_brute_force():
+    rng = random.Random(7)
+    for seed in range(5):
+        timeline = random_timeline(400, seed)
+        index = IntervalIndex(EventStore.from_timeline(timeline))
+        for _ in range(50):
+            a, b = sorted(rng.randrange(16000, 20000) for _ in range(2))
+            rows = index.overlapping(a, b).tolist()
+            assert len(rows) == len(set(rows)), "an event was returned twice"
+            assert set(rows) == brute_force(timeline, a, b)
+
+
+def test_inverted_interval():
+    timeline = TimelineData(case=CaseMetadata(name="Test"), events=[
+        Event(actor="Marcus Hale - CFO", action="served as CFO", roleType="Executive",
+              start="2020-05-01", end="2019-01-01", context=""),
+        Event(actor="Jordan Lee - CFO", action="served as CFO", roleType="Executive",
+              start="2019-06-01", end="2021-01-01", context=""),
+    ])
+    store = EventStore.from_timeline(timeline)
+    assert store.dated_mask().tolist() == [False, True]
+
+    index = IntervalIndex(store)  # Used to recurse until RecursionError
+    day = parse_day("2019-09-01")[0]
+    assert index.overlapping(day, day).tolist() == [1]
+    assert index.window(day, day)["bar_count"] == 1
+
+    # The inverted bar is not counted as overlapping the other CFO's tenure
+    assert analytics.analyze(store)["summary"]["overlapping_pairs"] == 0
+
+
+if __name__ == "__main__":
+    test_overlapping_matches_brute_force()
+    test_inverted_interval()
+    print("[SUCCESS] intervals")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Matter merge checks: actor aliases across documents and duplicate events"""
+
+import merge
+from models import CaseMetadata, Event, TimelineData
+
+PARK = "Eleanor Park - Chief Scientific Officer (Original)"
+
+
+def event(actor: str, start: str, end: str = None, action: str = "served as CSO", context: str = "",
+          milestone: bool = False) -> Event:
+    return Event(actor=actor, action=action, roleType="Scientific Leadership", start=start, end=end,
+                 context=context, milestone=milestone)
+
+
+def test_resolve_actors_aliases():
+    canonical, stats = merge.resolve_actors({
+        "Dr. Eleanor Park - CSO": 3, "Park, Eleanor": 2, "E. Park": 1, PARK: 1,
+        "Michael Chen - CFO": 2, "Michael Chen - CEO": 2, "Michael Chen": 1,
+    })
+    # Honorific, "Last, First", an initial and the spelled-out title are one actor
+    for alias in ("Dr. Eleanor Park - CSO", "Park, Eleanor", "E. Park", PARK):
+        assert canonical[alias] == PARK
+    # Different titles are different chart rows; an untitled name matching both stays on its own
+    assert canonical["Michael Chen - CFO"] == "Michael Chen - CFO"
+    assert canonical["Michael Chen - CEO"] == "Michael Chen - CEO"
+    assert canonical["Michael Chen"] == "Michael Chen"
+    assert stats["comparisons"] < stats["all_pairs"]
+
+
+def test_dedupe_events():
+    events = [
+        event("P", "2019-06-15", "2021-09-15"),
+        event("P", "2019-06", "2021-09-15"),  # Document 1's copy, less precise start
+        event("P", "2019-06-15", "2021-09-15"),  # Same document as the first: never merged
+        event("FDA", "2023-03-15", action="opened informal inquiry", milestone=True),
+        event("FDA", "2023-03-18", action="informal inquiry opened", milestone=True),
+        event("FDA", "2023-06-01", action="issued warning letter", milestone=True),
+    ]
+    kept = merge.dedupe_events(events, [0, 1, 0, 0, 1, 1])
+    assert [(e.actor, e.start) for e in kept] == [
+        ("P", "2019-06-15"), ("P", "2019-06-15"), ("FDA", "2023-03-15"), ("FDA", "2023-06-01"),
+    ]
+
+
+def test_merge_timelines():
+    first = TimelineData(case=CaseMetadata(name="Complaint"), events=[
+        event("Dr. Eleanor Park - CSO", "2019-06-15", "2021-09-15")])
+    second = TimelineData(case=CaseMetadata(name="Deposition"), events=[
+        event("Park, Eleanor", "2019-06-15", "2021-09-15", context="Terminated after raising concerns"),
+        event("Marcus Hale - CFO", "2019-01-01", "2023-04-03", action="served as CFO")])
+    merged, stats = merge.merge_timelines([first, second], "NexVira")
+    assert stats["events_in"] == 3 and stats["events_out"] == 2
+    assert [e.actor for e in merged.events] == ["Marcus Hale - CFO", "Dr. Eleanor Park - CSO"]
+    assert merged.events[1].context == "Terminated after raising concerns"  # The more informative copy
+
+
+if __name__ == "__main__":
+    test_resolve_actors_aliases()
+    test_dedupe_events()
+    test_merge_timelines()
+    print("[SUCCESS] merge")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""JSON Patch checks: diff/apply round trips, with values Python's == confuses"""
+
+import random
+
+import patches
+import serialization
+
+SCALARS = [0, 1, 2, 1.0, 0.0, True, False, None, "", "a", "b", "a/b", "~1"]
+
+
+def random_value(rng: random.Random, depth: int = 0):
+    kind = rng.random()
+    if depth >= 3 or kind < 0.5:
+        return rng.choice(SCALARS)
+    if kind < 0.75:
+        return [random_value(rng, depth + 1) for _ in range(rng.randrange(5))]
+    return {rng.choice(["a", "b", "c", "a/b", "~"]): random_value(rng, depth + 1) for _ in range(rng.randrange(4))}
+
+
+def mutate(rng: random.Random, value):
+    """A copy of value with a few changes at random depths"""
+    if isinstance(value, list):
+        value = [mutate(rng, v) if rng.random() < 0.3 else v for v in value]
+        if value and rng.random() < 0.3:
+            value.insert(rng.randrange(len(value)), value.pop(rng.randrange(len(value))))  # Move one element
+        if rng.random() < 0.2:
+            value.insert(rng.randrange(len(value) + 1), random_value(rng, 2))
+        if value and rng.random() < 0.2:
+            del value[rng.randrange(len(value))]
+        return value
+    if isinstance(value, dict):
+        value = {k: mutate(rng, v) if rng.random() < 0.3 else v for k, v in value.items()}
+        if rng.random() < 0.2:
+            value[rng.choice(["a", "b", "d"])] = random_value(rng, 2)
+        return value
+    return rng.choice(SCALARS) if rng.random() < 0.5 else value
+
+
+def check_round_trip(old, new):
+    patched = patches.apply(old, patches.diff(old, new))
+    # Compared as JSON text: False == 0 and 1 == 1.0 would pass a plain ==
+    assert serialization.dumps(patched) == serialization.dumps(new), (old, new, patches.diff(old, new))
+
+
+def test_nested_types():
+    check_round_trip([False, 0], [0, False])
+    check_round_trip({"a": {"c": 0}}, {"a": {"c": False}})
+    check_round_trip({"a": [1, 2]}, {"a": [1.0, 2]})
+    check_round_trip([[True], [1]], [[1], [True]])
+    assert patches.diff({"a": [1, None]}, {"a": [1, None]}) == []
+
+
+def test_round_trip_fuzz():
+    rng = random.Random(1)
+    for _ in range(5000):
+        old = random_value(rng)
+        check_round_trip(old, mutate(rng, old))
+        check_round_trip(old, random_value(rng))
+
+
+if __name__ == "__main__":
+    test_nested_types()
+    test_round_trip_fuzz()
+    print("[SUCCESS] patches")
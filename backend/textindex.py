@@ -0,0 +1,543 @@
+"""
+Per-document full-text index with page/character provenance.
+
+Extraction keeps nothing but the timeline, so a bar in the chart could not be traced back to the
+page that supports it. build_index() runs at ingestion over the spooled pages and writes one
+compressed file per document:
+
+- a sorted term dictionary (zlib) with the number of pages each term is on
+- postings per term: (token position, page, character offset in the page) triples,
+  delta-encoded and stored as LEB128 varints (~4 bytes per occurrence)
+- each page's text as its own zlib block, so a hit only inflates the page it is on
+
+TextIndex answers term and phrase queries ("general counsel" AND resigned) per page with BM25
+scores and snippets, reading only the postings of the query terms. link_events() finds each
+extracted event's best-supporting passages: windows around its actor's name that also contain
+its action/target/context words and the years and months of its dates.
+
+Files live in HUBBLE_INDEX_DIR (default output/index - not served by /output/). Each session
+also gets a small sources file naming its documents' indexes and holding its event links.
+"""
+
+import gzip
+import math
+import os
+import re
+import struct
+import threading
+import zlib
+from array import array
+from collections import OrderedDict, defaultdict
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import metrics
+import serialization
+from eventstore import DAY, EPOCH_ORDINAL, MONTH, NO_DAY, parse_day
+from merge import name_tokens
+from models import Event
+
+INDEX_ENABLED = os.getenv("HUBBLE_TEXT_INDEX", "1") == "1"
+INDEX_DIR = os.getenv("HUBBLE_INDEX_DIR", os.path.join("output", "index"))
+CACHE_INDEXES = int(os.getenv("HUBBLE_TEXT_INDEX_CACHE", "16"))  # Open indexes kept per worker
+
+MAGIC = b"HUBIDX1\n"
+SNIPPET_CHARS = 90  # Context on each side of the first match in a snippet
+MAX_HIGHLIGHTS = 10
+# Tokens before / after an actor mention that count toward its passage (details follow a name)
+LINK_BEFORE, LINK_AFTER = 25, 100
+LINK_SOURCES = 3  # Passages kept per event
+BM25_K1, BM25_B = 1.2, 0.75
+
+_TOKEN = re.compile(r"\w+")
+_QUERY = re.compile(r'"([^"]+)"|(\S+)')
+_LINK_STOPWORDS = {"the", "and", "for", "with", "from", "that", "this", "was", "were", "has", "had", "have",
+                   "his", "her", "their", "its", "into", "onto", "upon", "as", "of", "to", "in", "on", "at",
+                   "by", "an", "a", "or", "be", "been", "is", "are", "served", "inc", "llc", "corp"}
+_MONTHS = ["january", "february", "march", "april", "may", "june", "july", "august", "september",
+           "october", "november", "december"]
+
+
+def tokenize(text: str) -> List[Tuple[str, int]]:
+    """(term, character offset) per word; terms are casefolded"""
+    return [(m.group().casefold(), m.start()) for m in _TOKEN.finditer(text)]
+
+
+# -- varints --------------------------------------------------------------------------------
+
+def varint_widths(values: np.ndarray) -> np.ndarray:
+    """Encoded bytes per value"""
+    v = values.astype(np.uint64)
+    widths = np.ones(len(v), dtype=np.int64)
+    for k in range(1, 10):
+        widths += v >= (1 << (7 * k))
+    return widths
+
+
+def encode_varints(values: np.ndarray) -> bytes:
+    """LEB128 encoding of non-negative integers, vectorized"""
+    v = values.astype(np.uint64)
+    widths = varint_widths(v)
+    ends = np.cumsum(widths)
+    starts = ends - widths
+    out = np.empty(int(ends[-1]) if len(v) else 0, dtype=np.uint8)
+    for k in range(int(widths.max()) if len(v) else 0):
+        has = widths > k
+        more = (widths[has] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[has] + k] = ((v[has] >> np.uint64(7 * k)) & np.uint64(0x7F)) | more
+    return out.tobytes()
+
+
+def decode_varints(data: bytes) -> np.ndarray:
+    b = np.frombuffer(data, dtype=np.uint8)
+    if not len(b):
+        return np.empty(0, dtype=np.int64)
+    last = np.flatnonzero((b & 0x80) == 0)
+    starts = np.concatenate(([0], last[:-1] + 1))
+    group = np.repeat(np.arange(len(last)), last - starts + 1)
+    shift = (np.arange(len(b)) - starts[group]) * 7
+    parts = (b & 0x7F).astype(np.uint64) << shift.astype(np.uint64)
+    # Values stay far below 2**53, so float64 sums are exact
+    return np.bincount(group, weights=parts.astype(np.float64), minlength=len(last)).astype(np.int64)
+
+
+# -- building -------------------------------------------------------------------------------
+
+def index_path(name: str) -> str:
+    return os.path.join(INDEX_DIR, f"{name}.idx")
+
+
+def build_index(pages: Iterable[str], path: str) -> dict:
+    """
+    Index one document's pages (in order, 1-based page numbers) into path.
+
+    Returns stats: pages, tokens, terms, text_bytes (UTF-8 of the pages) and index_bytes.
+    """
+    postings: Dict[str, array] = defaultdict(lambda: array("I"))  # term -> flat (position, page, offset)
+    page_blocks: List[bytes] = []
+    page_tokens: List[int] = []
+    position = text_bytes = 0
+    for page_number, text in enumerate(pages, start=1):
+        tokens = tokenize(text)
+        for term, offset in tokens:
+            postings[term].extend((position, page_number, offset))
+            position += 1
+        page_tokens.append(len(tokens))
+        data = text.encode("utf-8")
+        text_bytes += len(data)
+        page_blocks.append(zlib.compress(data, 6))
+
+    terms = sorted(postings)
+    lists = [np.frombuffer(postings[t], dtype=np.uint32).reshape(-1, 3).astype(np.int64) for t in terms]
+    counts = np.array([len(l) for l in lists], dtype=np.int64)
+    if lists:
+        flat = np.concatenate(lists)
+        first = np.zeros(len(flat), dtype=bool)
+        first[np.cumsum(counts) - counts] = True
+        # Delta-encode within each term's list: positions and pages always, character offsets
+        # while the page stays the same (they restart on every new page)
+        deltas = flat.copy()
+        deltas[1:] -= flat[:-1]
+        deltas[first] = flat[first]
+        new_page = deltas[:, 1] != 0
+        deltas[new_page, 2] = flat[new_page, 2]
+        widths = varint_widths(deltas.ravel()).reshape(-1, 3).sum(axis=1)
+        term_bytes = np.add.reduceat(widths, np.cumsum(counts) - counts) if len(widths) else widths
+        postings_blob = encode_varints(deltas.ravel())
+    else:
+        term_bytes, postings_blob = np.empty(0, dtype=np.int64), b""
+    term_offsets = np.concatenate(([0], np.cumsum(term_bytes))).astype(np.uint64)
+
+    # Pages containing each term, for idf
+    page_df = np.array([len(np.unique(l[:, 1])) for l in lists], dtype=np.uint32)
+
+    sections = [
+        zlib.compress("\n".join(terms).encode("utf-8"), 6),
+        zlib.compress(term_offsets.tobytes() + counts.astype(np.uint32).tobytes() + page_df.tobytes(), 6),
+        postings_blob,
+        *page_blocks,
+    ]
+    offsets = np.concatenate(([0], np.cumsum([len(s) for s in sections]))).tolist()
+    header = serialization.dumps({
+        "pages": len(page_blocks),
+        "tokens": position,
+        "terms": len(terms),
+        "page_tokens": page_tokens,
+        "sections": offsets,
+    }).encode("utf-8")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for section in sections:
+            f.write(section)
+    os.replace(tmp_path, path)
+    return {"pages": len(page_blocks), "tokens": position, "terms": len(terms), "text_bytes": text_bytes,
+            "index_bytes": os.path.getsize(path)}
+
+
+# -- querying -------------------------------------------------------------------------------
+
+class Occurrences:
+    """Matches of one term or phrase: parallel position/page/offset arrays sorted by position"""
+
+    def __init__(self, positions: np.ndarray, pages: np.ndarray, offsets: np.ndarray, length: int):
+        self.positions = positions
+        self.pages = pages
+        self.offsets = offsets
+        self.length = length  # Characters spanned by one match (approximate for phrases)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+class TextIndex:
+    """Read side of one index file; thread-safe, reads only what a query needs"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a text index: {path}")
+            (header_length,) = struct.unpack("<I", f.read(4))
+            header = serialization.loads(f.read(header_length))
+            self._base = len(MAGIC) + 4 + header_length
+            sections = header["sections"]
+            f.seek(self._base)
+            terms = zlib.decompress(f.read(sections[1] - sections[0])).decode("utf-8")
+            tables = zlib.decompress(f.read(sections[2] - sections[1]))
+        self.pages: int = header["pages"]
+        self.tokens: int = header["tokens"]
+        self.page_tokens = np.array(header["page_tokens"], dtype=np.float64)
+        self._sections = sections
+        self._terms = {term: i for i, term in enumerate(terms.split("\n"))} if terms else {}
+        n = len(self._terms)
+        self._term_offsets = np.frombuffer(tables, dtype=np.uint64, count=n + 1)
+        self._counts = np.frombuffer(tables, dtype=np.uint32, count=n, offset=8 * (n + 1))
+        self._page_df = np.frombuffer(tables, dtype=np.uint32, count=n, offset=8 * (n + 1) + 4 * n)
+        self._lock = threading.Lock()
+
+    def _read(self, offset: int, length: int) -> bytes:
+        with self._lock, open(self.path, "rb") as f:
+            f.seek(self._base + offset)
+            return f.read(length)
+
+    def page_df(self, term: str) -> int:
+        """Pages containing term"""
+        i = self._terms.get(term)
+        return 0 if i is None else int(self._page_df[i])
+
+    def idf(self, df: int) -> float:
+        return math.log(1 + (self.pages - df + 0.5) / (df + 0.5))
+
+    def term(self, term: str) -> Occurrences:
+        i = self._terms.get(term)
+        if i is None:
+            return Occurrences(_EMPTY, _EMPTY, _EMPTY, len(term))
+        start, end = int(self._term_offsets[i]), int(self._term_offsets[i + 1])
+        triples = decode_varints(self._read(self._sections[2] + start, end - start)).reshape(-1, 3)
+        positions = np.cumsum(triples[:, 0])
+        pages = np.cumsum(triples[:, 1])
+        # Offsets: running sums that restart where the page changes
+        totals = np.cumsum(triples[:, 2])
+        restarts = np.flatnonzero(triples[:, 1] != 0)
+        segment = np.cumsum(triples[:, 1] != 0) - 1
+        offsets = totals - (totals[restarts] - triples[restarts, 2])[segment]
+        return Occurrences(positions, pages, offsets, len(term))
+
+    def phrase(self, terms: Sequence[str]) -> Occurrences:
+        """Consecutive occurrences of terms (a single term is just its postings)"""
+        first = self.term(terms[0])
+        keep = np.ones(len(first), dtype=bool)
+        for i, term in enumerate(terms[1:], start=1):
+            if not keep.any():
+                break
+            keep &= np.isin(first.positions + i, self.term(term).positions)
+        length = sum(len(t) for t in terms) + len(terms) - 1
+        return Occurrences(first.positions[keep], first.pages[keep], first.offsets[keep], length)
+
+    def page_text(self, page: int) -> str:
+        start, end = self._sections[2 + page], self._sections[3 + page]
+        return zlib.decompress(self._read(start, end - start)).decode("utf-8")
+
+    def snippet(self, page: int, spans: List[Tuple[int, int]]) -> dict:
+        """Text around the first span on a page, with every span (page character offsets) listed"""
+        text = self.page_text(page)
+        spans = sorted(spans)
+        start = max(0, spans[0][0] - SNIPPET_CHARS)
+        end = min(len(text), spans[0][1] + SNIPPET_CHARS)
+        return {
+            "snippet": ("…" if start else "") + " ".join(text[start:end].split()) + ("…" if end < len(text) else ""),
+            "highlights": [[s, e] for s, e in spans[:MAX_HIGHLIGHTS]],
+        }
+
+    def search(self, parts: List[List[str]], limit: int = 20) -> Tuple[int, List[dict]]:
+        """
+        Pages matching every query part (a part is one term or a phrase), BM25-ranked.
+
+        Returns (matching page count, top hits: page, score, snippet, highlights).
+        """
+        matches = [self.phrase(part) for part in parts]
+        if not matches or any(len(m) == 0 for m in matches):
+            return 0, []
+        pages = None
+        for m in matches:
+            present = np.unique(m.pages)
+            pages = present if pages is None else np.intersect1d(pages, present, assume_unique=True)
+        if not len(pages):
+            return 0, []
+
+        average = self.page_tokens.mean() if self.pages else 1.0
+        length_norm = 1 - BM25_B + BM25_B * self.page_tokens[pages - 1] / average
+        scores = np.zeros(len(pages))
+        for m in matches:
+            tf = np.bincount(np.searchsorted(pages, m.pages[np.isin(m.pages, pages)]), minlength=len(pages))
+            idf = self.idf(len(np.unique(m.pages)))
+            scores += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm)
+
+        top = np.argsort(-scores, kind="stable")[:limit]
+        hits = []
+        for i in top.tolist():
+            page = int(pages[i])
+            spans = []
+            for m in matches:
+                on_page = m.pages == page
+                spans.extend((int(o), int(o) + m.length) for o in m.offsets[on_page][:MAX_HIGHLIGHTS])
+            hits.append({"page": page, "score": round(float(scores[i]), 3), **self.snippet(page, spans)})
+        return len(pages), hits
+
+
+def parse_query(query: str) -> List[List[str]]:
+    """'"general counsel" resigned' -> [["general", "counsel"], ["resigned"]]"""
+    parts = []
+    for phrase, word in _QUERY.findall(query):
+        terms = [term for term, _ in tokenize(phrase or word)]
+        if terms:
+            if phrase:
+                parts.append(terms)
+            else:
+                parts.extend([t] for t in terms)
+    return parts
+
+
+# -- event provenance -----------------------------------------------------------------------
+
+def _date_terms(value: Optional[str]) -> List[str]:
+    day, precision = parse_day(value)
+    if day == NO_DAY:
+        return []
+    when = date.fromordinal(day + EPOCH_ORDINAL)
+    terms = [str(when.year)]
+    if precision in (DAY, MONTH):
+        terms.append(_MONTHS[when.month - 1])
+    return terms
+
+
+def event_terms(event: Event) -> Tuple[List[str], List[str]]:
+    """(name terms, supporting terms) to look an event up by"""
+    names = [t for t in name_tokens(event.actor) if len(t) > 1]
+    support = []
+    for text in (event.action, event.target or "", event.context):
+        support.extend(term for term, _ in tokenize(text) if len(term) > 2 and term not in _LINK_STOPWORDS)
+    support.extend(_date_terms(event.start))
+    support.extend(_date_terms(event.end))
+    return list(dict.fromkeys(names)), [t for t in dict.fromkeys(support) if t not in names]
+
+
+def link_events(index: TextIndex, events: List[Event], top: int = LINK_SOURCES) -> List[List[dict]]:
+    """
+    Best-supporting passages per event in one document: {"page", "start", "end", "name", "score",
+    "terms"} - start/end span the matched terms, name is the actor mention's [start, end].
+
+    Anchors are mentions of the actor's full name (or of its rarest word when the document never
+    spells the name out); each scores the summed idf of the distinct event terms within
+    LINK_BEFORE/LINK_AFTER tokens on the same page. An anchor needs one supporting (non-name) term nearby,
+    two without the full name, so a bare name mention is not a source.
+    """
+    cache: Dict[str, Occurrences] = {}
+
+    def lookup(term: str) -> Occurrences:
+        if term not in cache:
+            cache[term] = index.term(term)
+        return cache[term]
+
+    links = []
+    for event in events:
+        names, support = event_terms(event)
+        present_names = [t for t in names if index.page_df(t)]
+        if not present_names:
+            links.append([])
+            continue
+        # The full name where the document spells it out, else its rarest word
+        anchors = index.phrase(names) if len(names) > 1 and len(present_names) == len(names) else None
+        full_name = anchors is not None and len(anchors) > 0
+        if full_name:
+            anchor_terms = set(names)
+            anchor_score = sum(index.idf(index.page_df(t)) for t in names)
+        else:
+            anchor_term = min(present_names, key=index.page_df)
+            anchors, anchor_terms = lookup(anchor_term), {anchor_term}
+            anchor_score = index.idf(index.page_df(anchor_term))
+        scores = np.full(len(anchors), anchor_score)
+        matched = np.ones(len(anchors), dtype=np.int64)
+        supported = np.zeros(len(anchors), dtype=np.int64)  # Matched event terms other than the name
+        spans_from = anchors.offsets.copy()
+        spans_to = anchors.offsets + anchors.length
+        for term in names + support:
+            if term in anchor_terms or not index.page_df(term):
+                continue
+            occ = lookup(term)
+            # Nearest occurrence on either side of each anchor, if within the window on the same page
+            after = np.searchsorted(occ.positions, anchors.positions)
+            candidates = []
+            for side in (np.minimum(after, len(occ) - 1), np.maximum(after - 1, 0)):
+                offset = occ.positions[side] - anchors.positions
+                valid = (offset >= -LINK_BEFORE) & (offset <= LINK_AFTER) & (occ.pages[side] == anchors.pages)
+                candidates.append((side, np.where(valid, np.abs(offset), np.iinfo(np.int64).max)))
+            (next_side, next_distance), (prev_side, prev_distance) = candidates
+            nearest = np.where(prev_distance < next_distance, prev_side, next_side)
+            hit = np.minimum(prev_distance, next_distance) != np.iinfo(np.int64).max
+            if not hit.any():
+                continue
+            scores += hit * index.idf(index.page_df(term))
+            matched += hit
+            if term not in names:
+                supported += hit
+            spans_from = np.where(hit, np.minimum(spans_from, occ.offsets[nearest]), spans_from)
+            spans_to = np.where(hit, np.maximum(spans_to, occ.offsets[nearest] + occ.length), spans_to)
+
+        # A spelled-out name needs one supporting term; a partial name needs two
+        needed = 1 if full_name else 2
+        found, pages_used = [], set()
+        for i in np.argsort(-scores, kind="stable").tolist():
+            if len(found) == top:
+                break
+            if supported[i] < needed:
+                continue
+            page = int(anchors.pages[i])
+            if page in pages_used:  # One passage per page
+                continue
+            pages_used.add(page)
+            anchor = int(anchors.offsets[i])
+            found.append({"page": page, "start": int(spans_from[i]), "end": int(spans_to[i]),
+                          "name": [anchor, anchor + anchors.length],
+                          "score": round(float(scores[i]), 3), "terms": int(matched[i])})
+        links.append(found)
+    return links
+
+
+def link_documents(paths: List[str], events: List[Event], top: int = LINK_SOURCES) -> List[List[dict]]:
+    """link_events over several documents' indexes (one at a time), best passages per event overall"""
+    best: List[List[dict]] = [[] for _ in events]
+    for document, path in enumerate(paths):
+        if not path or not os.path.exists(path):
+            continue
+        for sources, found in zip(best, link_events(TextIndex(path), events, top)):
+            sources.extend({"document": document, **link} for link in found)
+    return [sorted(s, key=lambda link: -link["score"])[:top] for s in best]
+
+
+def sources_path(session_id: str) -> str:
+    return os.path.join(INDEX_DIR, f"{session_id}.sources.json.gz")
+
+
+def save_sources(session_id: str, documents: List[dict], links: List[List[dict]]) -> None:
+    """
+    A session's documents ({"name", "index"}: index file name in INDEX_DIR) and event sources
+    (links[i] belongs to the session's event i, "document" indexes documents).
+    """
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    path = sources_path(session_id)
+    with gzip.open(f"{path}.tmp", "wt", encoding="utf-8") as f:
+        f.write(serialization.dumps({"documents": documents, "events": links}))
+    os.replace(f"{path}.tmp", path)
+
+
+def load_sources(session_id: str) -> Optional[dict]:
+    try:
+        with gzip.open(sources_path(session_id), "rt", encoding="utf-8") as f:
+            return serialization.loads(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def relink_sources(session_id: str, edited: Dict[int, Event]) -> int:
+    """
+    Re-link edited events ({event index: Event as edited}) in a session's saved sources, so a
+    changed actor or date does not keep the old event's passages. Returns the events re-linked
+    (0 when the session has no sources).
+    """
+    sources = load_sources(session_id)
+    if sources is None:
+        return 0
+    paths = [index_path(d["index"]) if d["index"] else None for d in sources["documents"]]
+    indexes = [i for i in sorted(edited) if i < len(sources["events"])]
+    for i, links in zip(indexes, link_documents(paths, [edited[i] for i in indexes])):
+        sources["events"][i] = links
+    save_sources(session_id, sources["documents"], sources["events"])
+    return len(indexes)
+
+
+def search_documents(documents: List[dict], parts: List[List[str]], limit: int,
+                     open_index: Callable[[str], Optional[TextIndex]]) -> Tuple[int, List[dict]]:
+    """search() over a session's documents; (matching pages in total, best hits overall with "document")"""
+    total, hits = 0, []
+    for document in documents:
+        index = open_index(index_path(document["index"])) if document["index"] else None
+        if index is None:
+            continue
+        found, document_hits = index.search(parts, limit)
+        total += found
+        hits.extend({"document": document["name"], **hit} for hit in document_hits)
+    hits.sort(key=lambda hit: -hit["score"])
+    return total, hits[:limit]
+
+
+def resolve_sources(documents: List[dict], links: List[dict],
+                    open_index: Callable[[str], Optional[TextIndex]]) -> List[dict]:
+    """An event's stored links with document names; the snippet is the passage, the name highlighted"""
+    resolved = []
+    for link in links:
+        document = documents[link["document"]]
+        index = open_index(index_path(document["index"]))
+        if index is None:
+            continue
+        text = index.page_text(link["page"])
+        resolved.append({**link, "document": document["name"],
+                         "snippet": " ".join(text[link["start"]:link["end"]].split()),
+                         "highlights": [link["name"]]})
+    return resolved
+
+
+class IndexCache:
+    """Per-worker LRU of open TextIndex objects by path (index files never change once written)"""
+
+    def __init__(self, max_indexes: int = CACHE_INDEXES):
+        self.max_indexes = max_indexes
+        self._indexes: "OrderedDict[str, TextIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Optional[TextIndex]:
+        with self._lock:
+            index = self._indexes.get(path)
+            if index is not None:
+                self._indexes.move_to_end(path)
+        metrics.record_cache("text_index", hit=index is not None)
+        if index is not None:
+            return index
+        if not os.path.exists(path):
+            return None
+        index = TextIndex(path)
+        with self._lock:
+            self._indexes[path] = index
+            while len(self._indexes) > self.max_indexes:
+                self._indexes.popitem(last=False)
+        return index
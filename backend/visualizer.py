@@ -1,14 +1,18 @@
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 from typing import List, Dict
 import os
+import time
 from models import TimelineData, Event
+from assets import asset_url
+import analytics
+import metrics
 
 class GanttVisualizer:
-    def __init__(self):
+    def __init__(self, export_png: bool = True):
         self.fig_width = 1600
         self.fig_height = 900
         self.output_format = "html"  # Default to interactive HTML
+        self.export_png = export_png  # False skips Kaleido (HTML-only workers, benchmarks without Chrome)
 
     def parse_date(self, date_str: str) -> datetime:
         """Parse flexible date formats: YYYY-MM-DD, YYYY-MM, or YYYY"""
@@ -40,7 +44,8 @@ class GanttVisualizer:
             days = delta.days
             return f"{days}d"
 
-    def generate_gantt(self, timeline_data: TimelineData, color_map: Dict[str, str], output_path: str = "output/timeline.png") -> str:
+    def generate_gantt(self, timeline_data: TimelineData, color_map: Dict[str, str], output_path: str = "output/timeline.png",
+                       timer: "metrics.RequestTimer" = None) -> str:
         """
         Generate professional Gantt chart using Plotly - matches NexVira template exactly.
 
@@ -51,6 +56,12 @@ class GanttVisualizer:
         - Duration labels on bars
         - Professional dark theme
         """
+        timer = timer or metrics.RequestTimer()
+
+        # Imported on first render (or by the warm-up hook) to keep app startup fast
+        import plotly.graph_objects as go
+
+        build_started = time.perf_counter()
 
         events = timeline_data.events
         case = timeline_data.case
@@ -118,8 +129,11 @@ class GanttVisualizer:
             colored_actor_names = actors
             actor_colors_map = {actor: '#1f2937' for actor in actors}
 
-        # Create figure
+        # Create figure. Shapes and annotations are collected and set in one update_layout:
+        # every add_shape / add_annotation re-validates all earlier ones (quadratic in events)
         fig = go.Figure()
+        shapes = []
+        annotations = []
 
         # Add horizontal bars as rectangles
         for event in bar_events:
@@ -146,7 +160,7 @@ class GanttVisualizer:
                 color = color_map.get(event.roleType, "#3b82f6")
 
             # Add rectangle for the bar
-            fig.add_shape(
+            shapes.append(dict(
                 type="rect",
                 x0=start_dt,
                 x1=end_dt,
@@ -155,14 +169,14 @@ class GanttVisualizer:
                 fillcolor=color,
                 line=dict(color='#ffffff', width=1.5),
                 opacity=0.85
-            )
+            ))
 
             # Add duration label annotation
             # Calculate midpoint using total_seconds to avoid timedelta serialization issues
             delta_seconds = (end_dt - start_dt).total_seconds()
             mid_date = start_dt + timedelta(seconds=delta_seconds / 2)
 
-            fig.add_annotation(
+            annotations.append(dict(
                 x=mid_date,
                 y=y_pos,
                 text=duration_label,
@@ -170,7 +184,7 @@ class GanttVisualizer:
                 font=dict(color='white', size=11, family='Inter, sans-serif'),
                 xanchor='center',
                 yanchor='middle'
-            )
+            ))
 
             # Note: Hover tooltips removed - chart is fully static
 
@@ -178,15 +192,21 @@ class GanttVisualizer:
         for milestone in milestone_events:
             milestone_dt = self.parse_date(milestone.start)
 
-            # Add vertical line
-            fig.add_vline(
-                x=milestone_dt,
+            # Add vertical line (what add_vline draws: full plot height)
+            shapes.append(dict(
+                type="line",
+                x0=milestone_dt,
+                x1=milestone_dt,
+                xref="x",
+                y0=0,
+                y1=1,
+                yref="y domain",
                 line=dict(color='#9ca3af', dash='dot', width=2),  # Gray for white background
                 opacity=0.7
-            )
+            ))
 
             # Add annotation at top
-            fig.add_annotation(
+            annotations.append(dict(
                 x=milestone_dt,
                 y=len(actors) - 0.5,
                 text=milestone.action,
@@ -195,16 +215,23 @@ class GanttVisualizer:
                 font=dict(size=9, color='#4b5563', family='Inter, sans-serif'),  # Darker gray for readability
                 xanchor='left',
                 yanchor='bottom'
-            )
+            ))
 
         # Add horizontal grid lines BETWEEN rows to create lanes (like NexVira)
         # Lines at -0.5, 0.5, 1.5, 2.5, ..., len(actors)-0.5
         for i in range(-1, len(actors)):
-            fig.add_hline(
-                y=i + 0.5,
+            shapes.append(dict(
+                type="line",
+                x0=0,
+                x1=1,
+                xref="x domain",
+                y0=i + 0.5,
+                y1=i + 0.5,
+                yref="y",
                 line=dict(color='#d1d5db', width=1),
                 opacity=0.5
-            )
+            ))
+        fig.update_layout(shapes=shapes, annotations=annotations)
 
         # Calculate statistics for header
         actor_count = len(actors)
@@ -319,26 +346,7 @@ class GanttVisualizer:
 
         # Add footer analysis note (like NexVira pattern explanation)
         # Use Claude's analysis if available, otherwise fallback to automatic detection
-        footer_text = None
-
-        if viz_config and viz_config.footer_analysis:
-            # Use Claude's intelligent pattern analysis
-            footer_text = viz_config.footer_analysis
-        else:
-            # Fallback: Analyze patterns in the data automatically
-            terminations = [e for e in bar_events if 'terminated' in e.context.lower() or 'resigned' in e.context.lower()]
-            replacements = [e for e in bar_events if 'replacement' in e.action.lower() or 'interim' in e.action.lower()]
-
-            footer_notes = []
-            if terminations:
-                footer_notes.append(f"⚠ {len(terminations)} leadership changes during investigation period")
-            if replacements:
-                footer_notes.append(f"Note: {len(replacements)} interim/replacement appointments")
-            if milestone_events:
-                footer_notes.append(f"Key milestones: {', '.join([m.action for m in milestone_events[:3]])}")
-
-            if footer_notes:
-                footer_text = " • ".join(footer_notes)
+        footer_text = analytics.chart_footer(timeline_data, bar_events, milestone_events)
 
         if footer_text:
             fig.add_annotation(
@@ -354,6 +362,8 @@ class GanttVisualizer:
                 align='center'
             )
 
+        timer.record("build_figure", time.perf_counter() - build_started)
+
         # Save BOTH HTML (for viewing) and PNG (for downloading)
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
@@ -367,13 +377,17 @@ class GanttVisualizer:
             'displaylogo': False,
             'responsive': False  # Fixed size to prevent cropping
         }
-        fig.write_html(html_path, config=config)
+        # Reference the shared, locally served plotly.js instead of inlining ~4.8 MB per chart
+        with timer.stage("render_html"):
+            fig.write_html(html_path, config=config, include_plotlyjs=asset_url("plotly"))
         print(f"[SUCCESS] Static HTML saved to {html_path}")
 
         # 2. Save static PNG for download
-        chart_height = max(600, len(actors) * 60 + 200)
-        fig.write_image(png_path, width=self.fig_width, height=chart_height, scale=2)
-        print(f"[SUCCESS] PNG saved to {png_path}")
-
-        # Return both paths as tuple (html_path, png_path)
-        return (html_path, png_path)
+        if self.export_png:
+            chart_height = max(600, len(actors) * 60 + 200)
+            with timer.stage("render_png"):
+                fig.write_image(png_path, width=self.fig_width, height=chart_height, scale=2)
+            print(f"[SUCCESS] PNG saved to {png_path}")
+
+        # Return both paths as tuple (html_path, png_path) - png_path is None when PNG export is off
+        return (html_path, png_path if self.export_png else None)
@@ -1,8 +1,11 @@
-import json
 import os
+import time
 from datetime import datetime, timedelta
 from typing import List, Dict
 from models import TimelineData, Event
+from assets import asset_url
+import metrics
+import serialization
 
 class D3GanttVisualizer:
     """
@@ -47,7 +50,8 @@ class D3GanttVisualizer:
             days = delta.days
             return f"{days}d"
 
-    def generate_gantt(self, timeline_data: TimelineData, color_map: Dict[str, str], output_path: str = "output/timeline.html") -> str:
+    def generate_gantt(self, timeline_data: TimelineData, color_map: Dict[str, str], output_path: str = "output/timeline.html",
+                       timer: "metrics.RequestTimer" = None) -> str:
         """
         Generate professional Gantt chart using D3.js/SVG.
 
@@ -58,10 +62,33 @@ class D3GanttVisualizer:
         - PNG export button at top
         - Auto-fits viewport
         """
+        timer = timer or metrics.RequestTimer()
+        build_started = time.perf_counter()
+        chart_data = self.build_chart_data(timeline_data, color_map)
+        timer.record("build_chart_data", time.perf_counter() - build_started)
 
+        with timer.stage("render_html"):
+            # Generate HTML with embedded D3.js visualization
+            html_content = self._generate_html_template(chart_data)
+
+            # Save HTML file
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(html_content)
+
+        print(f"[SUCCESS] D3.js visualization saved to {output_path}")
+        return output_path
+
+    def build_chart_data(self, timeline_data: TimelineData, color_map: Dict[str, str]) -> dict:
+        """
+        The chart model the HTML template draws: row order, bars with colors and duration labels,
+        milestones, legend, highlights and footer. Each bar and milestone carries "event", its
+        index in timeline_data.events.
+        """
         events = timeline_data.events
         case = timeline_data.case
         viz_config = timeline_data.visualization_config
+        index_of = {id(e): i for i, e in enumerate(events)}
 
         # Separate duration events (bars) from point events (milestones)
         bar_events = [e for e in events if e.end is not None]
@@ -114,22 +141,26 @@ class D3GanttVisualizer:
             }
         }
 
+        # First highlight per actor name (a lookup per bar instead of a scan of every highlight)
+        highlight_of = {}
+        if viz_config:
+            for highlight in viz_config.actor_highlights:
+                highlight_of.setdefault(highlight.name, highlight)
+
         # Add bar events with colors and highlights
         for event in bar_events:
             # Determine color
             color = color_map.get(event.roleType, "#3b82f6")
             highlight_reason = None
 
-            if viz_config and viz_config.actor_highlights:
-                for highlight in viz_config.actor_highlights:
-                    if highlight.name == event.actor:
-                        color = highlight.color
-                        highlight_reason = highlight.reason
-                        chart_data["actor_highlights"][event.actor] = {
-                            "color": highlight.color,
-                            "reason": highlight.reason
-                        }
-                        break
+            highlight = highlight_of.get(event.actor)
+            if highlight is not None:
+                color = highlight.color
+                highlight_reason = highlight.reason
+                chart_data["actor_highlights"][event.actor] = {
+                    "color": highlight.color,
+                    "reason": highlight.reason
+                }
 
             duration_label = self.calculate_duration_label(event.start, event.end)
 
@@ -143,7 +174,8 @@ class D3GanttVisualizer:
                 "context": event.context,
                 "color": color,
                 "duration_label": duration_label,
-                "highlight_reason": highlight_reason
+                "highlight_reason": highlight_reason,
+                "event": index_of[id(event)]
             })
 
         # Add milestone events
@@ -153,7 +185,8 @@ class D3GanttVisualizer:
                 "action": milestone.action,
                 "target": milestone.target,
                 "start": milestone.start,
-                "context": milestone.context
+                "context": milestone.context,
+                "event": index_of[id(milestone)]
             })
 
         # Generate legend items
@@ -166,22 +199,12 @@ class D3GanttVisualizer:
             legend_items["⚠ Suspicious Appointment"] = "#ef4444"
 
         chart_data["legend_items"] = legend_items
-
-        # Generate HTML with embedded D3.js visualization
-        html_content = self._generate_html_template(chart_data)
-
-        # Save HTML file
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-
-        print(f"[SUCCESS] D3.js visualization saved to {output_path}")
-        return output_path
+        return chart_data
 
     def _generate_html_template(self, data: dict) -> str:
         """Generate standalone HTML with embedded D3.js visualization"""
 
-        data_json = json.dumps(data, indent=2)
+        data_json = serialization.dumps(data)
 
         html = f'''<!DOCTYPE html>
 <html lang="en">
@@ -189,9 +212,8 @@ class D3GanttVisualizer:
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>{data["case"]["name"]} - Timeline</title>
-    <script src="https://d3js.org/d3.v7.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"></script>
-    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap" rel="stylesheet">
+    <script src="{asset_url("d3")}"></script>
+    <script src="{asset_url("html2canvas")}"></script>
     <style>
         * {{
             margin: 0;
@@ -200,7 +222,8 @@ class D3GanttVisualizer:
         }}
 
         body {{
-            font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
+            /* Inter when installed, else the system UI font: nothing is loaded from a font CDN */
+            font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
             background: #f9fafb;
             color: #1f2937;
             padding: 20px;
@@ -227,7 +250,7 @@ class D3GanttVisualizer:
             font-size: 14px;
             font-weight: 500;
             cursor: pointer;
-            font-family: 'Inter', sans-serif;
+            font-family: inherit;
             transition: background 0.2s;
             z-index: 1000;
         }}
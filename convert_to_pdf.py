@@ -1,5 +1,16 @@
 #!/usr/bin/env python3
-"""Convert test_document.txt to PDF for end-to-end testing"""
+"""
+Convert test case .txt files to PDF for end-to-end testing.
+
+    python convert_to_pdf.py                       # every test_case_*.txt next to this script
+    python convert_to_pdf.py test_document.txt --output-dir /tmp
+
+For large synthetic documents (10 - 2,000 pages) see backend/benchmarks/corpus.py.
+"""
+
+import argparse
+import glob
+import os
 
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -47,12 +58,16 @@ def txt_to_pdf(input_file, output_file):
     print(f"[SUCCESS] PDF created: {output_file}")
 
 if __name__ == "__main__":
-    # Convert all three test cases
-    txt_to_pdf('/Users/sehpark/Downloads/litigation/test_case_biogenesis.txt',
-               '/Users/sehpark/Downloads/litigation/test_case_biogenesis.pdf')
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
 
-    txt_to_pdf('/Users/sehpark/Downloads/litigation/test_case_techcorp_employment.txt',
-               '/Users/sehpark/Downloads/litigation/test_case_techcorp_employment.pdf')
+    parser = argparse.ArgumentParser(description="Convert test case .txt files to PDF")
+    parser.add_argument("inputs", nargs="*", help="Text files (default: test_case_*.txt in the repo root)")
+    parser.add_argument("--output-dir", default=None, help="Where to write PDFs (default: next to each input)")
+    args = parser.parse_args()
 
-    txt_to_pdf('/Users/sehpark/Downloads/litigation/test_case_megamerge_ma.txt',
-               '/Users/sehpark/Downloads/litigation/test_case_megamerge_ma.pdf')
+    inputs = args.inputs or sorted(glob.glob(os.path.join(repo_dir, "test_case_*.txt")))
+    for input_file in inputs:
+        output_dir = args.output_dir or os.path.dirname(os.path.abspath(input_file))
+        os.makedirs(output_dir, exist_ok=True)
+        output_file = os.path.join(output_dir, os.path.splitext(os.path.basename(input_file))[0] + ".pdf")
+        txt_to_pdf(input_file, output_file)
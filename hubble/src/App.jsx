@@ -1,10 +1,17 @@
 import { useState, useRef, useEffect } from 'react';
 import { Button } from './components/ui/button';
 import { Input } from './components/ui/input';
+import { PreviewChart, mergePreview } from './components/PreviewChart';
 import { Send, Upload, Moon, Sun, Sparkles, BarChart3, Download } from 'lucide-react';
 
 const API_URL = 'http://localhost:8000';
 
+// Presentation-only pacing: minimum delay (ms) before showing the next progress line.
+// The backend streams events as soon as they happen; set to 0 to display them unpaced.
+const PROGRESS_PACE_MS = 400;
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
 function App() {
   const [messages, setMessages] = useState([]);
   const [input, setInput] = useState('');
@@ -13,6 +20,7 @@ function App() {
   const [chartUrl, setChartUrl] = useState(null);
   const [downloadUrl, setDownloadUrl] = useState(null);
   const [chartData, setChartData] = useState(null);
+  const [preview, setPreview] = useState(null); // Chart of the events extracted so far, until "complete"
   const [hasPendingFile, setHasPendingFile] = useState(false);
   const [pendingFileName, setPendingFileName] = useState(null);
   const messagesEndRef = useRef(null);
@@ -74,6 +82,7 @@ function App() {
       setPendingFileName(null);
 
       setIsProcessing(true);
+      setPreview(null);
 
       try {
         // Prepare form data
@@ -99,6 +108,7 @@ function App() {
           role: 'assistant',
           content: `❌ Error processing document: ${error.message}`
         }]);
+        setPreview(null);
         setIsProcessing(false);
       }
     } else {
@@ -121,13 +131,16 @@ function App() {
     const decoder = new TextDecoder();
     let consolidatedMessageIndex = -1; // Track the consolidated message index
     let accumulatedContent = ''; // Accumulate ALL content
+    let lastProgressShownAt = 0; // For PROGRESS_PACE_MS
+    let buffered = ''; // A frame split across reads (preview frames can be large)
 
     while (true) {
       const { done, value } = await reader.read();
       if (done) break;
 
-      const chunk = decoder.decode(value);
-      const lines = chunk.split('\n');
+      buffered += decoder.decode(value, { stream: true });
+      const lines = buffered.split('\n');
+      buffered = lines.pop();
 
       for (const line of lines) {
         if (line.startsWith('data: ')) {
@@ -149,8 +162,18 @@ function App() {
               });
             }
 
+            // Pace progress lines for readability (server timing is in data.elapsed_ms)
+            if (data.type === 'progress' && PROGRESS_PACE_MS > 0) {
+              const wait = lastProgressShownAt + PROGRESS_PACE_MS - Date.now();
+              if (wait > 0) await sleep(wait);
+              lastProgressShownAt = Date.now();
+            }
+
             // Append ALL message types to the consolidated message
-            if (data.type === 'progress' || data.type === 'thinking') {
+            if (data.type === 'preview') {
+              // Append-only deltas: add this update's rows, legend, bars and milestones
+              setPreview(prev => mergePreview(prev, data.data.preview));
+            } else if (data.type === 'progress' || data.type === 'thinking') {
               accumulatedContent += '\n' + data.message;
               setMessages(prev => {
                 const newMessages = [...prev];
@@ -179,8 +202,12 @@ function App() {
 
               // Set chart data (HTML for viewing, PNG for downloading)
               setChartUrl(`${API_URL}${data.data.chart_url}`);
-              setDownloadUrl(`${API_URL}${data.data.download_url}`);
+              setDownloadUrl(data.data.download_url ? `${API_URL}${data.data.download_url}` : null);
               setChartData(data.data);
+              setPreview(null); // The final chart replaces the preview
+              if (data.data.timing) {
+                console.info('[Hubble] server timing (ms):', data.data.timing);
+              }
               setIsProcessing(false);
             } else if (data.type === 'error') {
               accumulatedContent += '\n\n❌ ' + data.message;
@@ -195,6 +222,7 @@ function App() {
                 }
                 return newMessages;
               });
+              setPreview(null);
               setIsProcessing(false);
             }
           } catch (e) {
@@ -403,6 +431,8 @@ function App() {
                 Download PNG
               </Button>
             </div>
+          ) : preview ? (
+            <p className="text-xs text-muted-foreground">Preview • {preview.events} events so far</p>
           ) : (
             <p className="text-xs text-muted-foreground">No visualizations yet</p>
           )}
@@ -410,7 +440,11 @@ function App() {
 
         {/* Visualization Area */}
         <div className="flex-1 flex items-center justify-center p-12 overflow-auto bg-muted/20">
-          {chartUrl ? (
+          {preview ? (
+            <div className="w-full h-full rounded-lg shadow-2xl overflow-hidden bg-white">
+              <PreviewChart preview={preview} />
+            </div>
+          ) : chartUrl ? (
             <div className="w-full h-full rounded-lg shadow-2xl overflow-hidden bg-white">
               {chartUrl.endsWith('.html') ? (
                 <iframe
@@ -0,0 +1,107 @@
+// Lightweight Gantt preview drawn from the backend's "preview" SSE frames (see backend/previews.py)
+// while the model is still writing; the final chart replaces it when the "complete" frame arrives.
+
+const ROW_HEIGHT = 18;
+const LABEL_WIDTH = 220;
+const CHART_WIDTH = 900;
+const AXIS_HEIGHT = 24;
+
+const emptyPreview = () => ({
+  events: 0,
+  case: null,
+  rows: [],
+  legend: [],
+  bars: { row: [], role: [], start: [], end: [], duration: [], event: [], action: [] },
+  milestones: { start: [], action: [], event: [] },
+});
+
+// Previews are append-only: every update only adds rows, legend entries, bars and milestones
+export function mergePreview(preview, update) {
+  const merged = preview ?? emptyPreview();
+  const append = (columns, added) => Object.fromEntries(
+    Object.entries(columns).map(([name, values]) => [name, values.concat(added[name] ?? [])])
+  );
+  return {
+    events: update.events,
+    case: update.case ?? merged.case,
+    rows: merged.rows.concat(update.rows),
+    legend: merged.legend.concat(update.legend),
+    bars: append(merged.bars, update.bars),
+    milestones: append(merged.milestones, update.milestones),
+  };
+}
+
+// Accepts YYYY-MM-DD, YYYY-MM and YYYY; NaN for anything else
+const parseDate = (value) => (value ? Date.parse(value) : NaN);
+
+export function PreviewChart({ preview }) {
+  const { rows, legend, bars, milestones } = preview;
+  const times = bars.start.concat(bars.end, milestones.start).map(parseDate).filter(t => !Number.isNaN(t));
+  if (times.length === 0) return null;
+
+  const min = Math.min(...times);
+  const span = Math.max(...times) - min || 1;
+  const x = (t) => LABEL_WIDTH + ((t - min) / span) * (CHART_WIDTH - LABEL_WIDTH - 10);
+  const height = AXIS_HEIGHT + rows.length * ROW_HEIGHT + 8;
+  const firstYear = new Date(min).getUTCFullYear();
+  const lastYear = new Date(min + span).getUTCFullYear();
+  const step = Math.max(1, Math.ceil((lastYear - firstYear + 1) / 10));
+  const years = [];
+  for (let year = firstYear; year <= lastYear; year += step) years.push(year);
+
+  return (
+    <div className="w-full h-full overflow-auto p-4">
+      <div className="flex items-center justify-between mb-2">
+        <p className="text-sm font-medium text-gray-700">{preview.case?.name ?? 'Building timeline…'}</p>
+        <p className="text-xs text-gray-500">Preview: {preview.events} events so far</p>
+      </div>
+      <svg viewBox={`0 0 ${CHART_WIDTH} ${height}`} className="w-full" role="img" aria-label="Timeline preview">
+        {years.map(year => {
+          const left = x(Date.UTC(year, 0, 1));
+          return left >= LABEL_WIDTH && (
+            <g key={year}>
+              <line x1={left} x2={left} y1={AXIS_HEIGHT - 4} y2={height} stroke="#e5e7eb" />
+              <text x={left} y={AXIS_HEIGHT - 8} fontSize="10" textAnchor="middle" fill="#6b7280">{year}</text>
+            </g>
+          );
+        })}
+        {rows.map((actor, row) => (
+          <text key={actor} x={LABEL_WIDTH - 6} y={AXIS_HEIGHT + row * ROW_HEIGHT + 12}
+                fontSize="10" textAnchor="end" fill="#374151">
+            {actor.length > 36 ? `${actor.slice(0, 35)}…` : actor}
+          </text>
+        ))}
+        {bars.event.map((event, i) => {
+          const start = parseDate(bars.start[i]);
+          const end = parseDate(bars.end[i]);
+          if (Number.isNaN(start) || Number.isNaN(end)) return null;
+          return (
+            <rect key={event} x={x(start)} y={AXIS_HEIGHT + bars.row[i] * ROW_HEIGHT + 3}
+                  width={Math.max(2, x(end) - x(start))} height={ROW_HEIGHT - 6} rx="2"
+                  fill={legend[bars.role[i]]?.color ?? '#9ca3af'}>
+              <title>{`${bars.action[i]} (${bars.start[i]} – ${bars.end[i]}${bars.duration[i] ? `, ${bars.duration[i]}` : ''})`}</title>
+            </rect>
+          );
+        })}
+        {milestones.event.map((event, i) => {
+          const start = parseDate(milestones.start[i]);
+          if (Number.isNaN(start)) return null;
+          return (
+            <line key={event} x1={x(start)} x2={x(start)} y1={AXIS_HEIGHT} y2={height}
+                  stroke="#ef4444" strokeDasharray="3 3">
+              <title>{`${milestones.action[i]} (${milestones.start[i]})`}</title>
+            </line>
+          );
+        })}
+      </svg>
+      <div className="flex flex-wrap gap-3 mt-3">
+        {legend.map(({ label, color }) => (
+          <span key={label} className="flex items-center gap-1 text-xs text-gray-600">
+            <span className="w-3 h-3 rounded-sm" style={{ backgroundColor: color }} />
+            {label}
+          </span>
+        ))}
+      </div>
+    </div>
+  );
+}
@@ -5,6 +5,8 @@ Quick test script to upload and process test_nexvira_complete.pdf
 import requests
 import sys
 
+chart_url = "/output/"
+
 # Upload file
 with open('test_nexvira_complete.pdf', 'rb') as f:
     files = {'file': ('test_nexvira_complete.pdf', f, 'application/pdf')}
@@ -29,8 +31,10 @@ with open('test_nexvira_complete.pdf', 'rb') as f:
                 try:
                     data = json.loads(line_str[6:])
                     print(f"[{data['type'].upper()}] {data['message']}")
+                    if data['type'] == 'complete':
+                        chart_url = data['data']['chart_url']
                 except:
                     print(line_str)
 
 print("\n" + "=" * 60)
-print("Processing complete! Check backend/output/timeline.html")
+print(f"Processing complete! Check backend{chart_url}")